@@ -9,7 +9,22 @@ class CommandInterface(ABC):
         pass
 
     @abstractmethod
-    def execute(self, robot) -> bool:
+    def execute(self, robot, dt: float) -> bool:
+        """Один шаг регулятора; dt - шаг симуляции (с)."""
+        pass
+
+    @property
+    def is_open_ended(self) -> bool:
+        """Команда без условия завершения (непрерывное движение): очередь снимает ее при новой команде."""
+        return False
+
+    def resume(self) -> None:
+        """
+        Подготовка к продолжению после вытеснения из очереди (перед следующим execute).
+
+        Команда заново берет начальную позу, сбрасывает состояние регуляторов и выполняет
+        только оставшуюся часть: поза робота к этому моменту могла измениться.
+        """
         pass
 
     @abstractmethod
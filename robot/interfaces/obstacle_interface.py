@@ -6,7 +6,10 @@ from typing import Tuple
 
 class ObstacleInterface(ABC):
     """Абстрактный базовый класс для препятствий."""
-    
+
+    # Без __dict__, чтобы у наследников с __slots__ (robot.world.ObstacleView) он тоже не появлялся
+    __slots__ = ()
+
     @abstractmethod
     def get_position(self) -> Tuple[float, float]:
         """
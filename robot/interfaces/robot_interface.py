@@ -10,6 +10,10 @@ from interfaces.obstacle_interface import ObstacleInterface
 class RobotInterface(ABC):
     """Абстрактный базовый класс для робота, управляемого через силы и моменты."""
 
+    # Карта занятости и поле расстояний сцены (robot.occupancy.OccupancyGrid) или None:
+    # через нее команды и планировщики получают зазор до препятствий за O(1)
+    occupancy = None
+
     @abstractmethod
     def set_chassis_forces(self, linear_force: float, angular_torque: float) -> None:
         """
@@ -1,112 +1,177 @@
 
+import argparse
 import math
-import queue
-import threading
+import os
+import time
 import zmq
-from typing import Dict, Any, Optional
+from typing import Dict, Any
 
 from robot.robot import Robot
 from robot.command_queue import CommandQueue
 from visualization.visualizer import RobotVisualizer
 from interfaces.command_interface import CommandInterface
-from robot.commands.move_command import MoveCommand
-from robot.commands.turn_command import TurnCommand
-from robot.commands.stop_command import StopCommand
-
-ZMQ_PORT = 5555
-
-
-def command_factory(data: Dict[str, Any]) -> Optional[CommandInterface]:
-    """Фабрика для создания объектов команд из словаря."""
-    command_type = data.get("command")
-    params = data.get("params", {})
-
-    if command_type == "move":
-        distance = params.get("distance")
-        linear_speed = params.get("linear_speed", 0.5)
-
-        if distance is not None and distance < 0:
-            linear_speed = -abs(linear_speed)
-        final_distance = abs(distance) if distance is not None else None
-
-        return MoveCommand(
-            linear_speed=linear_speed,
-            distance=final_distance
-        )
-
-    elif command_type == "turn":
-        return TurnCommand(
-            angular_speed=params.get("angular_speed", 0.8),
-            angle=params.get("angle")
-        )
-    elif command_type == "stop":
-        return StopCommand(
-            duration=params.get("duration", 0.0)
-        )
-    else:
-        print(f"[ZMQ Клиент] Неизвестный тип команды: {command_type}")
-        return None
-
-
-def zmq_client_thread(command_q: queue.Queue):
-    """
-    Клиент ZeroMQ, работающий в отдельном потоке.
-    Слушает команды и кладет их в потокобезопасную очередь.
-    """
-    context = zmq.Context()
-    socket = context.socket(zmq.SUB)
-    socket.connect(f"tcp://localhost:{ZMQ_PORT}")
-    socket.setsockopt_string(zmq.SUBSCRIBE, "")
-    print(f"[ZMQ Клиент] Клиент ZeroMQ запущен на порту {ZMQ_PORT}...")
-
-    try:
-        while True:
-            data = socket.recv_json()
-            print(f"[ZMQ Клиент] Получена команда: {data}")
-            command_obj = command_factory(data)
-            if command_obj:
-                command_q.put(command_obj)
-    except (zmq.ZMQError, KeyboardInterrupt):
-        print("[ZMQ Клиент] Клиент ZeroMQ остановлен.")
-    finally:
-        socket.close()
-        context.term()
+from robot.commands.factory import command_factory
+from robot.latency_trace import LatencyTracer, mark
+from robot.telemetry import TelemetryPublisher
+from robot.command_receiver import CommandReceiver, subscription_topics
+from robot.headless import DEMO_OBSTACLES, IDLE_VELOCITY
+from robot.world import load_world, WorldFormatError
+from robot.occupancy import OccupancyGrid
+
+# Адреса ZeroMQ (tcp:// или ipc://), общие с голосовой частью; inproc:// - только для робота в процессе голосовой части (main.py --with-robot)
+COMMAND_ENDPOINT = os.environ.get('VOICE_CONTROL_COMMAND_ENDPOINT', 'tcp://*:5555')
+ACK_ENDPOINT = os.environ.get('VOICE_CONTROL_ACK_ENDPOINT', 'tcp://*:5556')
+TELEMETRY_ENDPOINT = os.environ.get('VOICE_CONTROL_TELEMETRY_ENDPOINT', 'tcp://*:5557')
+
+
+def connect_address(endpoint: str) -> str:
+    """Адрес для подключения к привязанному адресу: tcp://*:port -> tcp://localhost:port."""
+    return endpoint.replace('tcp://*:', 'tcp://localhost:')
+
+
+def attach_trace(command: CommandInterface, data: Dict[str, Any], received_at: float) -> CommandInterface:
+    """Переносит контекст трассировки задержек из сообщения в объект команды."""
+    trace = data.get("trace")
+    if trace is not None:
+        mark(trace, "receive", received_at)
+        command.trace = trace
+    return command
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Симуляция робота')
+    parser.add_argument('--trace-file', type=str, default=None,
+                        help='Записывать трассировку задержек команд (формат Chrome Trace) в указанный файл')
+    parser.add_argument('--robot-id', type=str, default='1', help='Идентификатор робота для адресации команд')
+    parser.add_argument('--groups', type=str, default='',
+                        help='Группы робота через запятую (команды "группа N" от голосовой части)')
+    parser.add_argument('--command-endpoint', type=str, default=COMMAND_ENDPOINT,
+                        help='Адрес публикатора команд голосовой части (tcp:// или ipc://); '
+                             'по умолчанию из VOICE_CONTROL_COMMAND_ENDPOINT')
+    parser.add_argument('--ack-endpoint', type=str, default=ACK_ENDPOINT,
+                        help='Адрес канала подтверждений (режим --reliable); по умолчанию из VOICE_CONTROL_ACK_ENDPOINT')
+    parser.add_argument('--telemetry-endpoint', type=str, default=TELEMETRY_ENDPOINT,
+                        help='Адрес публикации телеметрии; по умолчанию из VOICE_CONTROL_TELEMETRY_ENDPOINT')
+    parser.add_argument('--telemetry-port', type=int, default=None,
+                        help='Порт публикации телеметрии по TCP (у каждого робота на компьютере свой); '
+                             'заменяет --telemetry-endpoint')
+    parser.add_argument('--telemetry-rate', type=float, default=10.0,
+                        help='Частота публикации телеметрии, Гц (0 - отключить)')
+    parser.add_argument('--physics-rate', type=float, default=500.0,
+                        help='Частота фиксированного шага физики и регуляторов, Гц (отрисовка - 60 Гц)')
+    parser.add_argument('--collision', choices=Robot.COLLISION_MODES, default='substep',
+                        help='Проверка столкновений: подшаги с SAT или непрерывная (время касания, без пролета сквозь тонкие стены)')
+    parser.add_argument('--integrator', choices=Robot.INTEGRATORS, default='euler',
+                        help='Интегрирование динамики: явный Эйлер или точное решение с движением по дуге')
+    parser.add_argument('--world', type=str, default=None,
+                        help='Файл карты препятствий: .json или двоичный .world (python -m robot.world карта.json карта.world); '
+                             'по умолчанию - демонстрационная сцена')
+    parser.add_argument('--grid-resolution', type=float, default=0.05,
+                        help='Размер ячейки карты занятости и поля расстояний, м (0 - не строить)')
+    parser.add_argument('--floor-plan', type=str, default=None,
+                        help='План помещения (PNG, пиксель - ячейка --grid-resolution, темное - занято) '
+                             'для карты занятости, с центром в (0, 0)')
+    parser.add_argument('--motion-profile', action='store_true',
+                        help='Движение и поворот на заданную величину по трапецеидальному профилю скорости вместо PID')
+    parser.add_argument('--reliable', action='store_true',
+                        help='Подтверждать пронумерованные команды и отсеивать дубликаты (пара к voice --reliable)')
+    args = parser.parse_args()
+    for endpoint in (args.command_endpoint, args.ack_endpoint, args.telemetry_endpoint):
+        if endpoint.startswith('inproc://'):
+            parser.error(f"{endpoint}: inproc:// работает только внутри одного процесса; робот в процессе голосовой части - main.py --with-robot")
+    return args
 
 
 def main():
     """Главная функция для запуска симуляции."""
-    # 1. Инициализация основных компонентов
-    robot = Robot(x=0, y=0, theta=math.pi / 2)
-    command_queue = CommandQueue()
-
-    # 2. Создание потокобезопасной очереди для команд от ZMQ
-    zmq_command_queue = queue.Queue()
+    args = parse_args()
 
-    # 3. Настройка и запуск визуализатора
-    visualizer = RobotVisualizer(robot, command_queue)
-
-    # Добавление препятствий для демонстрации
-    visualizer.add_obstacle(2, 2, 1, 1)
-    visualizer.add_obstacle(-3, 1, 0.5, 2)
-    visualizer.add_obstacle(0, -2.5, 3, 0.5)
-    visualizer.add_obstacle(2.5, -1, 1, 3)
-
-    # 4. Запуск ZMQ клиента в отдельном потоке
-    zmq_thread = threading.Thread(target=zmq_client_thread, args=(zmq_command_queue,), daemon=True)
-    zmq_thread.start()
+    # 1. Инициализация основных компонентов
+    robot = Robot(x=0, y=0, theta=math.pi / 2, collision_mode=args.collision, integrator=args.integrator)
+    tracer = LatencyTracer(args.trace_file, "robot")
+    command_queue = CommandQueue(tracer)
+
+    # 2. Настройка и запуск визуализатора
+    visualizer = RobotVisualizer(robot, command_queue, physics_rate=args.physics_rate)
+
+    # Препятствия: карта из файла или демонстрационная сцена
+    if args.world:
+        try:
+            world = load_world(args.world)
+        except (OSError, WorldFormatError) as e:
+            raise SystemExit(f"[Карта] Не удалось загрузить {args.world}: {e}")
+        visualizer.set_obstacles(world)
+        print(f"[Карта] {args.world}: {len(world)} препятствий")
+    else:
+        for obstacle in DEMO_OBSTACLES:
+            visualizer.add_obstacle(*obstacle)
+
+    # Карта занятости с полем расстояний; область покрывает и случайные препятствия клавиши 'O'
+    if args.grid_resolution > 0:
+        start = time.perf_counter()
+        if args.floor_plan:
+            occupancy = OccupancyGrid.from_image(args.floor_plan, args.grid_resolution)
+            occupancy.add_obstacles(visualizer.obstacles)
+        else:
+            occupancy = OccupancyGrid.from_obstacles(visualizer.obstacles, args.grid_resolution, bounds=(-6, -6, 6, 6))
+        visualizer.set_occupancy(occupancy)
+        print(f"[Карта] Карта занятости {occupancy.width}x{occupancy.height} ячеек "
+              f"построена за {(time.perf_counter() - start) * 1000:.0f} мс")
+
+    # 3. Приемник команд ZMQ, опрашиваемый в том же такте, что и симуляция
+    # Один контекст на процесс, общий с телеметрией
+    context = zmq.Context.instance()
+    groups = [group.strip() for group in args.groups.split(',') if group.strip()]
+    receiver = CommandReceiver(
+        context, connect_address(args.command_endpoint), subscription_topics(args.robot_id, groups),
+        ack_endpoint=connect_address(args.ack_endpoint) if args.reliable else None, robot_id=args.robot_id)
+
+    # 4. Публикация телеметрии для голосовой части и других наблюдателей
+    telemetry = None
+    if args.telemetry_rate > 0:
+        telemetry_endpoint = args.telemetry_endpoint
+        if args.telemetry_port is not None:
+            telemetry_endpoint = f"tcp://*:{args.telemetry_port}"
+        telemetry = TelemetryPublisher(context, telemetry_endpoint, args.robot_id, args.telemetry_rate)
+
+    def enqueue_message(data: Dict[str, Any], received_at: float) -> None:
+        # Схема проверена при декодировании; конструктор команды - последняя граница перед очередью
+        try:
+            command = command_factory(data, profiled=args.motion_profile)
+        except ValueError as e:
+            print(f"[Команды] Отклонена команда {data.get('command')!r}: {e}")
+            return
+        if command:
+            command_queue.add_command(attach_trace(command, data, received_at))
 
     # 5. Функция обратного вызова для обработки команд из всех источников
     def process_all_commands():
-        # Обработка команд из ZMQ
-        while not zmq_command_queue.empty():
-            command = zmq_command_queue.get()
-            command_queue.add_command(command)
-
-        # Обновление очереди команд робота
-        command_queue.update(robot)
+        # Обработка всех накопившихся команд из ZMQ в текущем кадре;
+        # очередь команд обновляется визуализатором на каждом шаге физики
+        receiver.drain(enqueue_message)
+
+        if telemetry:
+            telemetry.publish_if_due(robot, command_queue)
+
+    def wait_for_next_frame(timeout: float) -> None:
+        """Ожидание до следующего кадра; в простое робот просыпается сразу при поступлении команды."""
+        deadline = time.monotonic() + timeout
+        has_message = receiver.wait(timeout)
+        linear_v, angular_v = robot.get_chassis_velocities()
+        is_idle = command_queue.is_empty() and abs(linear_v) < IDLE_VELOCITY and abs(angular_v) < IDLE_VELOCITY
+        if has_message and not is_idle:
+            time.sleep(max(0.0, deadline - time.monotonic()))
 
     # 6. Запуск главного цикла симуляции
-    visualizer.start(process_all_commands)
+    try:
+        visualizer.start(process_all_commands, wait_for_next_frame)
+    finally:
+        receiver.close()
+        if telemetry: telemetry.close()
+        context.term()
+        tracer.close()
+        if tracer.enabled and tracer.traces:
+            print(f"[Трассировка] Задержки команд (файл {args.trace_file}):\n{tracer.format_summary()}")
 
 
 if __name__ == "__main__":
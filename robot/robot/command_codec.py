@@ -0,0 +1,218 @@
+"""
+Модуль с версионированной схемой команд и их компактной двоичной кодировкой.
+
+Формат сообщения (порядок байт little-endian):
+  заголовок  2s B B B B I 8s  - сигнатура b'VC', версия схемы, тип команды, флаги,
+                                маска присутствующих полей, порядковый номер, сессия;
+  тело       d * N            - поля команды в порядке схемы (отсутствующие равны 0.0);
+  хвост      JSON             - контекст трассировки задержек (только с флагом FLAG_TRACE).
+
+Схема общая для голосовой части и робота (файл продублирован в обоих проектах).
+Декодирование строгое: неизвестная версия, тип, размер или недопустимое значение поля
+приводят к CommandSchemaError, а не к подстановке значений по умолчанию.
+
+Замер кодирования/декодирования по сравнению с JSON: python command_codec.py
+"""
+import json
+import math
+import struct
+from typing import Dict, Optional, Tuple
+
+SCHEMA_VERSION = 1
+MAGIC = b'VC'
+
+HEADER = struct.Struct('<2sBBBBI8s')
+FLAG_SEQ = 0x01
+FLAG_TRACE = 0x02
+MAX_SEQ = 2 ** 32 - 1  # поле I заголовка
+
+# Поле схемы: (имя, обязательное, значение по умолчанию для необязательного, допустимы отрицательные)
+FieldSpec = Tuple[str, bool, Optional[float], bool]
+
+# Тип команды -> (код на проводе, поля). Новые команды добавляются с новыми кодами;
+# изменение полей существующей команды требует увеличения SCHEMA_VERSION.
+COMMAND_SCHEMAS: Dict[str, Tuple[int, Tuple[FieldSpec, ...]]] = {
+    # Знак скорости задает направление, расстояние - модуль (None - непрерывное движение)
+    'move': (1, (('linear_speed', True, None, True), ('distance', False, None, False))),
+    # Знак скорости задает направление, угол - модуль в радианах (None - непрерывный поворот)
+    'turn': (2, (('angular_speed', True, None, True), ('angle', False, None, False))),
+    'stop': (3, (('duration', False, 0.0, False),)),
+    # Точка назначения в координатах карты (м); путь в обход препятствий строит робот
+    'goto': (4, (('x', True, None, True), ('y', True, None, True))),
+}
+# Команды с величиной (расстояние, угол): при заданной величине скорость задает направление и не может быть нулевой
+MAGNITUDE_FIELDS = {'move': ('linear_speed', 'distance'), 'turn': ('angular_speed', 'angle')}
+COMMAND_TYPES = {code: name for name, (code, _) in COMMAND_SCHEMAS.items()}
+BODIES = {name: struct.Struct('<' + 'd' * len(fields)) for name, (_, fields) in COMMAND_SCHEMAS.items()}
+REQUIRED_MASKS = {name: sum(1 << index for index, field in enumerate(fields) if field[1])
+                  for name, (_, fields) in COMMAND_SCHEMAS.items()}
+
+
+class CommandSchemaError(ValueError):
+    """Команда не соответствует схеме (при кодировании или декодировании)."""
+
+
+def validate_command(command: str, params: dict) -> dict:
+    """
+    Проверяет параметры команды по схеме.
+
+    Returns:
+        dict: Полный набор полей схемы (необязательные отсутствующие - значение по умолчанию)
+    """
+    if command not in COMMAND_SCHEMAS:
+        raise CommandSchemaError(f"Неизвестный тип команды: {command!r}")
+    _, fields = COMMAND_SCHEMAS[command]
+    unknown = set(params) - {name for name, _, _, _ in fields}
+    if unknown:
+        raise CommandSchemaError(f"Команда {command!r} не поддерживает поля: {sorted(unknown)}")
+
+    result = {}
+    for name, required, default, signed in fields:
+        value = params.get(name)
+        if value is None:
+            if required:
+                raise CommandSchemaError(f"Команда {command!r}: не задано обязательное поле {name!r}")
+            result[name] = default
+            continue
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise CommandSchemaError(f"Команда {command!r}: поле {name!r} должно быть конечным числом, получено {value!r}")
+        if not signed and value < 0:
+            raise CommandSchemaError(f"Команда {command!r}: поле {name!r} не может быть отрицательным ({value})")
+        result[name] = float(value)
+    _check_magnitude(command, result)
+    return result
+
+
+def _check_magnitude(command: str, params: dict) -> None:
+    if command in MAGNITUDE_FIELDS:
+        speed, magnitude = MAGNITUDE_FIELDS[command]
+        if params[magnitude] is not None and params[speed] == 0:
+            raise CommandSchemaError(f"Команда {command!r}: при заданном поле {magnitude!r} поле {speed!r} не может быть нулевым")
+
+
+def _check_trace(trace) -> None:
+    """Контекст трассировки: {'id': str, 'stages': {этап: время}} с конечными числами времени."""
+    if not isinstance(trace, dict) or not isinstance(trace.get('id'), str) or not isinstance(trace.get('stages'), dict):
+        raise CommandSchemaError("Контекст трассировки не соответствует формату {'id', 'stages'}")
+    for stage, timestamp in trace['stages'].items():
+        if isinstance(timestamp, bool) or not isinstance(timestamp, (int, float)) or not math.isfinite(timestamp):
+            raise CommandSchemaError(f"Этап трассировки {stage!r}: время должно быть конечным числом, получено {timestamp!r}")
+
+
+def encode_command(message: dict) -> bytes:
+    """
+    Кодирует сообщение {"command", "params", ["seq"], ["session"], ["trace"]} в байты.
+    """
+    command = message.get('command')
+    params = validate_command(command, message.get('params') or {})
+    code, fields = COMMAND_SCHEMAS[command]
+
+    flags = 0
+    seq = message.get('seq')
+    if seq is not None:
+        if isinstance(seq, bool) or not isinstance(seq, int) or not 0 <= seq <= MAX_SEQ:
+            raise CommandSchemaError(f"Порядковый номер должен быть целым от 0 до {MAX_SEQ}, получено {seq!r}")
+        flags |= FLAG_SEQ
+    trace = message.get('trace')
+    if trace is not None:
+        _check_trace(trace)
+        flags |= FLAG_TRACE
+    try:
+        session = (message.get('session') or '').encode('ascii')
+    except UnicodeEncodeError:
+        raise CommandSchemaError(f"Идентификатор сессии должен быть ASCII: {message.get('session')!r}")
+    if len(session) > 8:
+        raise CommandSchemaError(f"Идентификатор сессии длиннее 8 байт: {message.get('session')!r}")
+
+    present = 0
+    values = []
+    for index, (name, _, _, _) in enumerate(fields):
+        value = params[name]
+        if value is not None:
+            present |= 1 << index
+        values.append(0.0 if value is None else value)
+
+    data = HEADER.pack(MAGIC, SCHEMA_VERSION, code, flags, present, seq or 0, session) + BODIES[command].pack(*values)
+    if trace is not None:
+        data += json.dumps(trace, separators=(',', ':')).encode('utf-8')
+    return data
+
+
+def decode_command(data: bytes) -> dict:
+    """
+    Декодирует и проверяет сообщение.
+
+    Returns:
+        dict: {"version", "command", "params", ["seq"], ["session"], ["trace"]};
+              в params присутствуют все поля схемы
+    """
+    if len(data) < HEADER.size:
+        raise CommandSchemaError(f"Сообщение короче заголовка ({len(data)} байт)")
+    magic, version, code, flags, present, seq, session = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise CommandSchemaError(f"Неверная сигнатура сообщения: {magic!r}")
+    if version != SCHEMA_VERSION:
+        raise CommandSchemaError(f"Неподдерживаемая версия схемы: {version} (ожидается {SCHEMA_VERSION})")
+    command = COMMAND_TYPES.get(code)
+    if command is None:
+        raise CommandSchemaError(f"Неизвестный код команды: {code}")
+    if flags & ~(FLAG_SEQ | FLAG_TRACE):
+        raise CommandSchemaError(f"Неизвестные флаги сообщения: {flags:#x}")
+    _, fields = COMMAND_SCHEMAS[command]
+    if present >> len(fields) or present & REQUIRED_MASKS[command] != REQUIRED_MASKS[command]:
+        raise CommandSchemaError(f"Маска полей {present:#x} не соответствует команде {command!r}")
+
+    body = BODIES[command]
+    end = HEADER.size + body.size
+    if len(data) < end or (len(data) > end and not flags & FLAG_TRACE):
+        raise CommandSchemaError(f"Неверный размер сообщения {command!r}: {len(data)} байт")
+    params = {}
+    for index, ((name, _, default, signed), value) in enumerate(zip(fields, body.unpack_from(data, HEADER.size))):
+        if not present & (1 << index):
+            params[name] = default
+        elif not math.isfinite(value) or (not signed and value < 0):
+            raise CommandSchemaError(f"Команда {command!r}: недопустимое значение поля {name!r}: {value}")
+        else:
+            params[name] = value
+    _check_magnitude(command, params)
+
+    message = {'version': version, 'command': command, 'params': params}
+    if flags & FLAG_SEQ:
+        message['seq'] = seq
+    session = session.rstrip(b'\0')
+    if session:
+        try:
+            message['session'] = session.decode('ascii')
+        except UnicodeDecodeError:
+            raise CommandSchemaError(f"Идентификатор сессии не в ASCII: {session!r}")
+    if flags & FLAG_TRACE:
+        try:
+            trace = json.loads(data[end:])
+        except ValueError as e:
+            raise CommandSchemaError(f"Поврежден контекст трассировки: {e}")
+        _check_trace(trace)
+        message['trace'] = trace
+    return message
+
+
+def benchmark(iterations: int = 200000) -> None:
+    """Сравнение кодирования/декодирования с путем JSON на типичной команде."""
+    import timeit
+
+    message = {'command': 'move', 'params': {'linear_speed': 0.5, 'distance': 1.5}, 'seq': 42, 'session': 'a1b2c3d4'}
+    binary = encode_command(message)
+    text = json.dumps(message).encode('utf-8')
+    cases = [
+        ('json encode', lambda: json.dumps(message).encode('utf-8')),
+        ('json decode', lambda: json.loads(text)),
+        ('binary encode', lambda: encode_command(message)),
+        ('binary decode', lambda: decode_command(binary)),
+    ]
+    print(f"Размер сообщения: JSON {len(text)} байт, двоичный {len(binary)} байт")
+    for name, func in cases:
+        seconds = min(timeit.repeat(func, number=iterations, repeat=3))
+        print(f"{name:<14} {seconds / iterations * 1e6:6.2f} мкс/сообщение")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,89 @@
+"""
+Модуль со сжатием очереди команд: объединение подряд идущих движений и поворотов.
+
+Пачка одинаковых команд (несколько нажатий стрелки, повторенное "вперёд") выполняется
+одной командой с одним выходом на цель вместо установления регулятора после каждой.
+
+Замер на пачках команд: python -m robot.command_compaction
+"""
+import math
+from typing import List, Optional
+
+from interfaces.command_interface import CommandInterface
+from robot.commands.move_command import MoveCommand
+from robot.commands.turn_command import TurnCommand
+
+
+def is_noop(command: CommandInterface) -> bool:
+    """Команда, которая не сдвигает робота: движение или поворот на величину меньше допуска регулятора."""
+    if isinstance(command, MoveCommand) and command.distance_to_travel is not None:
+        return command.distance_to_travel < MoveCommand.DISTANCE_TOLERANCE
+    if isinstance(command, TurnCommand) and command.target_angle_delta is not None:
+        return command.target_angle_delta < TurnCommand.ANGLE_TOLERANCE
+    return False
+
+
+def merge_commands(first: CommandInterface, second: CommandInterface) -> Optional[List[CommandInterface]]:
+    """
+    Замена пары подряд выполняемых команд.
+
+    Returns:
+        Optional[List]: Список из одной команды с суммарным движением или поворотом, пустой список,
+        если они взаимно уничтожаются, или None, если пару объединить нельзя
+    """
+    if type(first) is not type(second) or first.is_open_ended or second.is_open_ended:
+        return None
+    if isinstance(first, MoveCommand):
+        # Движения без поворота между ними коллинеарны: расстояния складываются со знаком
+        net = (first.distance_to_travel * first.direction_sign
+               + second.distance_to_travel * second.direction_sign)
+        if abs(net) < MoveCommand.DISTANCE_TOLERANCE:
+            return []
+        # Скорость последней команды: новая команда уточняет желаемый темп
+        return [MoveCommand(linear_speed=math.copysign(second.max_speed, net), distance=abs(net),
+                            profiled=second.profiled)]
+    if isinstance(first, TurnCommand):
+        net = (first.target_angle_delta * first.direction_sign
+               + second.target_angle_delta * second.direction_sign)
+        if abs(net) < TurnCommand.ANGLE_TOLERANCE:
+            return []
+        return [TurnCommand(angular_speed=math.copysign(second.max_speed, net), angle=abs(net),
+                            profiled=second.profiled)]
+    return None
+
+
+def benchmark() -> None:
+    """Время выполнения пачек команд с объединением и без."""
+    import contextlib
+    import io
+    from robot.headless import HeadlessSimulation
+
+    bursts = {
+        '5 x вперёд 1 м': lambda: [MoveCommand(0.5, 1.0) for _ in range(5)],
+        '4 x влево 90°': lambda: [TurnCommand(1.8, math.pi / 2) for _ in range(4)],
+        'влево, вправо, 3 x вперёд 0.5 м': lambda: [TurnCommand(1.8, math.pi / 2), TurnCommand(-1.8, math.pi / 2)]
+                                           + [MoveCommand(0.5, 0.5) for _ in range(3)],
+    }
+    for name, make_burst in bursts.items():
+        results = []
+        for compact in (False, True):
+            with contextlib.redirect_stdout(io.StringIO()):  # журнал очереди команд
+                simulation = HeadlessSimulation([], (0.0, 0.0, 0.0), physics_rate=500.0)
+                simulation.command_queue.compact = compact
+                # Вся пачка приходит, пока выполняется первая команда
+                for command in make_burst():
+                    simulation.add_command(command)
+                while not simulation.is_idle() and simulation.time < 120:
+                    simulation.step(0.05)
+            state = simulation.observe()
+            results.append((simulation.time, len(simulation.completed), state['x'], math.degrees(state['theta'])))
+        (plain_time, plain_count, plain_x, plain_theta), (compact_time, count, x, theta) = results
+        print(f"{name:<32} без объединения {plain_time:5.1f} с ({plain_count} команд), "
+              f"с объединением {compact_time:5.1f} с ({count} команд); итог x={x:.2f} м, угол {theta:.0f}° "
+              f"(без: {plain_x:.2f} м, {plain_theta:.0f}°)")
+
+
+if __name__ == '__main__':
+    # Классы берутся из пакета, а не из __main__ (см. robot.world)
+    from robot import command_compaction
+    command_compaction.benchmark()
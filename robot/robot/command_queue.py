@@ -1,53 +1,176 @@
-from typing import List, Optional
+import heapq
+import itertools
+from typing import Callable, List, Optional, Tuple
 
 from interfaces.command_interface import CommandInterface
 from interfaces.robot_interface import RobotInterface
-from robot.commands.stop_command import StopCommand
+from robot.command_compaction import is_noop, merge_commands
+from robot.latency_trace import LatencyTracer, mark
 
 
 class CommandQueue:
-    def __init__(self):
-        self.commands: List[CommandInterface] = []
+    """
+    Очередь команд с учетом приоритета (priority) и вытеснением активной команды.
+
+    Ожидающие команды выполняются по убыванию приоритета, при равном - в порядке
+    поступления. Политики добавления:
+    - APPEND  - в очередь, активная команда выполняется до конца;
+    - PREEMPT - сразу вместо активной; прерванная команда с условием завершения
+                возвращается в начало очереди своего приоритета и потом выполняет
+                оставшуюся часть от текущей позы (CommandInterface.resume),
+                непрерывная снимается;
+    - REPLACE - очередь очищается, команда выполняется сразу.
+    Без явной политики: приоритет от EMERGENCY_PRIORITY (остановка) - REPLACE;
+    непрерывная активная команда или активная с меньшим приоритетом - PREEMPT;
+    иначе APPEND. Поэтому новая команда после непрерывного движения начинает
+    выполняться в том же шаге, а не ждет бесконечно.
+
+    При добавлении в очередь (compact=True) пустые движения и повороты отбрасываются,
+    а команда объединяется с ожидающей перед ней (robot.command_compaction). Не объединяются
+    прерванные команды. Объединенная команда сохраняет трассировку задержек первой из пары,
+    трассировки поглощенных получают этап merged и завершаются вместе с ней (merged_traces),
+    взаимно уничтоженных - сразу. Число убранных из очереди команд - compacted.
+    """
+
+    APPEND, PREEMPT, REPLACE = 'append', 'preempt', 'replace'
+    POLICIES = (APPEND, PREEMPT, REPLACE)
+    EMERGENCY_PRIORITY = 20
+
+    def __init__(
+        self,
+        tracer: Optional[LatencyTracer] = None,
+        on_complete: Optional[Callable[[CommandInterface], None]] = None,
+        compact: bool = True
+    ):
+        # Куча (-приоритет, порядковый номер, команда); прерванные команды получают отрицательный номер
+        self.commands: List[Tuple[int, int, CommandInterface]] = []
         self.active_command: Optional[CommandInterface] = None
+        self.tracer = tracer
+        self.on_complete = on_complete
+        self.compact = compact
+        self.compacted = 0
+        self._order = itertools.count()
+        self._resume_order = itertools.count(-1, -1)
         print("[Очередь] Инициализирована очередь команд")
 
-    def add_command(self, command: CommandInterface) -> None:
-        if isinstance(command, StopCommand):
+    def select_policy(self, command: CommandInterface) -> str:
+        """Политика добавления команды по умолчанию (см. описание класса)."""
+        if command.priority >= self.EMERGENCY_PRIORITY:
+            return self.REPLACE
+        active = self.active_command
+        if active is not None and (active.is_open_ended or command.priority > active.priority):
+            return self.PREEMPT
+        return self.APPEND
+
+    def add_command(self, command: CommandInterface, policy: Optional[str] = None) -> None:
+        mark(getattr(command, 'trace', None), 'enqueue')
+        policy = policy or self.select_policy(command)
+        if policy not in self.POLICIES:
+            raise ValueError(f"Неизвестная политика очереди: {policy}")
+
+        if policy == self.REPLACE:
             self.clear()
             self.active_command = command
             print(f"[Очередь] Добавлена экстренная команда: {command.get_description()}")
-            return
-        self.commands.append(command)
-        print(f"[Очередь] Добавлена команда: {command.get_description()}")
+        elif policy == self.PREEMPT and self.active_command is not None:
+            interrupted = self.active_command
+            if interrupted.is_open_ended:
+                print(f"[Очередь] Снята непрерывная команда: {interrupted.get_description()}")
+            else:
+                heapq.heappush(self.commands, (-interrupted.priority, next(self._resume_order), interrupted))
+                print(f"[Очередь] Прервана команда (продолжится позже): {interrupted.get_description()}")
+            self.active_command = command
+            print(f"[Очередь] Добавлена команда вне очереди: {command.get_description()}")
+        elif not (self.compact and self._compact(command)):
+            heapq.heappush(self.commands, (-command.priority, next(self._order), command))
+            print(f"[Очередь] Добавлена команда: {command.get_description()}")
+
+    def _compact(self, command: CommandInterface) -> bool:
+        """Сжатие очереди при добавлении команды: True, если команда поглощена очередью."""
+        if is_noop(command):
+            self.compacted += 1
+            print(f"[Очередь] Пропущена пустая команда: {command.get_description()}")
+            return True
+        # Перед новой командой выполнится последняя поступившая команда того же приоритета
+        tail = max((entry for entry in self.commands if entry[0] == -command.priority), default=None)
+        if tail is None or tail[1] < 0:
+            return False
+        merged = merge_commands(tail[2], command)
+        if merged is None:
+            return False
+        own = [trace for trace in (getattr(tail[2], 'trace', None), getattr(command, 'trace', None))
+               if trace is not None]
+        absorbed = own[1:] if merged else own
+        for trace in absorbed:
+            mark(trace, 'merged')
+        traces = getattr(tail[2], 'merged_traces', []) + absorbed
+        if merged:
+            if own: merged[0].trace = own[0]
+            merged[0].merged_traces = traces
+        else:
+            for trace in traces: self._record(trace)
+        self.commands.remove(tail)
+        self.commands.extend((tail[0], tail[1], replacement) for replacement in merged)
+        heapq.heapify(self.commands)
+        self.compacted += 2 - len(merged)
+        result = merged[0].get_description() if merged else "взаимно уничтожились"
+        print(f"[Очередь] Объединены команды: {tail[2].get_description()} + {command.get_description()} -> {result}")
+        return True
 
     def get_active_command(self) -> Optional[CommandInterface]:
         return self.active_command
 
-    def update(self, robot: RobotInterface) -> None:
+    def pending(self) -> List[CommandInterface]:
+        """Ожидающие команды в порядке выполнения."""
+        return [command for _, _, command in sorted(self.commands)]
+
+    def update(self, robot: RobotInterface, dt: float) -> None:
         if robot.is_collided:
             return
 
         if self.active_command and self.active_command.check_completion():
-            print(f"[Очередь] Завершена команда: {self.active_command.get_description()}")
-            self.active_command = None
+            self._complete_active_command()
 
         if not self.active_command and self.commands:
-            self.active_command = self.commands.pop(0)
-            print(f"[Очередь] Начато выполнение: {self.active_command.get_description()}")
+            _, order, self.active_command = heapq.heappop(self.commands)
+            if order < 0:
+                self.active_command.resume()
+                print(f"[Очередь] Продолжено выполнение: {self.active_command.get_description()}")
+            else:
+                print(f"[Очередь] Начато выполнение: {self.active_command.get_description()}")
 
         if self.active_command:
+            for trace in self._traces(self.active_command):
+                if 'command_start' not in trace['stages']:
+                    mark(trace, 'command_start')
             try:
-                if self.active_command.execute(robot):
-                    print(f"[Очередь] Завершена команда: {self.active_command.get_description()}")
-                    self.active_command = None
+                if self.active_command.execute(robot, dt):
+                    self._complete_active_command()
             except Exception as e:
                 print(f"[Очередь] Ошибка при выполнении команды: {e}")
                 self.active_command = None
 
+    def _complete_active_command(self) -> None:
+        print(f"[Очередь] Завершена команда: {self.active_command.get_description()}")
+        for trace in self._traces(self.active_command):
+            mark(trace, 'command_complete')
+            self._record(trace)
+        if self.on_complete: self.on_complete(self.active_command)
+        self.active_command = None
+
+    @staticmethod
+    def _traces(command: CommandInterface) -> List[dict]:
+        """Трассировки задержек команды: своя и поглощенных ею при объединении."""
+        trace = getattr(command, 'trace', None)
+        return ([trace] if trace is not None else []) + getattr(command, 'merged_traces', [])
+
+    def _record(self, trace: dict) -> None:
+        if self.tracer: self.tracer.record(trace)
+
     def clear(self) -> None:
         self.commands.clear()
         self.active_command = None
         print("[Очередь] Очередь команд очищена")
 
     def is_empty(self) -> bool:
-        return not self.commands and not self.active_command
\ No newline at end of file
+        return not self.commands and not self.active_command
@@ -0,0 +1,132 @@
+"""
+Модуль с неблокирующим приемником команд ZeroMQ для главного цикла симуляции.
+"""
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+import zmq
+
+from robot.command_codec import decode_command, CommandSchemaError
+
+
+class DuplicateFilter:
+    """Отсеивает повторно доставленные команды (по сессии отправителя и порядковому номеру)."""
+
+    def __init__(self, history: int = 256):
+        self.history = history
+        self.seen: Dict[Optional[str], deque] = {}
+
+    def is_duplicate(self, session: Optional[str], seq: int) -> bool:
+        recent = self.seen.setdefault(session, deque(maxlen=self.history))
+        if seq in recent:
+            return True
+        recent.append(seq)
+        return False
+
+
+def subscription_topics(robot_id: str, groups: List[str]) -> List[str]:
+    """Префиксы тем, на которые подписывается робот: все роботы, он сам и его группы."""
+    return ["all/", f"robot/{robot_id}/"] + [f"group/{group}/" for group in groups]
+
+
+class CommandReceiver:
+    """
+    Приемник команд, опрашиваемый из главного цикла (без отдельного потока).
+
+    За один такт забирает все накопившиеся сообщения (recv с NOBLOCK), а метод
+    wait позволяет циклу симуляции спать до следующего кадра, просыпаясь сразу
+    при поступлении команды. Сообщения чужих тем отбрасываются самим сокетом SUB.
+    В надежном режиме каждая пронумерованная команда подтверждается после
+    постановки в очередь (с идентификатором робота), а дубликаты отсеиваются.
+    Порядок команд сохраняет отправитель: следующую команду, которая может прийти
+    этому роботу, он отправляет только после подтверждения предыдущей.
+    """
+
+    def __init__(
+        self,
+        context: zmq.Context,
+        endpoint: str,
+        topics: List[str],
+        ack_endpoint: Optional[str] = None,
+        robot_id: Optional[str] = None
+    ):
+        """
+        Args:
+            context: Контекст ZeroMQ
+            endpoint: Адрес публикатора команд
+            topics: Префиксы тем для подписки
+            ack_endpoint: Адрес канала подтверждений (None - без подтверждений)
+            robot_id: Идентификатор робота в подтверждениях (для команд группе и всем)
+        """
+        self.robot_id = robot_id
+        self.socket = context.socket(zmq.SUB)
+        self.socket.connect(endpoint)
+        for topic in topics:
+            self.socket.setsockopt_string(zmq.SUBSCRIBE, topic)
+        self.ack_socket = None
+        if ack_endpoint is not None:
+            self.ack_socket = context.socket(zmq.PUSH)
+            self.ack_socket.setsockopt(zmq.LINGER, 0)
+            self.ack_socket.connect(ack_endpoint)
+        self.duplicates = DuplicateFilter()
+        self.poller = zmq.Poller()
+        self.poller.register(self.socket, zmq.POLLIN)
+        print(f"[ZMQ Клиент] Клиент ZeroMQ подключен к {endpoint}, темы: {topics}...")
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Ждет поступления сообщения не дольше timeout секунд.
+
+        Returns:
+            bool: True, если есть непрочитанные сообщения
+        """
+        return bool(self.poller.poll(max(0, int(timeout * 1000))))
+
+    def drain(self, handler: Callable[[Dict[str, Any], float], None], max_messages: int = 100) -> int:
+        """
+        Забирает все доступные сообщения и передает каждое в handler(data, received_at).
+
+        Returns:
+            int: Число обработанных сообщений
+        """
+        count = 0
+        while count < max_messages:
+            try:
+                _, body = self.socket.recv_multipart(zmq.NOBLOCK)
+            except zmq.Again:
+                break
+            received_at = time.monotonic()
+            count += 1
+            try:
+                data = decode_command(body)
+            except CommandSchemaError as e:
+                print(f"[ZMQ Клиент] Отклонено некорректное сообщение ({len(body)} байт): {e}")
+                continue
+            seq = data.get("seq")
+            is_duplicate = seq is not None and self.duplicates.is_duplicate(data.get("session"), seq)
+            if is_duplicate:
+                print(f"[ZMQ Клиент] Повторная доставка команды #{seq}, пропуск.")
+            else:
+                print(f"[ZMQ Клиент] Получена команда: {data}")
+                handler(data, received_at)
+            if seq is not None:
+                self._acknowledge(data, seq, is_duplicate, received_at)
+        return count
+
+    def _acknowledge(self, data: Dict[str, Any], seq: int, is_duplicate: bool, received_at: float) -> None:
+        if self.ack_socket is None:
+            return
+        try:
+            self.ack_socket.send_json({
+                "session": data.get("session"), "seq": seq, "robot_id": self.robot_id, "duplicate": is_duplicate,
+                "received_at": received_at, "enqueued_at": time.monotonic(),
+            }, zmq.NOBLOCK)
+        except zmq.Again:
+            print(f"[ZMQ Клиент] Не удалось отправить подтверждение команды #{seq}.")
+
+    def close(self) -> None:
+        self.socket.close()
+        if self.ack_socket is not None:
+            self.ack_socket.close()
+        print("[ZMQ Клиент] Клиент ZeroMQ остановлен.")
@@ -0,0 +1,47 @@
+"""
+Модуль с созданием объектов команд из сообщений.
+"""
+from typing import Any, Dict, Optional
+
+from interfaces.command_interface import CommandInterface
+from robot.commands.move_command import MoveCommand
+from robot.commands.turn_command import TurnCommand
+from robot.commands.stop_command import StopCommand
+from robot.commands.goto_command import GoToCommand
+
+
+def command_factory(data: Dict[str, Any], profiled: bool = False) -> Optional[CommandInterface]:
+    """
+    Фабрика для создания объектов команд из декодированного сообщения.
+
+    Параметры уже проверены схемой command_codec и содержат все поля команды.
+    profiled - движение и поворот на заданную величину по профилю скорости (robot.motion_profile).
+    """
+    command_type = data.get("command")
+    params = data["params"]
+
+    if command_type == "move":
+        return MoveCommand(
+            linear_speed=params["linear_speed"],
+            distance=params["distance"],
+            profiled=profiled
+        )
+
+    elif command_type == "turn":
+        return TurnCommand(
+            angular_speed=params["angular_speed"],
+            angle=params["angle"],
+            profiled=profiled
+        )
+    elif command_type == "stop":
+        return StopCommand(
+            duration=params["duration"]
+        )
+    elif command_type == "goto":
+        return GoToCommand(
+            x=params["x"],
+            y=params["y"]
+        )
+    else:
+        print(f"[Команды] Неизвестный тип команды: {command_type}")
+        return None
@@ -0,0 +1,237 @@
+"""
+Модуль с командой непрерывного движения по ломаной (pure pursuit).
+
+Сравнение времени прохождения маршрута с последовательностью поворотов и движений:
+python -m robot.commands.follow_path_command
+"""
+import bisect
+import math
+from typing import List, Optional, Sequence, Tuple
+
+from interfaces.command_interface import CommandInterface
+from interfaces.robot_interface import RobotInterface
+from robot.robot import Robot
+
+Point = Tuple[float, float]
+
+
+class FollowPathCommand(CommandInterface):
+    """
+    Движение по ломаной без остановок в точках излома.
+
+    На каждом шаге берется точка пути на расстоянии lookahead впереди проекции
+    робота на путь, и робот едет по дуге в нее (кривизна 2y/d^2 в системе робота).
+    Скорость ограничена кривизной дуги (боковое ускорение) и тормозным путем до
+    конца пути; если точка оказалась сзади, робот сначала разворачивается на месте.
+    Скорости отрабатываются PI-регулятором с компенсацией сопротивления, а последние
+    FINAL_DISTANCE метров - PD-регулятором по позиции, как у MoveCommand.
+    """
+
+    # Регуляторы скоростей: ошибка скорости -> сила (момент), плюс компенсация сопротивления
+    KV = 20.0
+    KW = 3.0
+    KI = 2.0
+    MAX_INTEGRAL = 0.5
+
+    # Ограничения профиля скорости
+    DECELERATION = 1.5  # м/с^2 - торможение к концу пути
+    LATERAL_ACCELERATION = 1.5  # м/с^2 - на дугах
+    ROTATE_IN_PLACE_ANGLE = math.radians(60)  # точка впереди дальше этого угла - разворот на месте
+    KP_HEADING = 4.0  # разворот на месте: ошибка курса -> угловая скорость
+
+    # Остановка в конце пути: PD по позиции вдоль последнего отрезка (коэффициенты MoveCommand)
+    FINAL_DISTANCE = 0.2
+    KP_POSITION = 20.0
+    KD_POSITION = 25.0
+    GOAL_TOLERANCE = 0.01
+    VELOCITY_TOLERANCE = 0.01
+
+    @property
+    def priority(self) -> int:
+        return 1
+
+    def __init__(
+        self,
+        points: Sequence[Point],
+        linear_speed: float = 1.0,
+        lookahead: float = 0.4,
+        angular_speed: float = 3.0
+    ):
+        """
+        Args:
+            points: Точки пути (первая обычно - текущее положение робота)
+            linear_speed: Наибольшая скорость движения (м/с)
+            lookahead: Расстояние до точки преследования вдоль пути (м); меньше - точнее на углах
+            angular_speed: Наибольшая угловая скорость (рад/с)
+        """
+        path = [tuple(map(float, points[0]))] if points else []
+        for point in points[1:]:
+            if math.dist(point, path[-1]) > 1e-6: path.append((float(point[0]), float(point[1])))
+        if len(path) < 2:
+            raise ValueError("Путь должен содержать хотя бы две различные точки.")
+        self.path: List[Point] = path
+        self.max_speed = abs(linear_speed)
+        self.lookahead = lookahead
+        self.max_angular_speed = abs(angular_speed)
+
+        # Путевая координата начала каждого отрезка и общая длина
+        self.stations = [0.0]
+        for a, b in zip(path, path[1:]):
+            self.stations.append(self.stations[-1] + math.dist(a, b))
+        self.length = self.stations[-1]
+
+        self.segment = 0
+        self.progress = 0.0
+        self.lookahead_point: Optional[Point] = None
+        self.linear_integral = self.angular_integral = 0.0
+        self.is_complete = False
+
+    def _project(self, x: float, y: float) -> float:
+        """Путевая координата проекции робота; ищется вперед от прошлой, путь не проходится назад."""
+        best = None
+        for index in range(self.segment, len(self.path) - 1):
+            if self.stations[index] > self.progress + 2 * self.lookahead + 1.0:
+                break
+            (ax, ay), (bx, by) = self.path[index], self.path[index + 1]
+            length = self.stations[index + 1] - self.stations[index]
+            t = max(0.0, min(1.0, ((x - ax) * (bx - ax) + (y - ay) * (by - ay)) / (length * length)))
+            distance = math.hypot(ax + t * (bx - ax) - x, ay + t * (by - ay) - y)
+            if best is None or distance < best[0]:
+                best = (distance, index, self.stations[index] + t * length)
+        _, self.segment, station = best
+        self.progress = max(self.progress, station)
+        return self.progress
+
+    def point_at(self, station: float) -> Point:
+        """Точка пути с путевой координатой station (с ограничением концами пути)."""
+        if station >= self.length:
+            return self.path[-1]
+        index = max(0, bisect.bisect_right(self.stations, station) - 1)
+        (ax, ay), (bx, by) = self.path[index], self.path[index + 1]
+        t = (station - self.stations[index]) / (self.stations[index + 1] - self.stations[index])
+        return ax + t * (bx - ax), ay + t * (by - ay)
+
+    def remaining_points(self) -> List[Point]:
+        """Еще не пройденные точки излома пути (включая конечную)."""
+        return self.path[self.segment + 1:]
+
+    def execute(self, robot: RobotInterface, dt: float) -> bool:
+        if self.is_complete:
+            return True
+        x, y, theta = robot.get_position()
+        linear_v, angular_v = robot.get_chassis_velocities()
+        remaining = self.length - self._project(x, y)
+
+        if self.segment == len(self.path) - 2 and remaining <= self.FINAL_DISTANCE:
+            # Подход к концу: ошибка вдоль последнего отрезка (отрицательная - проехали) и удержание его курса
+            (ax, ay), (gx, gy) = self.path[-2], self.path[-1]
+            length = self.stations[-1] - self.stations[-2]
+            along = ((gx - x) * (gx - ax) + (gy - y) * (gy - ay)) / length
+            heading = math.atan2(gy - ay, gx - ax)
+            heading_error = (heading - theta + math.pi) % (2 * math.pi) - math.pi
+            self.lookahead_point = (gx, gy)
+            if abs(along) < self.GOAL_TOLERANCE and abs(linear_v) < self.VELOCITY_TOLERANCE:
+                robot.set_chassis_forces(0.0, 0.0)
+                self.is_complete = True
+                return True
+            linear_force = self.KP_POSITION * along - self.KD_POSITION * linear_v
+            target_w = max(-self.max_angular_speed, min(self.max_angular_speed, self.KP_HEADING * heading_error))
+            angular_torque = self.KW * (target_w - angular_v) + Robot.ANGULAR_DRAG_COEFFICIENT * target_w
+            robot.set_chassis_forces(linear_force, angular_torque)
+            return False
+
+        lx, ly = self.lookahead_point = self.point_at(self.progress + self.lookahead)
+        dx, dy = lx - x, ly - y
+        local_x = math.cos(theta) * dx + math.sin(theta) * dy
+        local_y = -math.sin(theta) * dx + math.cos(theta) * dy
+        heading_error = math.atan2(local_y, local_x)
+
+        if abs(heading_error) > self.ROTATE_IN_PLACE_ANGLE:
+            # Точка сзади или сбоку: разворот на месте
+            target_v = 0.0
+            target_w = max(-self.max_angular_speed, min(self.max_angular_speed, self.KP_HEADING * heading_error))
+        else:
+            curvature = 2.0 * local_y / max(dx * dx + dy * dy, 1e-9)
+            target_v = min(self.max_speed, math.sqrt(2.0 * self.DECELERATION * remaining))
+            if abs(curvature) > 1e-9:
+                target_v = min(target_v, math.sqrt(self.LATERAL_ACCELERATION / abs(curvature)),
+                               self.max_angular_speed / abs(curvature))
+            target_w = target_v * curvature
+
+        linear_error, angular_error = target_v - linear_v, target_w - angular_v
+        self.linear_integral = max(-self.MAX_INTEGRAL, min(self.MAX_INTEGRAL, self.linear_integral + linear_error * dt))
+        self.angular_integral = max(-self.MAX_INTEGRAL, min(self.MAX_INTEGRAL, self.angular_integral + angular_error * dt))
+        linear_force = (self.KV * linear_error + self.KI * self.linear_integral
+                        + Robot.LINEAR_DRAG_COEFFICIENT * target_v)
+        angular_torque = (self.KW * angular_error + self.KI * self.angular_integral
+                          + Robot.ANGULAR_DRAG_COEFFICIENT * target_w)
+        robot.set_chassis_forces(linear_force, angular_torque)
+        return False
+
+    def resume(self) -> None:
+        # Путь задан в координатах мира: пройденная часть остается, интегралы сбрасываются
+        self.linear_integral = self.angular_integral = 0.0
+
+    def check_completion(self) -> bool:
+        return self.is_complete
+
+    def get_description(self) -> str:
+        return (f"Движение по пути из {len(self.path) - 1} отрезков ({self.length:.1f} м): "
+                f"пройдено {min(self.progress, self.length):.1f} м")
+
+    def get_target_pose(self, robot: RobotInterface) -> Optional[Tuple[float, float, Optional[float]]]:
+        # Точка преследования; до начала движения - конец пути
+        x, y = self.lookahead_point or self.path[-1]
+        return x, y, None
+
+
+def benchmark() -> None:
+    """Время прохождения маршрутов: повороты и движения с остановками против движения по пути."""
+    import contextlib
+    import io
+    from robot.commands.move_command import MoveCommand
+    from robot.commands.turn_command import TurnCommand
+    from robot.headless import HeadlessSimulation
+
+    def turns_and_moves(path: Sequence[Point], theta: float) -> List[CommandInterface]:
+        """Повороты на месте и движения по отрезкам пути, начиная с курса theta."""
+        commands: List[CommandInterface] = []
+        heading = theta
+        for (x0, y0), (x1, y1) in zip(path, path[1:]):
+            target = math.atan2(y1 - y0, x1 - x0)
+            turn = (target - heading + math.pi) % (2 * math.pi) - math.pi
+            if abs(turn) > 0.01:
+                # Угол для команды всегда положителен, направление задается скоростью
+                commands.append(TurnCommand(angular_speed=math.copysign(1.8, turn), angle=abs(turn)))
+            commands.append(MoveCommand(linear_speed=1.0, distance=math.hypot(x1 - x0, y1 - y0)))
+            heading = target
+        return commands
+
+    routes = {
+        'квадрат 3x3 м': [(0, 0), (3, 0), (3, 3), (0, 3), (0, 0)],
+        'змейка 20 точек': [(i * 1.0, 1.0 if i % 2 else 0.0) for i in range(20)],
+        'спираль 40 точек': [(0.2 * i * math.cos(i * 0.5), 0.2 * i * math.sin(i * 0.5)) for i in range(1, 41)],
+    }
+    for name, route in routes.items():
+        start = (route[0][0], route[0][1], math.atan2(route[1][1] - route[0][1], route[1][0] - route[0][0]))
+        results = []
+        for mode in ('commands', 'follow'):
+            with contextlib.redirect_stdout(io.StringIO()):  # журнал очереди команд
+                simulation = HeadlessSimulation([], start, physics_rate=500.0)
+                commands = (turns_and_moves(route, start[2])
+                            if mode == 'commands' else [FollowPathCommand(route, linear_speed=1.0)])
+                for command in commands:
+                    simulation.add_command(command)
+                while not simulation.is_idle() and simulation.time < 300:
+                    simulation.step(0.1)
+            state = simulation.observe()
+            results.append((simulation.time, math.hypot(state['x'] - route[-1][0], state['y'] - route[-1][1])))
+        (stop_time, stop_error), (follow_time, follow_error) = results
+        print(f"{name:<18} повороты и движения {stop_time:6.1f} с (ошибка {stop_error * 100:.1f} см), "
+              f"по пути {follow_time:6.1f} с (ошибка {follow_error * 100:.1f} см): в {stop_time / follow_time:.1f} раза быстрее")
+
+
+if __name__ == '__main__':
+    # Классы берутся из пакета, а не из __main__ (см. robot.world)
+    from robot.commands import follow_path_command
+    follow_path_command.benchmark()
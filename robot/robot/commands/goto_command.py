@@ -0,0 +1,133 @@
+"""
+Модуль с командой движения в точку в обход препятствий.
+"""
+from typing import List, Optional, Tuple
+
+from interfaces.command_interface import CommandInterface
+from interfaces.robot_interface import RobotInterface
+from robot.commands.follow_path_command import FollowPathCommand
+from robot.commands.stop_command import StopCommand
+from robot.planner import PlanRequest, Point, get_planner, inflation_for
+
+
+class GoToCommand(CommandInterface):
+    """
+    Движение в точку (x, y) по пути планировщика без остановок в точках излома.
+
+    Путь строится по карте занятости робота (robot.occupancy); без карты робот едет
+    по прямой. Поиск идет по частям - не больше PLAN_BUDGET раскрытых ячеек за шаг
+    симуляции, чтобы долгий A* на большой карте не останавливал цикл физики; до его
+    окончания робот стоит. После изменения карты оставшаяся часть пути проверяется;
+    если его перекрыло, робот останавливается и путь строится заново.
+    """
+
+    # Точка преследования ближе, чем по умолчанию: срезание углов меньше запаса раздутия
+    LOOKAHEAD = 0.3
+    PLAN_BUDGET = 250  # около 2 мс A* на шаг
+
+    def __init__(self, x: float, y: float, linear_speed: float = 1.0, angular_speed: float = 1.8):
+        self.target_x, self.target_y = x, y
+        self.linear_speed = abs(linear_speed)
+        self.angular_speed = abs(angular_speed)
+
+        self.path: Optional[List[Point]] = None
+        self.request: Optional[PlanRequest] = None
+        self.follower: Optional[FollowPathCommand] = None
+        # Перед поиском пути робот останавливается
+        self.current: Optional[CommandInterface] = StopCommand()
+        self.map_version: Optional[int] = None
+        self.is_complete = False
+
+    @property
+    def priority(self) -> int:
+        return 1
+
+    def _plan(self, robot: RobotInterface) -> Optional[bool]:
+        """Часть поиска пути: True - путь построен, False - пути нет, None - поиск продолжается."""
+        x, y, _ = robot.get_position()
+        occupancy = getattr(robot, 'occupancy', None)
+        target = (self.target_x, self.target_y)
+        if occupancy is None:
+            path = [(x, y), target]
+        else:
+            if self.request is None:
+                planner = get_planner(occupancy, inflation_for(robot))
+                self.request = planner.request((x, y), target, self.PLAN_BUDGET)
+            if not self.request.step():
+                return None
+            path, stats = self.request.path, self.request.stats
+            self.request = None
+            # Изменения карты во время поиска проверяются на следующем шаге
+            self.map_version = stats['version']
+            if path is None:
+                print(f"[Планировщик] Нет пути в ({self.target_x:.2f}, {self.target_y:.2f}): {stats['reason']} "
+                      f"({stats['time'] * 1000:.1f} мс)")
+                return False
+            source = "из кэша" if stats['cached'] else f"A*, {stats['expanded']} ячеек"
+            print(f"[Планировщик] Путь в ({self.target_x:.2f}, {self.target_y:.2f}): {stats['length']:.2f} м, "
+                  f"{len(path) - 1} отрезков за {stats['time'] * 1000:.1f} мс, {stats['steps']} шагов ({source})")
+
+        self.path = path
+        try:
+            self.follower = FollowPathCommand(path, self.linear_speed, self.LOOKAHEAD, self.angular_speed)
+        except ValueError:
+            self.follower = None  # робот уже в точке назначения
+        self.current = self.follower
+        return True
+
+    def _path_blocked(self, robot: RobotInterface) -> bool:
+        """Перекрыт ли новыми препятствиями остаток пути от текущей позы."""
+        occupancy = robot.occupancy
+        self.map_version = occupancy.version
+        if self.follower is None or self.follower.is_complete:
+            return False
+        x, y, _ = robot.get_position()
+        planner = get_planner(occupancy, inflation_for(robot))
+        return not planner.path_free([(x, y)] + self.follower.remaining_points())
+
+    def _finish(self, robot: RobotInterface) -> bool:
+        robot.set_chassis_forces(0.0, 0.0)
+        self.is_complete = True
+        return True
+
+    def execute(self, robot: RobotInterface, dt: float) -> bool:
+        if self.is_complete:
+            return True
+        occupancy = getattr(robot, 'occupancy', None)
+        if (self.path is not None and occupancy is not None and occupancy.version != self.map_version
+                and self._path_blocked(robot)):
+            # Сначала остановка: поворот на ходу увел бы робота с нового пути
+            print("[Планировщик] Путь перекрыт: остановка и перепланирование")
+            self.path, self.follower, self.current = None, None, StopCommand()
+        if self.path is None:
+            # Остановка, затем поиск по частям; завершенная остановка оставляет нулевые силы
+            if not self.current.execute(robot, dt):
+                return False
+            planned = self._plan(robot)
+            if planned is None:
+                return False
+            if not planned:
+                return self._finish(robot)
+
+        if self.current is None or self.current.execute(robot, dt):
+            return self._finish(robot)
+        return False
+
+    def resume(self) -> None:
+        # Робота могли увести с пути: остановка и новый путь от текущей позы
+        self.path, self.request, self.follower, self.current = None, None, None, StopCommand()
+
+    def check_completion(self) -> bool:
+        return self.is_complete
+
+    def get_description(self) -> str:
+        description = f"Движение в точку ({self.target_x:.1f}, {self.target_y:.1f})"
+        if self.follower is not None:
+            traveled = min(self.follower.progress, self.follower.length)
+            description += f": пройдено {traveled:.1f} из {self.follower.length:.1f} м"
+        elif self.request is not None:
+            description += ": поиск пути"
+        return description
+
+    def get_target_pose(self, robot: RobotInterface) -> Optional[Tuple[float, float, Optional[float]]]:
+        return self.target_x, self.target_y, None
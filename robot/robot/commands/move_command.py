@@ -1,8 +1,9 @@
 from typing import Optional, Tuple
 import math
-import time
 from interfaces.command_interface import CommandInterface
 from interfaces.robot_interface import RobotInterface
+from robot.motion_profile import TrapezoidalProfile, linear_limits, settle_time
+from robot.robot import Robot
 
 
 class MoveCommand(CommandInterface):
@@ -17,11 +18,25 @@ class MoveCommand(CommandInterface):
     DISTANCE_TOLERANCE = 0.01
     VELOCITY_TOLERANCE = 0.01
 
+    # Отработка профиля скорости (profiled=True): обратная связь по отклонению от опорной позиции
+    KP_PROFILE = 200.0
+    KD_PROFILE = 60.0
+
     @property
     def priority(self) -> int:
         return 1
 
-    def __init__(self, linear_speed: float, distance: Optional[float] = None):
+    @property
+    def is_open_ended(self) -> bool:
+        return self.distance_to_travel is None
+
+    def __init__(self, linear_speed: float, distance: Optional[float] = None, profiled: bool = False):
+        """
+        Args:
+            linear_speed: Скорость (м/с), знак задает направление
+            distance: Расстояние (м); None - непрерывное движение
+            profiled: Движение на расстояние по трапецеидальному профилю (robot.motion_profile) вместо PID
+        """
         if linear_speed == 0 and distance is not None:
             raise ValueError("Не заданы значения.")
 
@@ -31,15 +46,56 @@ class MoveCommand(CommandInterface):
         self.distance_to_travel = abs(distance) if distance is not None else None
 
         self.start_x, self.start_y, self.start_theta = None, None, None
+        self.traveled = 0.0
         self.is_complete = False
         self.integral_error = 0.0
-        self.last_time = None
 
-    def execute(self, robot: RobotInterface) -> bool:
-        current_time = time.time()
-        dt = (current_time - self.last_time) if self.last_time is not None else 1.0 / 60.0
-        self.last_time = current_time
+        self.profiled = profiled
+        self.profile: Optional[TrapezoidalProfile] = None
+        self.settle = 0.0
+        self.elapsed = 0.0
 
+    @property
+    def predicted_duration(self) -> Optional[float]:
+        """Расчетное время выполнения: профиль и установление регулятора (известно после начала выполнения)."""
+        return self.profile.duration + self.settle if self.profile else None
+
+    def _execute_profiled(self, robot: RobotInterface, dt: float) -> bool:
+        x, y, theta = robot.get_position()
+        linear_velocity, _ = robot.get_chassis_velocities()
+        if self.profile is None:
+            self.start_x, self.start_y, self.start_theta = x, y, theta
+            self.profile = TrapezoidalProfile(self.distance_to_travel, *linear_limits(self.max_speed))
+            self.settle = settle_time(Robot.MASS, self.KP_PROFILE, self.KD_PROFILE, Robot.LINEAR_DRAG_COEFFICIENT,
+                                      self.profile.acceleration, dt, self.VELOCITY_TOLERANCE,
+                                      getattr(robot, 'integrator', 'euler'))
+            print(f"[Команды] {self.get_description()}: расчетное время {self.predicted_duration:.2f} с "
+                  f"(профиль {self.profile.duration:.2f} с)")
+
+        # Пройденный путь - проекция смещения на начальный курс (со знаком)
+        traveled = ((x - self.start_x) * math.cos(self.start_theta)
+                    + (y - self.start_y) * math.sin(self.start_theta)) * self.direction_sign
+        self.traveled = traveled
+        velocity = linear_velocity * self.direction_sign
+        if (self.elapsed >= self.profile.duration and abs(self.distance_to_travel - traveled) < self.DISTANCE_TOLERANCE
+                and abs(linear_velocity) < self.VELOCITY_TOLERANCE):
+            robot.set_chassis_forces(0.0, 0.0)
+            self.is_complete = True
+            return True
+
+        # Опорные позиция и скорость - на текущий момент, ускорение - среднее за шаг
+        position, speed, _ = self.profile.sample(self.elapsed)
+        self.elapsed += dt
+        acceleration = (self.profile.sample(self.elapsed)[1] - speed) / dt
+        # Прямая связь по модели шасси и PD по отклонению от профиля
+        force = (Robot.MASS * acceleration + Robot.LINEAR_DRAG_COEFFICIENT * speed
+                 + self.KP_PROFILE * (position - traveled) + self.KD_PROFILE * (speed - velocity))
+        robot.set_chassis_forces(force * self.direction_sign, 0.0)
+        return False
+
+    def execute(self, robot: RobotInterface, dt: float) -> bool:
+        if self.profiled and self.distance_to_travel is not None:
+            return self._execute_profiled(robot, dt)
         current_linear_velocity, _ = robot.get_chassis_velocities()
 
         if self.distance_to_travel is not None:
@@ -49,6 +105,7 @@ class MoveCommand(CommandInterface):
 
             current_x, current_y, _ = robot.get_position()
             traveled_distance = math.sqrt((current_x - self.start_x) ** 2 + (current_y - self.start_y) ** 2)
+            self.traveled = traveled_distance
             position_error = self.distance_to_travel - traveled_distance
 
             # Проверка завершения команды
@@ -86,6 +143,15 @@ class MoveCommand(CommandInterface):
         robot.set_chassis_forces(linear_force, 0.0)
         return self.is_complete
 
+    def resume(self) -> None:
+        # Оставшийся путь - по текущему курсу; профиль строится заново от текущей позы
+        if self.distance_to_travel is not None:
+            self.distance_to_travel = max(self.distance_to_travel - self.traveled, 0.0)
+        self.start_x, self.start_y, self.start_theta = None, None, None
+        self.traveled = 0.0
+        self.integral_error = 0.0
+        self.profile, self.settle, self.elapsed = None, 0.0, 0.0
+
     def check_completion(self) -> bool:
         return self.is_complete
 
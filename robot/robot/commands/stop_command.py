@@ -1,4 +1,3 @@
-import time
 from typing import Optional, Tuple
 from interfaces.command_interface import CommandInterface
 from interfaces.robot_interface import RobotInterface
@@ -13,11 +12,11 @@ class StopCommand(CommandInterface):
 
     def __init__(self, duration: float = 0.0):
         self.duration = duration
-        self.stop_time_start = None
+        self.held_time = 0.0
         self.is_robot_stopped = False
         self.is_complete = False
 
-    def execute(self, robot: RobotInterface) -> bool:
+    def execute(self, robot: RobotInterface, dt: float) -> bool:
         if self.is_complete: return True
         linear_v, angular_v = robot.get_chassis_velocities()
         is_moving = abs(linear_v) > self.VELOCITY_TOLERANCE or abs(angular_v) > self.VELOCITY_TOLERANCE
@@ -29,10 +28,11 @@ class StopCommand(CommandInterface):
             robot.set_chassis_forces(0.0, 0.0)
             if not self.is_robot_stopped:
                 self.is_robot_stopped = True
-                if self.duration > 0: self.stop_time_start = time.time()
-                else: self.is_complete = True
+                if self.duration <= 0: self.is_complete = True
         if self.is_robot_stopped and self.duration > 0:
-            if time.time() - self.stop_time_start >= self.duration:
+            # Удержание отсчитывается по времени симуляции
+            self.held_time += dt
+            if self.held_time >= self.duration:
                 self.is_complete = True
         return self.is_complete
 
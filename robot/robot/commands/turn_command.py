@@ -1,8 +1,9 @@
 from typing import Optional, Tuple
 import math
-import time
 from interfaces.command_interface import CommandInterface
 from interfaces.robot_interface import RobotInterface
+from robot.motion_profile import TrapezoidalProfile, angular_limits, moment_of_inertia, settle_time
+from robot.robot import Robot
 
 
 class TurnCommand(CommandInterface):
@@ -15,11 +16,25 @@ class TurnCommand(CommandInterface):
     ANGLE_TOLERANCE = 0.001
     VELOCITY_TOLERANCE = 0.001
 
+    # Отработка профиля скорости (profiled=True): обратная связь по отклонению от опорного угла
+    KP_PROFILE = 300.0
+    KD_PROFILE = 15.0
+
     @property
     def priority(self) -> int:
         return 1
 
-    def __init__(self, angular_speed: float, angle: Optional[float] = None):
+    @property
+    def is_open_ended(self) -> bool:
+        return self.target_angle_delta is None
+
+    def __init__(self, angular_speed: float, angle: Optional[float] = None, profiled: bool = False):
+        """
+        Args:
+            angular_speed: Угловая скорость (рад/с), знак задает направление
+            angle: Угол поворота (рад); None - непрерывное вращение
+            profiled: Поворот на угол по трапецеидальному профилю (robot.motion_profile) вместо PID
+        """
         if angular_speed == 0 and angle is not None:
             raise ValueError("Значения не заданы.")
 
@@ -28,20 +43,70 @@ class TurnCommand(CommandInterface):
         self.target_angle_delta = abs(angle) if angle is not None else None
 
         self.start_theta, self.final_target_theta = None, None
+        # Угол, на который робот уже повернулся (накапливается по шагам, без переноса через ±pi)
+        self.turned, self.last_theta = 0.0, None
         self.is_complete = False
         self.integral_error = 0.0
-        self.last_time = None
 
-    def execute(self, robot: RobotInterface) -> bool:
-        current_time = time.time()
-        dt = (current_time - self.last_time) if self.last_time is not None else 1.0 / 60.0
-        self.last_time = current_time
+        self.profiled = profiled
+        self.profile: Optional[TrapezoidalProfile] = None
+        self.settle = 0.0
+        self.elapsed = 0.0
 
+    @property
+    def predicted_duration(self) -> Optional[float]:
+        """Расчетное время выполнения: профиль и установление регулятора (известно после начала выполнения)."""
+        return self.profile.duration + self.settle if self.profile else None
+
+    def _track(self, theta: float) -> None:
+        if self.last_theta is not None:
+            self.turned += ((theta - self.last_theta + math.pi) % (2 * math.pi) - math.pi) * self.direction_sign
+        self.last_theta = theta
+
+    def _execute_profiled(self, robot: RobotInterface, dt: float) -> bool:
+        _, _, theta = robot.get_position()
+        _, angular_velocity = robot.get_chassis_velocities()
+        self._track(theta)
+        if self.profile is None:
+            inertia = moment_of_inertia(*robot.get_robot_dimensions())
+            self.start_theta = theta
+            self.final_target_theta = (theta + self.target_angle_delta * self.direction_sign + math.pi) % (2 * math.pi) - math.pi
+            self.moment_of_inertia = inertia
+            self.profile = TrapezoidalProfile(self.target_angle_delta, *angular_limits(self.max_speed, inertia))
+            self.settle = settle_time(inertia, self.KP_PROFILE, self.KD_PROFILE, Robot.ANGULAR_DRAG_COEFFICIENT,
+                                      self.profile.acceleration, dt, self.VELOCITY_TOLERANCE,
+                                      getattr(robot, 'integrator', 'euler'))
+            print(f"[Команды] {self.get_description()}: расчетное время {self.predicted_duration:.2f} с "
+                  f"(профиль {self.profile.duration:.2f} с)")
+
+        final_error = (self.final_target_theta - theta + math.pi) % (2 * math.pi) - math.pi
+        if (self.elapsed >= self.profile.duration and abs(final_error) < self.ANGLE_TOLERANCE
+                and abs(angular_velocity) < self.VELOCITY_TOLERANCE):
+            robot.set_chassis_forces(0.0, 0.0)
+            self.is_complete = True
+            return True
+
+        # Опорные угол и скорость - на текущий момент, ускорение - среднее за шаг
+        angle, speed, _ = self.profile.sample(self.elapsed)
+        self.elapsed += dt
+        acceleration = (self.profile.sample(self.elapsed)[1] - speed) / dt
+        reference = self.start_theta + angle * self.direction_sign
+        angle_error = (reference - theta + math.pi) % (2 * math.pi) - math.pi
+        # Прямая связь по модели шасси и PD по отклонению от профиля
+        torque = ((self.moment_of_inertia * acceleration + Robot.ANGULAR_DRAG_COEFFICIENT * speed) * self.direction_sign
+                  + self.KP_PROFILE * angle_error + self.KD_PROFILE * (speed * self.direction_sign - angular_velocity))
+        robot.set_chassis_forces(0.0, torque)
+        return False
+
+    def execute(self, robot: RobotInterface, dt: float) -> bool:
+        if self.profiled and self.target_angle_delta is not None:
+            return self._execute_profiled(robot, dt)
         _, _, current_theta = robot.get_position()
         _, current_angular_velocity = robot.get_chassis_velocities()
 
         if self.target_angle_delta is not None:
             # --- РЕЖИМ: ПОВОРОТ НА УГОЛ ---
+            self._track(current_theta)
             if self.start_theta is None:
                 self.start_theta = current_theta
                 turn_rads = self.target_angle_delta * self.direction_sign
@@ -82,6 +147,15 @@ class TurnCommand(CommandInterface):
         robot.set_chassis_forces(0.0, angular_torque)
         return self.is_complete
 
+    def resume(self) -> None:
+        # Оставшийся угол - от текущего курса; профиль строится заново
+        if self.target_angle_delta is not None:
+            self.target_angle_delta = max(self.target_angle_delta - self.turned, 0.0)
+        self.start_theta, self.final_target_theta = None, None
+        self.turned, self.last_theta = 0.0, None
+        self.integral_error = 0.0
+        self.profile, self.settle, self.elapsed = None, 0.0, 0.0
+
     def check_completion(self) -> bool:
         return self.is_complete
 
@@ -0,0 +1,99 @@
+"""
+Модуль с роботом без окна в потоке другой программы (голосовой части в том же процессе).
+
+Команды приходят через ZeroMQ так же, как в main.py, но контекст общий с программой,
+поэтому подходят адреса inproc:// - без сетевого стека и без копирования между процессами.
+"""
+import time
+from threading import Event, Thread
+from typing import Any, Dict, Optional, Sequence
+
+import zmq
+
+from robot.command_receiver import CommandReceiver, subscription_topics
+from robot.commands.factory import command_factory
+from robot.headless import DEMO_OBSTACLES, HeadlessSimulation
+from robot.telemetry import TelemetryPublisher
+from robot.world import ObstacleStore
+
+
+class EmbeddedRobot(Thread):
+    """
+    Робот HeadlessSimulation в реальном времени в собственном потоке.
+
+    Сокеты создаются и используются только в этом потоке (как у ReliableCommandSender
+    голосовой части), общий с программой лишь контекст ZeroMQ. Подписчику телеметрии нужно
+    подключаться после события ready: в inproc подписчик с CONFLATE, подключившийся до
+    привязки публикатора, сообщений не получает. Сцена - демонстрационная,
+    с картой занятости для команды "в точку". Трассировка задержек не ведется.
+    """
+
+    FRAME_TIME = 1.0 / 60.0  # с, наибольшее ожидание команды между шагами симуляции
+
+    def __init__(
+        self,
+        context: zmq.Context,
+        command_endpoint: str,
+        ack_endpoint: Optional[str] = None,
+        telemetry_endpoint: Optional[str] = None,
+        robot_id: str = '1',
+        groups: Sequence[str] = (),
+        physics_rate: float = 500.0,
+        grid_resolution: float = 0.05
+    ):
+        """
+        Args:
+            context: Контекст ZeroMQ программы
+            command_endpoint: Адрес публикатора команд для подключения
+            ack_endpoint: Адрес канала подтверждений (None - без подтверждений)
+            telemetry_endpoint: Адрес привязки телеметрии (None - без телеметрии)
+            robot_id: Идентификатор робота для адресации команд
+            groups: Группы робота
+            physics_rate: Частота шага физики (Гц)
+            grid_resolution: Размер ячейки карты занятости (м)
+        """
+        super().__init__()
+        self.daemon = True
+        self.running = True
+        self.ready = Event()  # сокеты созданы и привязаны
+        self.context = context
+        self.command_endpoint = command_endpoint
+        self.ack_endpoint = ack_endpoint
+        self.telemetry_endpoint = telemetry_endpoint
+        self.robot_id = robot_id
+        self.groups = list(groups)
+        self.simulation = HeadlessSimulation(ObstacleStore.from_boxes(DEMO_OBSTACLES), physics_rate=physics_rate,
+                                             grid_resolution=grid_resolution)
+
+    def _enqueue(self, data: Dict[str, Any], received_at: float) -> None:
+        try:
+            command = command_factory(data)
+        except ValueError as e:
+            print(f"[Команды] Отклонена команда {data.get('command')!r}: {e}")
+            return
+        if command:
+            self.simulation.add_command(command)
+
+    def run(self) -> None:
+        receiver = CommandReceiver(self.context, self.command_endpoint, subscription_topics(self.robot_id, self.groups),
+                                   ack_endpoint=self.ack_endpoint, robot_id=self.robot_id)
+        telemetry = None
+        if self.telemetry_endpoint is not None:
+            telemetry = TelemetryPublisher(self.context, self.telemetry_endpoint, self.robot_id)
+        self.ready.set()
+        print(f"[Робот] Робот {self.robot_id} запущен в потоке программы")
+        last_time = time.monotonic()
+        try:
+            while self.running:
+                receiver.drain(self._enqueue)
+                now = time.monotonic()
+                self.simulation.step(now - last_time)
+                last_time = now
+                if telemetry: telemetry.publish_if_due(self.simulation.robot, self.simulation.command_queue)
+                receiver.wait(self.FRAME_TIME)
+        finally:
+            receiver.close()
+            if telemetry: telemetry.close()
+
+    def stop(self) -> None:
+        self.running = False
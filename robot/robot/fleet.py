@@ -0,0 +1,245 @@
+"""
+Модуль с векторизованной симуляцией группы роботов (NumPy, структура массивов).
+
+Замер и сверка с Robot.update: python -m robot.fleet
+"""
+import math
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from interfaces.obstacle_interface import ObstacleInterface
+from interfaces.robot_interface import RobotInterface
+from robot.robot import Robot
+
+
+class RobotFleet:
+    """
+    N роботов с той же динамикой, что и Robot, за один векторизованный шаг.
+
+    Поза, скорости и силы хранятся отдельными массивами длины N. Шаг повторяет
+    Robot.update: сопротивление, ограничение скоростей, дробление шага на подшаги
+    по пройденному пути (у каждого робота свое число подшагов) и проверку
+    столкновений SAT после каждого подшага с откатом позы и аварийной остановкой.
+    SAT считается только для сдвинувшихся роботов и только для пар робот-препятствие
+    с пересекающимися AABB (оси мира входят в SAT, поэтому результат тот же).
+    Физические константы берутся из класса Robot.
+    """
+
+    def __init__(self, poses: np.ndarray, width: float = 0.5, length: float = 0.5):
+        """
+        Args:
+            poses: Начальные позы, массив (N, 3) из (x, y, theta)
+            width: Ширина роботов (м)
+            length: Длина роботов (м)
+        """
+        poses = np.asarray(poses, dtype=np.float64).reshape(-1, 3)
+        self.count = len(poses)
+        self.width, self.length = width, length
+        self.moment_of_inertia = Robot.MASS * (width ** 2 + length ** 2) * Robot.MOMENT_OF_INERTIA_FACTOR
+        self.x = poses[:, 0].copy()
+        self.y = poses[:, 1].copy()
+        self.theta = poses[:, 2] % (2 * math.pi)
+        self.linear_velocity = np.zeros(self.count)
+        self.angular_velocity = np.zeros(self.count)
+        self.target_linear_force = np.zeros(self.count)
+        self.target_angular_torque = np.zeros(self.count)
+        self.is_collided = np.zeros(self.count, dtype=bool)
+        self.set_obstacles([])
+
+    def set_obstacles(self, obstacles: List[ObstacleInterface]) -> None:
+        """Запоминает углы препятствий в виде массива (M, 4, 2) и их AABB."""
+        corners = []
+        for obstacle in obstacles:
+            ox, oy = obstacle.get_position(); ow, oh = obstacle.get_dimensions()
+            corners.append([(ox - ow / 2, oy - oh / 2), (ox + ow / 2, oy - oh / 2),
+                            (ox + ow / 2, oy + oh / 2), (ox - ow / 2, oy + oh / 2)])
+        self.obstacle_corners = np.array(corners, dtype=np.float64).reshape(-1, 4, 2)
+        self.obstacle_min = self.obstacle_corners.min(axis=1)
+        self.obstacle_max = self.obstacle_corners.max(axis=1)
+
+    def set_chassis_forces(self, linear_force: np.ndarray, angular_torque: np.ndarray) -> None:
+        self.target_linear_force = np.clip(np.broadcast_to(linear_force, (self.count,)),
+                                           -Robot.MAX_DRIVE_FORCE, Robot.MAX_DRIVE_FORCE).astype(np.float64)
+        self.target_angular_torque = np.clip(np.broadcast_to(angular_torque, (self.count,)),
+                                             -Robot.MAX_TURN_TORQUE, Robot.MAX_TURN_TORQUE).astype(np.float64)
+
+    def update(self, dt: float) -> None:
+        active = ~self.is_collided
+        net_force = self.target_linear_force - self.linear_velocity * Robot.LINEAR_DRAG_COEFFICIENT
+        net_torque = self.target_angular_torque - self.angular_velocity * Robot.ANGULAR_DRAG_COEFFICIENT
+        linear_velocity = np.clip(self.linear_velocity + net_force / Robot.MASS * dt,
+                                  -Robot.MAX_LINEAR_SPEED, Robot.MAX_LINEAR_SPEED)
+        angular_velocity = np.clip(self.angular_velocity + net_torque / self.moment_of_inertia * dt,
+                                   -Robot.MAX_ANGULAR_SPEED, Robot.MAX_ANGULAR_SPEED)
+        self.linear_velocity = np.where(active, linear_velocity, self.linear_velocity)
+        self.angular_velocity = np.where(active, angular_velocity, self.angular_velocity)
+
+        moving = active & ~((np.abs(self.linear_velocity) < 1e-6) & (np.abs(self.angular_velocity) < 1e-6))
+        num_steps = np.maximum(np.ceil(np.abs(self.linear_velocity) * dt / (self.length / 4.0)), 1.0)
+        step_dt = dt / num_steps
+        for step in range(int(num_steps[moving].max()) if moving.any() else 0):
+            stepping = moving & (step < num_steps)
+            prev_x, prev_y, prev_theta = self.x.copy(), self.y.copy(), self.theta.copy()
+            self.x = np.where(stepping, self.x + self.linear_velocity * np.cos(prev_theta) * step_dt, self.x)
+            self.y = np.where(stepping, self.y + self.linear_velocity * np.sin(prev_theta) * step_dt, self.y)
+            self.theta = np.where(stepping, (self.theta + self.angular_velocity * step_dt) % (2 * math.pi), self.theta)
+
+            hit = self._check_body_collision_sat(stepping)
+            if hit.any():
+                self.x = np.where(hit, prev_x, self.x)
+                self.y = np.where(hit, prev_y, self.y)
+                self.theta = np.where(hit, prev_theta, self.theta)
+                for array in (self.linear_velocity, self.angular_velocity,
+                              self.target_linear_force, self.target_angular_torque):
+                    array[hit] = 0.0
+                self.is_collided |= hit
+                moving &= ~hit
+
+    def _check_body_collision_sat(self, candidates: Optional[np.ndarray] = None) -> np.ndarray:
+        """Для каждого робота из candidates (по умолчанию всех): пересекается ли его хитбокс с препятствием."""
+        hits = np.zeros(self.count, dtype=bool)
+        index = np.arange(self.count) if candidates is None else np.flatnonzero(candidates)
+        if not len(self.obstacle_corners) or not len(index):
+            return hits
+        hw = self.width * Robot.HITBOX_SCALE_FACTOR / 2
+        hl = self.length * Robot.HITBOX_SCALE_FACTOR / 2
+        local = np.array([(-hl, -hw), (hl, -hw), (hl, hw), (-hl, hw)])
+        cos_t, sin_t = np.cos(self.theta[index])[:, None], np.sin(self.theta[index])[:, None]
+        x, y = self.x[index][:, None], self.y[index][:, None]
+        robot_corners = np.stack([x + local[:, 0] * cos_t - local[:, 1] * sin_t,
+                                  y + local[:, 0] * sin_t + local[:, 1] * cos_t], axis=-1)  # (K, 4, 2)
+
+        # Широкая фаза: пары (робот, препятствие) с пересекающимися AABB, (P,)
+        robot_min, robot_max = robot_corners.min(axis=1), robot_corners.max(axis=1)
+        overlap = ((robot_min[:, None] <= self.obstacle_max[None]) & (self.obstacle_min[None] <= robot_max[:, None])).all(axis=-1)
+        pair_robot, pair_obstacle = np.nonzero(overlap)
+        if not len(pair_robot):
+            return hits
+
+        # Оси SAT: две стороны робота и оси мировой системы координат, (P, 4, 2)
+        corners = robot_corners[pair_robot]
+        edges = np.stack([corners[:, 1] - corners[:, 0], corners[:, 3] - corners[:, 0]], axis=1)
+        edges = edges / np.sqrt(edges[..., 0] ** 2 + edges[..., 1] ** 2)[..., None]
+        axes = np.concatenate([edges, np.broadcast_to(np.eye(2), (len(corners), 2, 2))], axis=1)
+
+        robot_proj = np.einsum('pck,pak->pac', corners, axes)  # (P, 4 оси, 4 угла)
+        obstacle_proj = np.einsum('pck,pak->pac', self.obstacle_corners[pair_obstacle], axes)
+        separated = ((robot_proj.max(axis=-1) < obstacle_proj.min(axis=-1))
+                     | (obstacle_proj.max(axis=-1) < robot_proj.min(axis=-1)))
+        hits[index[pair_robot[~separated.any(axis=-1)]]] = True
+        return hits
+
+    def get_poses(self) -> np.ndarray:
+        return np.stack([self.x, self.y, self.theta], axis=1)
+
+    def robot(self, index: int) -> "FleetRobotView":
+        """Скалярный интерфейс одного робота группы (для существующих команд)."""
+        return FleetRobotView(self, index)
+
+
+class FleetRobotView(RobotInterface):
+    """Робот группы RobotFleet за интерфейсом RobotInterface; update выполняет вся группа."""
+
+    def __init__(self, fleet: RobotFleet, index: int):
+        self.fleet = fleet
+        self.index = index
+
+    @property
+    def is_collided(self) -> bool:
+        return bool(self.fleet.is_collided[self.index])
+
+    def set_chassis_forces(self, linear_force: float, angular_torque: float) -> None:
+        self.fleet.target_linear_force[self.index] = max(-Robot.MAX_DRIVE_FORCE, min(Robot.MAX_DRIVE_FORCE, linear_force))
+        self.fleet.target_angular_torque[self.index] = max(-Robot.MAX_TURN_TORQUE, min(Robot.MAX_TURN_TORQUE, angular_torque))
+
+    def update(self, dt: float) -> None:
+        """Ничего не делает: роботов группы шагает вся группа сразу (RobotFleet.update)."""
+
+    def get_position(self) -> Tuple[float, float, float]:
+        i = self.index
+        return float(self.fleet.x[i]), float(self.fleet.y[i]), float(self.fleet.theta[i])
+
+    def get_chassis_velocities(self) -> Tuple[float, float]:
+        return float(self.fleet.linear_velocity[self.index]), float(self.fleet.angular_velocity[self.index])
+
+    def get_robot_dimensions(self) -> Tuple[float, float]:
+        return self.fleet.width, self.fleet.length
+
+    def get_wheel_speeds(self) -> Tuple[float, float]:
+        linear_v, angular_v = self.get_chassis_velocities()
+        return linear_v - angular_v * self.fleet.width / 2, linear_v + angular_v * self.fleet.width / 2
+
+    def set_obstacles(self, obstacles: List[ObstacleInterface]) -> None:
+        """Препятствия общие для группы: задаются всем ее роботам."""
+        self.fleet.set_obstacles(obstacles)
+
+
+def benchmark(count: int = 1000, steps: int = 500, dt: float = 1.0 / 500.0, seed: Optional[int] = 0) -> None:
+    """
+    Сверка с Robot.update на случайных силах и сравнение скорости в двух сценах:
+    демонстрационной (столкновения редки) и плотной - решетке мелких препятствий,
+    в которую роботы въезжают, так что сталкивается большинство.
+    """
+    import contextlib
+    import io
+    import os
+    import platform
+    from robot.headless import DEMO_OBSTACLES
+
+    class Box(ObstacleInterface):
+        def __init__(self, x, y, w, h): self.x, self.y, self.w, self.h = x, y, w, h
+        def get_position(self): return self.x, self.y
+        def get_dimensions(self): return self.w, self.h
+
+    def compare(name: str, obstacles: List[ObstacleInterface], area: float, forces: Tuple[float, float]) -> None:
+        rng = np.random.default_rng(seed)
+        poses = np.column_stack([rng.uniform(-area, area, count), rng.uniform(-area, area, count),
+                                 rng.uniform(0, 2 * math.pi, count)])
+        # Роботы, с самого начала пересекающие препятствие, не участвуют
+        fleet = RobotFleet(poses)
+        fleet.set_obstacles(obstacles)
+        poses = poses[~fleet._check_body_collision_sat()]
+        low, high = forces
+        linear = rng.uniform(low, high, (steps // 50 + 1, len(poses))) * rng.choice((-1.0, 1.0), len(poses))
+        torques = rng.uniform(-12, 12, (steps // 50 + 1, len(poses)))
+
+        fleet = RobotFleet(poses)
+        fleet.set_obstacles(obstacles)
+        start = time.perf_counter()
+        for step in range(steps):
+            fleet.set_chassis_forces(linear[step // 50], torques[step // 50])
+            fleet.update(dt)
+        fleet_time = time.perf_counter() - start
+
+        robots = [Robot(*pose) for pose in poses]
+        for robot in robots: robot.set_obstacles(obstacles)
+        with contextlib.redirect_stdout(io.StringIO()):  # журнал столкновений Robot
+            start = time.perf_counter()
+            for step in range(steps):
+                for i, robot in enumerate(robots):
+                    if step % 50 == 0: robot.set_chassis_forces(linear[step // 50, i], torques[step // 50, i])
+                    robot.update(dt)
+            scalar_time = time.perf_counter() - start
+
+        reference = np.array([robot.get_position() for robot in robots])
+        collided = np.array([robot.is_collided for robot in robots])
+        error = np.abs(fleet.get_poses() - reference)
+        error[:, 2] = np.abs((error[:, 2] + math.pi) % (2 * math.pi) - math.pi)
+        print(f"{name}: {len(poses)} роботов x {steps} шагов, {len(obstacles)} препятствий: "
+              f"Robot {scalar_time:.2f} с, RobotFleet {fleet_time:.3f} с (ускорение {scalar_time / fleet_time:.1f}x)")
+        print(f"  макс. расхождение позы: {error[:, :2].max():.2e} м, {error[:, 2].max():.2e} рад; "
+              f"столкновений: {collided.sum()} / {fleet.is_collided.sum()}, "
+              f"несовпадений флага столкновения: {(collided != fleet.is_collided).sum()}")
+
+    print(f"{platform.processor() or platform.machine()}, {os.cpu_count()} ядер, "
+          f"Python {platform.python_version()}, NumPy {np.__version__}")
+    compare("Демонстрационная сцена", [Box(*obstacle) for obstacle in DEMO_OBSTACLES], 1.5, (0.0, 20.0))
+    # Решетка 0.3 x 0.3 м с шагом 1 м: проходы по 0.7 м, роботы разгоняются к препятствиям
+    lattice = [Box(x, y, 0.3, 0.3) for x in np.arange(-4.5, 5.0) for y in np.arange(-4.5, 5.0)]
+    compare("Плотная сцена", lattice, 5.0, (10.0, 20.0))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,153 @@
+"""
+Модуль с симуляцией робота без окна и без привязки к реальному времени.
+"""
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from interfaces.command_interface import CommandInterface
+from interfaces.obstacle_interface import ObstacleInterface
+from robot.command_queue import CommandQueue
+from robot.occupancy import OccupancyGrid
+from robot.robot import Robot
+from robot.sim_clock import FixedStepClock
+
+# Препятствия демонстрационной сцены: (x, y, ширина, высота)
+DEMO_OBSTACLES: List[Tuple[float, float, float, float]] = [
+    (2, 2, 1, 1),
+    (-3, 1, 0.5, 2),
+    (0, -2.5, 3, 0.5),
+    (2.5, -1, 1, 3),
+]
+
+IDLE_VELOCITY = 1e-3  # Скорость, ниже которой робот считается стоящим
+
+
+class HeadlessSimulation:
+    """
+    Робот и очередь команд на симулированных часах: reset() / step(dt) / observe().
+
+    Шаги выполняются с тем же фиксированным dt, что и в визуализаторе, но без ожидания
+    реального времени, поэтому симуляция идет так быстро, как позволяет процессор.
+    Время завершения команд и столкновения записываются по времени симуляции.
+    """
+
+    def __init__(
+        self,
+        obstacles: Optional[List[ObstacleInterface]] = None,
+        start_pose: Tuple[float, float, float] = (0.0, 0.0, math.pi / 2),
+        physics_rate: float = 500.0,
+        collision_mode: str = 'substep',
+        integrator: str = 'euler',
+        grid_resolution: Optional[float] = None
+    ):
+        """
+        Args:
+            obstacles: Препятствия сцены
+            start_pose: Начальная поза робота (x, y, theta)
+            physics_rate: Частота шагов физики и регуляторов (Гц)
+            collision_mode: Режим проверки столкновений (см. Robot.COLLISION_MODES)
+            integrator: Интегратор динамики (см. Robot.INTEGRATORS)
+            grid_resolution: Размер ячейки карты занятости robot.occupancy (None - без карты)
+        """
+        self.obstacles = obstacles or []
+        self.start_pose = start_pose
+        self.physics_rate = physics_rate
+        self.collision_mode = collision_mode
+        self.integrator = integrator
+        # Препятствия сцены не меняются между reset(): карта строится один раз
+        self.occupancy = OccupancyGrid.from_obstacles(self.obstacles, grid_resolution) if grid_resolution else None
+        self.reset()
+
+    def reset(self, pose: Optional[Tuple[float, float, float]] = None) -> Dict[str, Any]:
+        """Возвращает робота в начальную позу с пустой очередью и нулевым временем."""
+        x, y, theta = pose or self.start_pose
+        self.robot = Robot(x=x, y=y, theta=theta, collision_mode=self.collision_mode,
+                           integrator=self.integrator)
+        self.robot.set_obstacles(self.obstacles)
+        self.robot.occupancy = self.occupancy
+        self.command_queue = CommandQueue(on_complete=self._record_completion)
+        self.clock = FixedStepClock(self.physics_rate, max_frame_time=math.inf)
+        self.clock.tick(0.0)
+        self.time = 0.0
+        self.physics_time = 0.0
+        self.started: Dict[int, float] = {}
+        self.completed: List[Dict[str, Any]] = []
+        self.collisions: List[Dict[str, Any]] = []
+        return self.observe()
+
+    def add_command(self, command: CommandInterface) -> None:
+        self.command_queue.add_command(command)
+
+    def step(self, dt: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Продвигает симуляцию на dt секунд (по умолчанию - один шаг физики).
+
+        Время, не кратное шагу физики, накапливается и учитывается в следующих вызовах.
+        """
+        target_time = self.time + (self.clock.dt if dt is None else dt)
+        for _ in range(self.clock.tick(target_time)):
+            self._physics_step(self.clock.dt)
+        self.time = target_time
+        return self.observe()
+
+    def _physics_step(self, dt: float) -> None:
+        self.command_queue.update(self.robot, dt)
+        active = self.command_queue.get_active_command()
+        if active is not None and id(active) not in self.started:
+            self.started[id(active)] = self.physics_time
+
+        was_collided = self.robot.is_collided
+        self.robot.update(dt)
+        self.physics_time += dt
+        if self.robot.is_collided and not was_collided:
+            x, y, theta = self.robot.get_position()
+            active = self.command_queue.get_active_command()
+            self.collisions.append({
+                'time': self.physics_time, 'x': x, 'y': y, 'theta': theta,
+                'command': active.get_description() if active else None,
+            })
+
+    def _record_completion(self, command: CommandInterface) -> None:
+        start = self.started.pop(id(command), self.physics_time)
+        self.completed.append({
+            'command': command.get_description(), 'start': start,
+            'end': self.physics_time, 'duration': self.physics_time - start,
+        })
+
+    def is_idle(self) -> bool:
+        linear_v, angular_v = self.robot.get_chassis_velocities()
+        return self.command_queue.is_empty() and abs(linear_v) < IDLE_VELOCITY and abs(angular_v) < IDLE_VELOCITY
+
+    def observe(self) -> Dict[str, Any]:
+        x, y, theta = self.robot.get_position()
+        linear_v, angular_v = self.robot.get_chassis_velocities()
+        active = self.command_queue.get_active_command()
+        return {
+            'time': self.time,
+            'x': x, 'y': y, 'theta': theta,
+            'linear_velocity': linear_v, 'angular_velocity': angular_v,
+            'is_collided': self.robot.is_collided,
+            'clearance': self.occupancy.clearance(x, y) if self.occupancy else None,
+            'active_command': active.get_description() if active else None,
+            'queue_length': len(self.command_queue.commands),
+            'queue_compacted': self.command_queue.compacted,
+        }
+
+    def run_script(
+        self,
+        script: Iterable[Tuple[float, CommandInterface]],
+        timeout: float = 60.0,
+        step_time: float = 0.01
+    ) -> Dict[str, Any]:
+        """
+        Выполняет сценарий [(время постановки в очередь, команда), ...] до простоя,
+        столкновения или истечения timeout секунд времени симуляции.
+        """
+        pending = sorted(script, key=lambda item: item[0])
+        while self.time < timeout:
+            while pending and pending[0][0] <= self.time:
+                self.add_command(pending.pop(0)[1])
+            if self.robot.is_collided or (not pending and self.is_idle()):
+                break
+            self.step(step_time)
+        return self.observe()
@@ -0,0 +1,103 @@
+"""
+Модуль с точным интегрированием динамики робота за шаг.
+
+Скорость под действием постоянной силы и линейного сопротивления подчиняется
+m dv/dt = F - c v, решение которого v(t) = v_inf + (v0 - v_inf) e^(-c t / m),
+v_inf = F / c. Пройденный путь и угол поворота за шаг - интегралы скоростей,
+поза смещается по дуге окружности с этими длиной и углом (движение «одноколесного»
+робота с постоянными v и w).
+
+Сверка с эталоном на мелком шаге (ошибка точного интегратора больше допуска при шаге
+до 10 раз крупнее базового - ошибка): python -m robot.integrators
+"""
+import math
+from typing import Tuple
+
+# Допустимая ошибка точного интегратора против эталона в замере при шаге до 10 раз крупнее базового:
+# скорости за шаг меняются, а поза смещается по дуге с постоянными v и w, поэтому ошибка ~dt^2
+EXACT_POSITION_TOLERANCE = 0.001  # м
+EXACT_ANGLE_TOLERANCE = math.radians(0.01)
+
+
+def drag_velocity_step(v0: float, force: float, drag: float, inertia: float, v_max: float, dt: float) -> Tuple[float, float]:
+    """
+    Точное решение уравнения inertia * dv/dt = force - drag * v с ограничением |v| <= v_max.
+
+    Returns:
+        (скорость в конце шага, интеграл скорости за шаг)
+    """
+    if drag <= 0.0:
+        accel = force / inertia
+        v_free = v0 + accel * dt
+        if abs(v_free) <= v_max or accel == 0.0:
+            return v_free, (v0 + v_free) / 2 * dt
+        limit = math.copysign(v_max, accel)
+        t_limit = (limit - v0) / accel
+        return limit, (v0 + limit) / 2 * t_limit + limit * (dt - t_limit)
+
+    tau = inertia / drag
+    v_inf = force / drag
+    decay = math.exp(-dt / tau)
+    v_end = v_inf + (v0 - v_inf) * decay
+    if abs(v_end) <= v_max:
+        return v_end, v_inf * dt + (v0 - v_inf) * tau * (1.0 - decay)
+
+    # Скорость достигает ограничения внутри шага: далее движение с постоянной скоростью
+    limit = math.copysign(v_max, v_end)
+    t_limit = -tau * math.log((limit - v_inf) / (v0 - v_inf))
+    t_limit = min(max(t_limit, 0.0), dt)
+    distance = v_inf * t_limit + (v0 - v_inf) * tau * (1.0 - math.exp(-t_limit / tau))
+    return limit, distance + limit * (dt - t_limit)
+
+
+def arc_displacement(theta: float, distance: float, rotation: float) -> Tuple[float, float]:
+    """Смещение (dx, dy) при движении по дуге длины distance с поворотом на rotation из курса theta."""
+    if abs(rotation) < 1e-9:
+        heading = theta + rotation / 2
+        return distance * math.cos(heading), distance * math.sin(heading)
+    radius = distance / rotation
+    return (radius * (math.sin(theta + rotation) - math.sin(theta)),
+            -radius * (math.cos(theta + rotation) - math.cos(theta)))
+
+
+def benchmark(duration: float = 6.0, base_dt: float = 1.0 / 500.0) -> None:
+    """Погрешность позы против эталона (Эйлер с шагом 0.01 мс) при шаге в 1, 10 и 25 раз крупнее базового."""
+    import time
+    from robot.robot import Robot
+
+    # Сила и момент меняются каждые 0.5 с: разгон до ограничения скорости, торможение, разворот
+    profile = [(15.0, 10.0), (15.0, -4.0), (-6.0, 10.0), (3.0, 0.0), (-15.0, -10.0), (0.0, 2.0)]
+
+    def run(integrator, dt):
+        robot = Robot(x=0, y=0, theta=0, integrator=integrator)
+        steps = int(round(duration / dt))
+        start = time.perf_counter()
+        for step in range(steps):
+            force, torque = profile[min(int(step * dt / 0.5), len(profile) - 1)]
+            robot.set_chassis_forces(force, torque)
+            robot.update(dt)
+        return robot.get_position(), (time.perf_counter() - start) / steps * 1e6
+
+    reference, _ = run('euler', 1e-5)
+    print(f"Эталон (Эйлер, dt=0.01 мс): x={reference[0]:.4f}, y={reference[1]:.4f}, theta={reference[2]:.4f}")
+    mismatches = []
+    for factor in (1, 10, 25):
+        dt = base_dt * factor
+        for integrator in Robot.INTEGRATORS:
+            (x, y, theta), cost = run(integrator, dt)
+            error = math.hypot(x - reference[0], y - reference[1])
+            angle_error = abs((theta - reference[2] + math.pi) % (2 * math.pi) - math.pi)
+            print(f"  dt={dt * 1000:5.1f} мс, {integrator:<5}: ошибка позиции {error * 1000:8.3f} мм, "
+                  f"угла {math.degrees(angle_error):7.4f}°, {cost:5.1f} мкс/шаг")
+            if integrator == 'exact' and factor <= 10 and (error > EXACT_POSITION_TOLERANCE
+                                                           or angle_error > EXACT_ANGLE_TOLERANCE):
+                mismatches.append(f"dt={dt * 1000:.1f} мс: {error * 1000:.3f} мм, {math.degrees(angle_error):.4f}°")
+    if mismatches:
+        raise SystemExit(f"Точный интегратор расходится с эталоном больше {EXACT_POSITION_TOLERANCE * 1000:g} мм "
+                         f"или {math.degrees(EXACT_ANGLE_TOLERANCE):g}°: " + "; ".join(mismatches))
+    print(f"Точный интегратор совпадает с эталоном с точностью {EXACT_POSITION_TOLERANCE * 1000:g} мм и "
+          f"{math.degrees(EXACT_ANGLE_TOLERANCE):g}° при шаге до {base_dt * 10 * 1000:.0f} мс (в 10 раз крупнее базового)")
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,140 @@
+"""
+Модуль трассировки задержек команд (от конца речи до реакции робота).
+
+Контекст трассировки передается вместе с командой в ZMQ-сообщении:
+{"id": <ID сегмента>, "stages": {<этап>: <time.monotonic()>, ...}}.
+Голосовая часть заполняет этапы vad_onset, vad_end, decode_done, nlp_done, publish,
+робот дополняет их этапами receive, enqueue, command_start, command_complete
+(и merged, если команда объединена в очереди с ожидающей перед ней).
+Метки сопоставимы между процессами только на одном компьютере (общие монотонные часы).
+
+Модуль общий для голосовой части и робота (файл продублирован в обоих проектах, как и command_codec.py:
+это отдельные программы со своими зависимостями и без общего пакета).
+"""
+import atexit
+import json
+import math
+import time
+from typing import Dict, List, Optional
+
+
+def new_trace(trace_id: str) -> dict:
+    """Создает пустой контекст трассировки."""
+    return {'id': trace_id, 'stages': {}}
+
+
+def mark(trace: Optional[dict], stage: str, timestamp: Optional[float] = None) -> None:
+    """Отмечает момент прохождения этапа (если трассировка включена для команды)."""
+    if trace is not None:
+        trace['stages'][stage] = time.monotonic() if timestamp is None else timestamp
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(q / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class LatencyTracer:
+    """
+    Накапливает контексты трассировки и дописывает их в файл в формате Chrome Trace (chrome://tracing).
+
+    Файл - массив событий (JSON Array Format): каждая запись дописывает в него только свои события,
+    поэтому стоимость записи не растет с числом команд (у робота она происходит в шаге физики).
+    Записи буферизуются и сбрасываются на диск не чаще раза в FLUSH_INTERVAL секунд;
+    при закрытии (close, при выходе из программы) в конец добавляется событие метаданных
+    latency_summary с p50/p99 и массив закрывается. Незакрытый массив chrome://tracing тоже читает.
+    """
+
+    FLUSH_INTERVAL = 5.0
+
+    def __init__(self, path: Optional[str], process_name: str):
+        """
+        Args:
+            path: Путь к JSON-файлу трассировки (None - трассировка выключена)
+            process_name: Имя процесса для событий трассировки
+        """
+        self.path = path
+        self.process_name = process_name
+        self.traces: List[dict] = []
+        self._file = None
+        self._separator = '\n'  # перед первым событием массива запятой нет
+        self._last_flush = time.monotonic()
+        if self.enabled:
+            atexit.register(self.close)
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def record(self, trace: Optional[dict]) -> None:
+        """Сохраняет завершенный контекст и дописывает его события; на диск - не чаще раза в FLUSH_INTERVAL."""
+        if not self.enabled or trace is None:
+            return
+        self.traces.append(trace)
+        self._write(self._events(trace))
+        if time.monotonic() - self._last_flush >= self.FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self) -> None:
+        """Сбрасывает дописанные события на диск."""
+        if self._file is not None and not self._file.closed:
+            self._file.flush()
+            self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        """Дописывает сводку задержек и закрывает массив событий (повторный вызов ничего не делает)."""
+        if self._file is None or self._file.closed:
+            return
+        self._write([{'name': 'latency_summary', 'ph': 'M', 'pid': self.process_name, 'args': self.summary()}])
+        self._file.write('\n]\n')
+        self._file.close()
+
+    def _events(self, trace: dict) -> List[dict]:
+        """События одного контекста: интервалы между этапами и отметки этапов."""
+        events = []
+        stages = sorted(trace['stages'].items(), key=lambda item: item[1])
+        for (name_a, t_a), (_, t_b) in zip(stages, stages[1:]):
+            events.append({
+                'name': name_a, 'ph': 'X', 'pid': self.process_name, 'tid': trace['id'][:8],
+                'ts': t_a * 1e6, 'dur': (t_b - t_a) * 1e6, 'args': {'id': trace['id']},
+            })
+        for name, timestamp in stages:
+            events.append({
+                'name': name, 'ph': 'i', 's': 't', 'pid': self.process_name, 'tid': trace['id'][:8],
+                'ts': timestamp * 1e6,
+            })
+        return events
+
+    def _write(self, events: List[dict]) -> None:
+        if self._file is None:
+            self._file = open(self.path, 'w', encoding='utf-8')
+            self._file.write('[')
+        for event in events:
+            self._file.write(self._separator + json.dumps(event, ensure_ascii=False))
+            self._separator = ',\n'
+
+    def intervals(self) -> Dict[str, List[float]]:
+        """Длительности (мс) между последовательными этапами и от начала до конца."""
+        result: Dict[str, List[float]] = {}
+        for trace in self.traces:
+            stages = sorted(trace['stages'].items(), key=lambda item: item[1])
+            for (name_a, t_a), (name_b, t_b) in zip(stages, stages[1:]):
+                result.setdefault(f"{name_a} -> {name_b}", []).append((t_b - t_a) * 1000.0)
+            if len(stages) > 1:
+                result.setdefault(f"{stages[0][0]} -> {stages[-1][0]}", []).append(
+                    (stages[-1][1] - stages[0][1]) * 1000.0)
+        return result
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """p50/p99 (мс) для каждого интервала."""
+        return {
+            name: {'count': len(values), 'p50_ms': percentile(values, 50), 'p99_ms': percentile(values, 99)}
+            for name, values in self.intervals().items()
+        }
+
+    def format_summary(self) -> str:
+        lines = [f"{name}: p50={s['p50_ms']:.1f} мс, p99={s['p99_ms']:.1f} мс (n={s['count']})"
+                 for name, s in self.summary().items()]
+        return "\n".join(lines)
@@ -0,0 +1,147 @@
+"""
+Модуль с трапецеидальными профилями скорости для команд движения и поворота на заданную величину.
+
+Профиль строится по ограничениям шасси из Robot (сила, момент, масса, сопротивление):
+разгон с наибольшим допустимым ускорением, движение с наибольшей скоростью и торможение
+точно к цели - это оптимальный по времени закон при ограниченном ускорении. Команда
+отрабатывает профиль прямой связью (масса * ускорение + сопротивление * скорость) и
+PD-регулятором по отклонению от опорной позиции. Расчетное время выполнения - длительность
+профиля и время установления регулятора после нее (settle_time).
+
+Сравнение времени установления с PID-регуляторами команд и проверка расчетного времени
+(расхождение больше PREDICTION_TOLERANCE - ошибка): python -m robot.motion_profile
+"""
+import math
+from typing import Tuple
+
+from robot.robot import Robot
+
+# Доля силы (момента) шасси на отработку профиля; остальное - запас для обратной связи
+PROFILE_FORCE_MARGIN = 0.8
+# Допустимое расхождение расчетного и фактического времени выполнения в замере (с)
+PREDICTION_TOLERANCE = 0.05
+
+
+class TrapezoidalProfile:
+    """Профиль разгон - постоянная скорость - торможение на расстояние distance (треугольный, если разогнаться не успевает)."""
+
+    def __init__(self, distance: float, max_velocity: float, max_acceleration: float):
+        """
+        Args:
+            distance: Длина перемещения (м или рад), неотрицательная
+            max_velocity: Наибольшая скорость
+            max_acceleration: Наибольшее ускорение (и замедление)
+        """
+        self.distance = abs(distance)
+        self.acceleration = max_acceleration
+        self.peak_velocity = min(max_velocity, math.sqrt(self.distance * max_acceleration))
+        self.accel_time = self.peak_velocity / max_acceleration if self.peak_velocity > 0 else 0.0
+        accel_distance = 0.5 * max_acceleration * self.accel_time ** 2
+        self.cruise_time = (self.distance - 2 * accel_distance) / self.peak_velocity if self.peak_velocity > 0 else 0.0
+        self.duration = 2 * self.accel_time + self.cruise_time
+
+    def sample(self, t: float) -> Tuple[float, float, float]:
+        """Опорные (позиция, скорость, ускорение) в момент t от начала."""
+        a, v, t1 = self.acceleration, self.peak_velocity, self.accel_time
+        if t <= 0:
+            return 0.0, 0.0, 0.0
+        if t < t1:
+            return 0.5 * a * t * t, a * t, a
+        if t < t1 + self.cruise_time:
+            return 0.5 * a * t1 * t1 + v * (t - t1), v, 0.0
+        if t < self.duration:
+            remaining = self.duration - t
+            return self.distance - 0.5 * a * remaining * remaining, a * remaining, -a
+        return self.distance, 0.0, 0.0
+
+
+def linear_limits(max_speed: float) -> Tuple[float, float]:
+    """(скорость, ускорение) профиля движения: сила на разгон с учетом сопротивления на наибольшей скорости."""
+    speed = min(abs(max_speed), Robot.MAX_LINEAR_SPEED)
+    force = PROFILE_FORCE_MARGIN * Robot.MAX_DRIVE_FORCE - Robot.LINEAR_DRAG_COEFFICIENT * speed
+    return speed, max(force, 0.1 * Robot.MAX_DRIVE_FORCE) / Robot.MASS
+
+
+def angular_limits(max_speed: float, moment_of_inertia: float) -> Tuple[float, float]:
+    """(угловая скорость, угловое ускорение) профиля поворота."""
+    speed = min(abs(max_speed), Robot.MAX_ANGULAR_SPEED)
+    torque = PROFILE_FORCE_MARGIN * Robot.MAX_TURN_TORQUE - Robot.ANGULAR_DRAG_COEFFICIENT * speed
+    return speed, max(torque, 0.1 * Robot.MAX_TURN_TORQUE) / moment_of_inertia
+
+
+def settle_time(inertia: float, kp: float, kd: float, drag: float, acceleration: float, dt: float,
+                velocity_tolerance: float, integrator: str = 'euler') -> float:
+    """
+    Время установления PD-регулятора после конца профиля до допуска velocity_tolerance.
+
+    Шаг физики интегрирует позицию по скорости в конце шага, поэтому при разгоне и торможении
+    робот расходится с непрерывным профилем со скоростью порядка acceleration * dt / 2. К концу
+    профиля остается такая ошибка скорости; она затухает с медленным полюсом замкнутого контура
+    inertia * s^2 + (kd + drag) * s + kp. Точный интегратор ('exact') от профиля не отстает.
+    """
+    residual = acceleration * dt / 2 if integrator == 'euler' else 0.0
+    if residual <= velocity_tolerance:
+        return 0.0
+    damping = kd + drag
+    discriminant = damping ** 2 - 4 * inertia * kp
+    slow_pole = (damping - math.sqrt(discriminant)) / (2 * inertia) if discriminant > 0 else damping / (2 * inertia)
+    return math.log(residual / velocity_tolerance) / slow_pole
+
+
+def moment_of_inertia(width: float, length: float) -> float:
+    """Момент инерции шасси, как у Robot."""
+    return Robot.MASS * (width ** 2 + length ** 2) * Robot.MOMENT_OF_INERTIA_FACTOR
+
+
+def benchmark() -> None:
+    """Время установления и перерегулирование: PID команд против профиля, и расчетное время профиля."""
+    import contextlib
+    import io
+    from robot.headless import HeadlessSimulation
+    from robot.commands.move_command import MoveCommand
+    from robot.commands.turn_command import TurnCommand
+
+    cases = [(f"движение {d} м", lambda profiled, d=d: MoveCommand(1.0, d, profiled=profiled), d)
+             for d in (0.1, 0.5, 1.0, 3.0)]
+    cases += [(f"поворот {a}°", lambda profiled, a=a: TurnCommand(1.8, math.radians(a), profiled=profiled), a)
+              for a in (15, 90, 135)]
+
+    def run(command, target: float, integrator: str = 'euler') -> Tuple[float, float]:
+        """Время выполнения команды и наибольшее значение угла или позиции."""
+        with contextlib.redirect_stdout(io.StringIO()):  # журнал очереди команд
+            simulation = HeadlessSimulation([], (0.0, 0.0, 0.0), physics_rate=500.0, integrator=integrator)
+            simulation.add_command(command)
+            peak = 0.0
+            while simulation.completed == [] and simulation.time < 60:
+                state = simulation.step(0.002)
+                # Угол приводится к окну [цель - 270°, цель + 90°): без переноса у начала и цели
+                value = (state['x'] if isinstance(command, MoveCommand)
+                         else (math.degrees(state['theta']) - target + 270) % 360 - 270 + target)
+                peak = max(peak, value)
+        return simulation.completed[0]['duration'] if simulation.completed else math.inf, peak
+
+    mismatches = []
+    for name, make_command, target in cases:
+        scale = 100 if 'движение' in name else 1
+        pid_time, pid_peak = run(make_command(False), target)
+        command = make_command(True)
+        time, peak = run(command, target)
+        unit = 'см' if 'движение' in name else '°'
+        print(f"{name:<16} PID {pid_time:6.2f} с (перерегулирование {max(pid_peak - target, 0.0) * scale:.2f} {unit}), "
+              f"профиль {time:6.2f} с ({max(peak - target, 0.0) * scale:.2f} {unit}, "
+              f"расчет {command.predicted_duration:.2f} с): в {pid_time / time:.1f} раза быстрее")
+        for integrator in ('euler', 'exact'):
+            if integrator != 'euler':
+                command = make_command(True)
+                time, _ = run(command, target, integrator)
+            if abs(time - command.predicted_duration) > PREDICTION_TOLERANCE:
+                mismatches.append(f"{name} ({integrator}): расчет {command.predicted_duration:.2f} с, факт {time:.2f} с")
+    if mismatches:
+        raise SystemExit(f"Расчетное время расходится с фактическим больше {PREDICTION_TOLERANCE} с: "
+                         + "; ".join(mismatches))
+    print(f"Расчетное время совпадает с фактическим с точностью {PREDICTION_TOLERANCE} с (интеграторы euler и exact)")
+
+if __name__ == '__main__':
+    # Классы берутся из пакета, а не из __main__ (см. robot.world)
+    from robot import motion_profile
+    motion_profile.benchmark()
@@ -0,0 +1,317 @@
+"""
+Модуль с картой занятости (растр препятствий) и полем расстояний до ближайшего препятствия.
+
+Поле расстояний - евклидово преобразование расстояний, ограниченное сверху
+max_distance: дальше этого радиуса точное значение не нужно ни проверкам зазора,
+ни планировщику, а ограничение делает обновление при добавлении и удалении
+препятствия локальным (пересчитывается только окно вокруг препятствия).
+
+Замер построения, обновления и запросов: python -m robot.occupancy
+"""
+import math
+from collections import deque
+from typing import Deque, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from interfaces.obstacle_interface import ObstacleInterface
+from robot.world import ObstacleStore
+
+Bounds = Tuple[float, float, float, float]
+Window = Tuple[int, int, int, int]  # (ix0, iy0, ix1, iy1) включительно
+
+
+def obstacle_bounds(obstacles: Iterable[ObstacleInterface]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Габариты препятствий: массивы min_x, min_y, max_x, max_y (для ObstacleStore - без обхода объектов)."""
+    if isinstance(obstacles, ObstacleStore):
+        return obstacles.bounds()
+    boxes = []
+    for obstacle in obstacles:
+        (ox, oy), (ow, oh) = obstacle.get_position(), obstacle.get_dimensions()
+        boxes.append((ox - ow / 2, oy - oh / 2, ox + ow / 2, oy + oh / 2))
+    boxes = np.array(boxes, dtype=np.float64).reshape(-1, 4)
+    return boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+
+
+def distance_transform(occupied: np.ndarray, max_cells: int) -> np.ndarray:
+    """
+    Евклидово расстояние (в ячейках) от центра каждой ячейки до центра ближайшей занятой,
+    ограниченное значением max_cells.
+
+    Разделимая схема: сначала расстояние g по столбцу, затем по строке
+    d(x) = min по x' от (x - x')^2 + g(x')^2. Из-за ограничения достаточно |x - x'| <= max_cells,
+    поэтому второй проход - минимум по 2 * max_cells + 1 сдвигам целого массива.
+    """
+    height, width = occupied.shape
+    cap = float(max_cells)
+    if not occupied.any():
+        return np.full(occupied.shape, cap, dtype=np.float32)
+
+    # Проход по столбцам: номер ближайшей занятой строки сверху и снизу
+    rows = np.arange(height)[:, None]
+    above = np.maximum.accumulate(np.where(occupied, rows, -height - max_cells - 1), axis=0)
+    below = np.minimum.accumulate(np.where(occupied, rows, 2 * height + max_cells + 1)[::-1], axis=0)[::-1]
+    column = np.minimum(np.minimum(rows - above, below - rows), max_cells + 1).astype(np.float32)
+    column *= column
+
+    # Проход по строкам со сдвигами в пределах max_cells
+    squared = column.copy()
+    for shift in range(1, min(max_cells, width - 1) + 1):
+        penalty = np.float32(shift * shift)
+        np.minimum(squared[:, shift:], column[:, :-shift] + penalty, out=squared[:, shift:])
+        np.minimum(squared[:, :-shift], column[:, shift:] + penalty, out=squared[:, :-shift])
+    return np.minimum(np.sqrt(squared), cap)
+
+
+class OccupancyGrid:
+    """
+    Карта занятости с фиксированным разрешением и поле расстояний до препятствий.
+
+    Ячейка [iy, ix] покрывает квадрат со стороной resolution, левый нижний угол
+    карты - (origin_x, origin_y). Ячейка занята, если ее задевает хотя бы одно
+    препятствие (счетчик counts) или она занята на плане помещения (слой static).
+    Запросы clearance / is_occupied - O(1): индекс ячейки и чтение массива.
+    """
+
+    def __init__(self, bounds: Bounds, resolution: float = 0.05, max_distance: float = 2.0):
+        """
+        Args:
+            bounds: Область карты (min_x, min_y, max_x, max_y), м
+            resolution: Размер ячейки, м
+            max_distance: Предел поля расстояний, м (дальше зазор считается равным пределу)
+        """
+        min_x, min_y, max_x, max_y = bounds
+        self.resolution = resolution
+        self.origin_x, self.origin_y = min_x, min_y
+        self.width = max(1, int(math.ceil((max_x - min_x) / resolution)))
+        self.height = max(1, int(math.ceil((max_y - min_y) / resolution)))
+        self.max_cells = max(1, int(math.ceil(max_distance / resolution)))
+        self.max_distance = self.max_cells * resolution
+        self.counts = np.zeros((self.height, self.width), dtype=np.uint16)
+        self.static = np.zeros((self.height, self.width), dtype=bool)
+        self.distance = np.full((self.height, self.width), self.max_distance, dtype=np.float32)
+        self.version = 0  # растет при каждом изменении карты (для кэшей планировщика)
+        # Окна поля расстояний, измененные последними версиями: (версия, окно), None - вся карта
+        self.changes: Deque[Tuple[int, Optional[Window]]] = deque(maxlen=64)
+
+    @classmethod
+    def from_obstacles(
+        cls,
+        obstacles: Iterable[ObstacleInterface],
+        resolution: float = 0.05,
+        max_distance: float = 2.0,
+        bounds: Optional[Bounds] = None
+    ) -> "OccupancyGrid":
+        """
+        Карта по препятствиям. Область - габариты препятствий и bounds (если задана)
+        с запасом max_distance, чтобы поле расстояний у краев было полным.
+        """
+        min_x, min_y, max_x, max_y = obstacle_bounds(obstacles)
+        extent = [np.min(min_x, initial=math.inf), np.min(min_y, initial=math.inf),
+                  np.max(max_x, initial=-math.inf), np.max(max_y, initial=-math.inf)]
+        if bounds is not None:
+            extent = [min(extent[0], bounds[0]), min(extent[1], bounds[1]),
+                      max(extent[2], bounds[2]), max(extent[3], bounds[3])]
+        if not math.isfinite(extent[0]):
+            extent = [-max_distance, -max_distance, max_distance, max_distance]
+        grid = cls((extent[0] - max_distance, extent[1] - max_distance,
+                    extent[2] + max_distance, extent[3] + max_distance), resolution, max_distance)
+        grid._add_bounds(min_x, min_y, max_x, max_y)
+        return grid
+
+    @classmethod
+    def from_image(
+        cls,
+        path: str,
+        resolution: float = 0.05,
+        origin: Optional[Tuple[float, float]] = None,
+        threshold: int = 128,
+        max_distance: float = 2.0
+    ) -> "OccupancyGrid":
+        """
+        Карта по плану помещения (PNG и другие форматы pygame): пиксель - ячейка,
+        темные пиксели (яркость ниже threshold) заняты. По умолчанию план центрируется в (0, 0).
+        """
+        import pygame  # только для чтения изображения; физика от pygame не зависит
+
+        pixels = pygame.surfarray.array3d(pygame.image.load(path)).astype(np.float32)  # (ширина, высота, 3)
+        dark = pixels.mean(axis=2).T[::-1] < threshold  # строки снизу вверх, как у карты
+        height, width = dark.shape
+        if origin is None:
+            origin = (-width * resolution / 2, -height * resolution / 2)
+        grid = cls((origin[0], origin[1], origin[0] + width * resolution, origin[1] + height * resolution),
+                   resolution, max_distance)
+        grid.static[:] = dark
+        grid.recompute()
+        return grid
+
+    @property
+    def occupied(self) -> np.ndarray:
+        return (self.counts > 0) | self.static
+
+    def _cell_span(self, min_x, min_y, max_x, max_y):
+        """Диапазоны ячеек [ix0, ix1] x [iy0, iy1], задетых прямоугольником, с обрезкой по карте."""
+        res = self.resolution
+        ix0 = np.clip(np.floor((min_x - self.origin_x) / res), 0, self.width - 1).astype(np.int64)
+        iy0 = np.clip(np.floor((min_y - self.origin_y) / res), 0, self.height - 1).astype(np.int64)
+        ix1 = np.clip(np.ceil((max_x - self.origin_x) / res) - 1, ix0, self.width - 1).astype(np.int64)
+        iy1 = np.clip(np.ceil((max_y - self.origin_y) / res) - 1, iy0, self.height - 1).astype(np.int64)
+        return ix0, iy0, ix1, iy1
+
+    def _inside(self, min_x, min_y, max_x, max_y):
+        return ((max_x > self.origin_x) & (min_x < self.origin_x + self.width * self.resolution) &
+                (max_y > self.origin_y) & (min_y < self.origin_y + self.height * self.resolution))
+
+    def add_obstacles(self, obstacles: Iterable[ObstacleInterface]) -> None:
+        """Растеризует набор препятствий разом (разностный массив) и пересчитывает поле расстояний."""
+        self._add_bounds(*obstacle_bounds(obstacles))
+
+    def _add_bounds(self, *bounds: np.ndarray) -> None:
+        inside = self._inside(*bounds)
+        if not inside.any():
+            return
+        ix0, iy0, ix1, iy1 = self._cell_span(*(b[inside] for b in bounds))
+        delta = np.zeros((self.height + 1, self.width + 1), dtype=np.int32)
+        np.add.at(delta, (iy0, ix0), 1)
+        np.add.at(delta, (iy0, ix1 + 1), -1)
+        np.add.at(delta, (iy1 + 1, ix0), -1)
+        np.add.at(delta, (iy1 + 1, ix1 + 1), 1)
+        self.counts += np.cumsum(np.cumsum(delta, axis=0), axis=1)[:-1, :-1].astype(np.uint16)
+        self.recompute()
+
+    def add_obstacle(self, obstacle: ObstacleInterface) -> None:
+        self._change_obstacle(obstacle, 1)
+
+    def remove_obstacle(self, obstacle: ObstacleInterface) -> None:
+        self._change_obstacle(obstacle, -1)
+
+    def _change_obstacle(self, obstacle: ObstacleInterface, change: int) -> None:
+        (ox, oy), (ow, oh) = obstacle.get_position(), obstacle.get_dimensions()
+        box = (ox - ow / 2, oy - oh / 2, ox + ow / 2, oy + oh / 2)
+        if not self._inside(*box):
+            return
+        ix0, iy0, ix1, iy1 = (int(i) for i in self._cell_span(*box))
+        cells = self.counts[iy0:iy1 + 1, ix0:ix1 + 1]
+        if change > 0:
+            cells += 1
+        else:
+            np.subtract(cells, 1, out=cells, where=cells > 0)
+        self._refresh(ix0, iy0, ix1, iy1)
+
+    def _refresh(self, ix0: int, iy0: int, ix1: int, iy1: int) -> None:
+        """
+        Пересчет поля расстояний после изменения ячеек [ix0, ix1] x [iy0, iy1].
+
+        Изменение влияет только на ячейки ближе max_cells к нему, а их значения зависят
+        только от ячеек еще на max_cells дальше - это окно и пересчитывается.
+        """
+        m = self.max_cells
+        ax0, ay0 = max(ix0 - m, 0), max(iy0 - m, 0)
+        ax1, ay1 = min(ix1 + m, self.width - 1), min(iy1 + m, self.height - 1)
+        sx0, sy0 = max(ax0 - m, 0), max(ay0 - m, 0)
+        sx1, sy1 = min(ax1 + m, self.width - 1), min(ay1 + m, self.height - 1)
+        occupied = (self.counts[sy0:sy1 + 1, sx0:sx1 + 1] > 0) | self.static[sy0:sy1 + 1, sx0:sx1 + 1]
+        window = distance_transform(occupied, m)
+        self.distance[ay0:ay1 + 1, ax0:ax1 + 1] = window[ay0 - sy0:ay1 - sy0 + 1, ax0 - sx0:ax1 - sx0 + 1] * self.resolution
+        self.version += 1
+        self.changes.append((self.version, (ax0, ay0, ax1, ay1)))
+
+    def recompute(self) -> None:
+        """Полный пересчет поля расстояний."""
+        self.distance = distance_transform(self.occupied, self.max_cells) * np.float32(self.resolution)
+        self.version += 1
+        self.changes.append((self.version, None))
+
+    def changed_since(self, version: int) -> Optional[List[Window]]:
+        """Окна поля расстояний, измененные после версии version; None - изменилась вся карта или журнал не помнит версию."""
+        if version == self.version:
+            return []
+        if not self.changes or self.changes[0][0] > version + 1:
+            return None
+        windows = [window for changed, window in self.changes if changed > version]
+        return None if None in windows else windows
+
+    def world_to_cell(self, x: float, y: float) -> Tuple[int, int]:
+        """Индексы (ix, iy) ячейки, содержащей точку (могут лежать вне карты)."""
+        return (int(math.floor((x - self.origin_x) / self.resolution)),
+                int(math.floor((y - self.origin_y) / self.resolution)))
+
+    def cell_to_world(self, ix: int, iy: int) -> Tuple[float, float]:
+        """Центр ячейки в мировых координатах."""
+        return (self.origin_x + (ix + 0.5) * self.resolution,
+                self.origin_y + (iy + 0.5) * self.resolution)
+
+    def contains(self, x: float, y: float) -> bool:
+        ix, iy = self.world_to_cell(x, y)
+        return 0 <= ix < self.width and 0 <= iy < self.height
+
+    def is_occupied(self, x: float, y: float) -> bool:
+        """Занята ли ячейка с точкой; вне карты - свободно."""
+        ix, iy = self.world_to_cell(x, y)
+        if not (0 <= ix < self.width and 0 <= iy < self.height):
+            return False
+        return bool(self.counts[iy, ix]) or bool(self.static[iy, ix])
+
+    def clearance(self, x: float, y: float) -> float:
+        """
+        Расстояние от точки до ближайшей занятой ячейки (м) с точностью до размера ячейки,
+        не больше max_distance; вне карты - max_distance.
+        """
+        ix, iy = self.world_to_cell(x, y)
+        if not (0 <= ix < self.width and 0 <= iy < self.height):
+            return self.max_distance
+        return float(self.distance[iy, ix])
+
+
+def benchmark() -> None:
+    """Построение карты для склада, локальное обновление по 'O'/'P' и запросы зазора против перебора препятствий."""
+    import random
+    import time
+
+    for count, resolution in ((1_000, 0.05), (100_000, 0.2)):
+        side = int(math.ceil(math.sqrt(count)))
+        index = np.arange(count)
+        store = ObstacleStore.from_boxes(np.column_stack([(index % side) * 1.2, (index // side) * 2.4 + 2.0,
+                                                          np.full(count, 1.0), np.full(count, 0.4)]))
+        start = time.perf_counter()
+        grid = OccupancyGrid.from_obstacles(store, resolution=resolution)
+        build_time = time.perf_counter() - start
+        print(f"{count} препятствий, ячейка {resolution} м: карта {grid.width}x{grid.height}, "
+              f"построение {build_time * 1000:.1f} мс")
+
+        # Добавление и удаление препятствия сверяются с полным пересчетом
+        random.seed(0)
+        reference = store.append(random.uniform(0, side), random.uniform(0, side * 2), 1.0, 1.0)
+        start = time.perf_counter()
+        grid.add_obstacle(reference)
+        add_time = time.perf_counter() - start
+        incremental = grid.distance.copy()
+        grid.recompute()
+        add_error = float(np.abs(incremental - grid.distance).max())
+        start = time.perf_counter()
+        grid.remove_obstacle(reference)
+        remove_time = time.perf_counter() - start
+        incremental = grid.distance.copy()
+        grid.recompute()
+        remove_error = float(np.abs(incremental - grid.distance).max())
+        store.remove_last()
+        print(f"  добавление {add_time * 1000:.2f} мс, удаление {remove_time * 1000:.2f} мс, "
+              f"расхождение с полным пересчетом {max(add_error, remove_error):.1e} м")
+
+        points = [(random.uniform(0, side * 1.2), random.uniform(0, side * 2.4)) for _ in range(2000)]
+        start = time.perf_counter()
+        for x, y in points:
+            grid.clearance(x, y)
+        grid_time = (time.perf_counter() - start) / len(points)
+        start = time.perf_counter()
+        for x, y in points[:50]:
+            min(math.hypot(max(abs(x - ox) - ow / 2, 0.0), max(abs(y - oy) - oh / 2, 0.0))
+                for (ox, oy), (ow, oh) in ((o.get_position(), o.get_dimensions()) for o in store))
+        scan_time = (time.perf_counter() - start) / 50
+        print(f"  запрос зазора: карта {grid_time * 1e6:.2f} мкс, перебор препятствий {scan_time * 1e3:.2f} мс")
+
+
+if __name__ == '__main__':
+    # Классы берутся из пакета, а не из __main__ (см. robot.world)
+    from robot import occupancy
+    occupancy.benchmark()
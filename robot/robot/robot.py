@@ -6,6 +6,9 @@ from typing import Tuple, List
 
 from interfaces.robot_interface import RobotInterface
 from interfaces.obstacle_interface import ObstacleInterface
+from robot.spatial_index import ObstacleGrid
+from robot.swept_collision import time_of_impact
+from robot.integrators import drag_velocity_step, arc_displacement
 
 class Robot(RobotInterface):
     # Физические свойства
@@ -25,11 +28,26 @@ class Robot(RobotInterface):
 
     HITBOX_SCALE_FACTOR = 0.2
 
+    # Режимы проверки столкновений: дробление шага с проверкой SAT на каждом подшаге
+    # или непрерывная проверка (время касания за один проход на шаг)
+    COLLISION_MODES = ('substep', 'swept')
+    # Интеграторы: явный Эйлер с прямолинейными отрезками или точное решение
+    # уравнения сопротивления с движением по дуге (точен и на крупном шаге)
+    INTEGRATORS = ('euler', 'exact')
+
     def __init__(
         self,
         x: float = 0.0, y: float = 0.0, theta: float = 0.0,
-        width: float = 0.5, length: float = 0.5
+        width: float = 0.5, length: float = 0.5,
+        collision_mode: str = 'substep',
+        integrator: str = 'euler'
     ):
+        if collision_mode not in self.COLLISION_MODES:
+            raise ValueError(f"Неизвестный режим столкновений: {collision_mode}")
+        if integrator not in self.INTEGRATORS:
+            raise ValueError(f"Неизвестный интегратор: {integrator}")
+        self.collision_mode = collision_mode
+        self.integrator = integrator
         self.x, self.y, self.theta = x, y, theta % (2 * math.pi)
         self.width, self.length = width, length
         self.moment_of_inertia = self.MASS * (width**2 + length**2) * self.MOMENT_OF_INERTIA_FACTOR
@@ -37,7 +55,7 @@ class Robot(RobotInterface):
         self.angular_velocity = 0.0
         self.target_linear_force = 0.0
         self.target_angular_torque = 0.0
-        self.obstacles: List[ObstacleInterface] = []
+        self.obstacle_index = ObstacleGrid()
         self.is_collided = False
 
     def set_chassis_forces(self, linear_force: float, angular_torque: float) -> None:
@@ -46,6 +64,9 @@ class Robot(RobotInterface):
 
     def update(self, dt: float) -> None:
         if self.is_collided: return
+        if self.integrator == 'exact':
+            self._update_exact(dt)
+            return
         linear_drag_force = -self.linear_velocity * self.LINEAR_DRAG_COEFFICIENT
         angular_drag_torque = -self.angular_velocity * self.ANGULAR_DRAG_COEFFICIENT
         net_force = self.target_linear_force + linear_drag_force
@@ -57,6 +78,9 @@ class Robot(RobotInterface):
         self.linear_velocity = max(-self.MAX_LINEAR_SPEED, min(self.MAX_LINEAR_SPEED, self.linear_velocity))
         self.angular_velocity = max(-self.MAX_ANGULAR_SPEED, min(self.MAX_ANGULAR_SPEED, self.angular_velocity))
         if abs(self.linear_velocity) < 1e-6 and abs(self.angular_velocity) < 1e-6: return
+        if self.collision_mode == 'swept':
+            self._update_swept(self.linear_velocity * dt, self.angular_velocity * dt)
+            return
         total_dist = abs(self.linear_velocity) * dt
         num_steps = int(math.ceil(total_dist / (self.length / 4.0))) or 1
         step_dt = dt / num_steps
@@ -67,15 +91,78 @@ class Robot(RobotInterface):
             self.theta = (self.theta + self.angular_velocity * step_dt) % (2 * math.pi)
             if self._check_body_collision_sat():
                 print("[Робот] СТОЛКНОВЕНИЕ (SAT)! Аварийная остановка.")
-                self.is_collided = True; self.x, self.y, self.theta = prev_x, prev_y, prev_theta
-                self.linear_velocity, self.angular_velocity = 0.0, 0.0
-                self.target_linear_force, self.target_angular_torque = 0.0, 0.0
+                self._stop_on_collision(prev_x, prev_y, prev_theta)
+                return
+
+    def _update_exact(self, dt: float) -> None:
+        """Шаг с точным решением для скоростей и смещением по дуге."""
+        self.linear_velocity, distance = drag_velocity_step(
+            self.linear_velocity, self.target_linear_force, self.LINEAR_DRAG_COEFFICIENT,
+            self.MASS, self.MAX_LINEAR_SPEED, dt)
+        self.angular_velocity, rotation = drag_velocity_step(
+            self.angular_velocity, self.target_angular_torque, self.ANGULAR_DRAG_COEFFICIENT,
+            self.moment_of_inertia, self.MAX_ANGULAR_SPEED, dt)
+        if abs(distance) < 1e-9 and abs(rotation) < 1e-9: return
+        if self.collision_mode == 'swept':
+            self._update_swept(distance, rotation)
+            return
+        num_steps = int(math.ceil(abs(distance) / (self.length / 4.0))) or 1
+        step_distance, step_rotation = distance / num_steps, rotation / num_steps
+        for _ in range(num_steps):
+            prev_x, prev_y, prev_theta = self.x, self.y, self.theta
+            dx, dy = arc_displacement(prev_theta, step_distance, step_rotation)
+            self.x += dx
+            self.y += dy
+            self.theta = (self.theta + step_rotation) % (2 * math.pi)
+            if self._check_body_collision_sat():
+                print("[Робот] СТОЛКНОВЕНИЕ (SAT)! Аварийная остановка.")
+                self._stop_on_collision(prev_x, prev_y, prev_theta)
                 return
 
+    def _update_swept(self, distance: float, rotation: float) -> None:
+        """Шаг с непрерывной проверкой: робот останавливается в позе касания."""
+        prev_x, prev_y, prev_theta = self.x, self.y, self.theta
+        if self.integrator == 'exact':
+            # Хорда дуги: хитбокс сдвигается по ней, поворот проверяется в конечной позе
+            dx, dy = arc_displacement(prev_theta, distance, rotation)
+        else:
+            dx, dy = distance * math.cos(prev_theta), distance * math.sin(prev_theta)
+        corners = self._hitbox_corners()
+        xs = [corner[0] for corner in corners]; ys = [corner[1] for corner in corners]
+        candidates = self.obstacle_index.query(min(xs) + min(dx, 0.0), min(ys) + min(dy, 0.0),
+                                               max(xs) + max(dx, 0.0), max(ys) + max(dy, 0.0))
+        hit = time_of_impact(corners, dx, dy, candidates) if candidates else None
+        if hit is not None:
+            t = hit[0]
+            print(f"[Робот] СТОЛКНОВЕНИЕ (swept, t={t:.3f})! Аварийная остановка.")
+            self._stop_on_collision(prev_x + dx * t, prev_y + dy * t, (prev_theta + rotation * t) % (2 * math.pi))
+            return
+
+        self.x, self.y = prev_x + dx, prev_y + dy
+        self.theta = (prev_theta + rotation) % (2 * math.pi)
+        # Поворот за шаг рассчитан отдельно: касание из-за него проверяется в конечной позе
+        if rotation and self._check_body_collision_sat():
+            print("[Робот] СТОЛКНОВЕНИЕ при повороте! Аварийная остановка.")
+            self._stop_on_collision(prev_x, prev_y, prev_theta)
+
+    def _stop_on_collision(self, x: float, y: float, theta: float) -> None:
+        self.is_collided = True; self.x, self.y, self.theta = x, y, theta
+        self.linear_velocity, self.angular_velocity = 0.0, 0.0
+        self.target_linear_force, self.target_angular_torque = 0.0, 0.0
+
     def get_position(self) -> Tuple[float, float, float]: return self.x, self.y, self.theta
     def get_chassis_velocities(self) -> Tuple[float, float]: return self.linear_velocity, self.angular_velocity
     def get_robot_dimensions(self) -> Tuple[float, float]: return self.width, self.length
-    def set_obstacles(self, obstacles: List[ObstacleInterface]) -> None: self.obstacles = obstacles
+    def set_obstacles(self, obstacles: List[ObstacleInterface]) -> None:
+        # Препятствия хранит вызывающий (список или ObstacleStore); робот держит только сетку
+        self.obstacle_index.rebuild(obstacles)
+
+    def add_obstacle(self, obstacle: ObstacleInterface) -> None:
+        self.obstacle_index.add(obstacle)
+
+    def remove_obstacle(self, obstacle: ObstacleInterface) -> None:
+        self.obstacle_index.remove(obstacle)
+
     def get_wheel_speeds(self) -> Tuple[float, float]:
         r_v = self.linear_velocity + (self.angular_velocity * self.width / 2)
         l_v = self.linear_velocity - (self.angular_velocity * self.width / 2)
@@ -96,33 +183,42 @@ class Robot(RobotInterface):
         l_v = target_linear_v - (target_angular_v * self.width / 2)
         return l_v, r_v
 
-    def _check_body_collision_sat(self):
-        if not self.obstacles: return None
-
+    def _hitbox_corners(self):
         hitbox_width = self.width * self.HITBOX_SCALE_FACTOR
         hitbox_length = self.length * self.HITBOX_SCALE_FACTOR
         hw, hl = hitbox_width / 2, hitbox_length / 2
 
         cos_t, sin_t = math.cos(self.theta), math.sin(self.theta)
-        robot_corners = [(self.x + lx*cos_t - ly*sin_t, self.y + lx*sin_t + ly*cos_t) for lx, ly in [(-hl,-hw),(hl,-hw),(hl,hw),(-hl,hw)]]
-        for obstacle in self.obstacles:
-            ox, oy = obstacle.get_position(); ow, oh = obstacle.get_dimensions()
-            obstacle_corners = [(ox-ow/2,oy-oh/2),(ox+ow/2,oy-oh/2),(ox+ow/2,oy+oh/2),(ox-ow/2,oy+oh/2)]
-            axes = [(robot_corners[1][0]-robot_corners[0][0], robot_corners[1][1]-robot_corners[0][1]), (robot_corners[3][0]-robot_corners[0][0], robot_corners[3][1]-robot_corners[0][1]), (1,0), (0,1)]
+        return [(self.x + lx*cos_t - ly*sin_t, self.y + lx*sin_t + ly*cos_t) for lx, ly in [(-hl,-hw),(hl,-hw),(hl,hw),(-hl,hw)]]
+
+    def _check_body_collision_sat(self):
+        if not self.obstacle_index: return None
+
+        robot_corners = self._hitbox_corners()
+        xs = [corner[0] for corner in robot_corners]; ys = [corner[1] for corner in robot_corners]
+        # Широкая фаза: только препятствия, габариты которых пересекают габариты хитбокса.
+        # Это совпадает с проверкой SAT по мировым осям (1,0) и (0,1)
+        candidates = self.obstacle_index.query(min(xs), min(ys), max(xs), max(ys))
+        if not candidates: return None
+
+        # Узкая фаза: оставшиеся оси SAT - стороны робота
+        axes = [self._normalize(robot_corners[1][0]-robot_corners[0][0], robot_corners[1][1]-robot_corners[0][1]),
+                self._normalize(robot_corners[3][0]-robot_corners[0][0], robot_corners[3][1]-robot_corners[0][1])]
+        robot_projections = [self._project_shape(robot_corners, axis) for axis in axes]
+        for candidate in candidates:
             collision = True
-            for axis in axes:
-                robot_min, robot_max = self._project_shape(robot_corners, axis)
-                obstacle_min, obstacle_max = self._project_shape(obstacle_corners, axis)
+            for axis, (robot_min, robot_max) in zip(axes, robot_projections):
+                obstacle_min, obstacle_max = self._project_shape(candidate.corners, axis)
                 if robot_max < obstacle_min or obstacle_max < robot_min: collision = False; break
-            if collision: return obstacle
+            if collision: return candidate.obstacle
         return None
 
-    def _project_shape(self, corners, axis):
-        axis_len = math.sqrt(axis[0]**2 + axis[1]**2)
-        if axis_len == 0: return 0,0
-        norm_axis = (axis[0] / axis_len, axis[1] / axis_len)
-        min_proj, max_proj = float('inf'), float('-inf')
-        for corner in corners:
-            projection = corner[0] * norm_axis[0] + corner[1] * norm_axis[1]
-            min_proj, max_proj = min(min_proj, projection), max(max_proj, projection)
-        return min_proj, max_proj
\ No newline at end of file
+    @staticmethod
+    def _normalize(ax, ay):
+        axis_len = math.sqrt(ax**2 + ay**2)
+        return (ax / axis_len, ay / axis_len) if axis_len else (0.0, 0.0)
+
+    @staticmethod
+    def _project_shape(corners, norm_axis):
+        projections = [corner[0] * norm_axis[0] + corner[1] * norm_axis[1] for corner in corners]
+        return min(projections), max(projections)
@@ -0,0 +1,62 @@
+"""
+Модуль с часами симуляции с фиксированным шагом.
+"""
+import time
+from typing import Optional
+
+
+class FixedStepClock:
+    """
+    Накопитель реального времени кадров, выдающий целое число шагов фиксированной длины.
+
+    Физика и регуляторы продвигаются шагами dt независимо от частоты кадров отрисовки:
+    пропущенный кадр дает несколько шагов в следующем кадре, а не один увеличенный шаг.
+    Остаток накопителя (alpha, доля шага) используется для интерполяции позы при отрисовке.
+    Слишком долгий кадр обрезается до max_frame_time, чтобы не уйти в «спираль смерти»:
+    симуляция в этом случае отстает от реального времени, но шаг остается прежним.
+    """
+
+    def __init__(self, rate_hz: float = 500.0, max_frame_time: float = 0.25):
+        """
+        Args:
+            rate_hz: Частота шагов симуляции (Гц)
+            max_frame_time: Максимальное время кадра, учитываемое за один вызов tick (с)
+        """
+        self.dt = 1.0 / rate_hz
+        self.max_frame_time = max_frame_time
+        self.accumulator = 0.0
+        self.sim_time = 0.0
+        self.dropped_time = 0.0
+        self.last_time: Optional[float] = None
+
+    def tick(self, now: Optional[float] = None) -> int:
+        """
+        Учитывает время с прошлого вызова.
+
+        Returns:
+            int: Число шагов dt, которые нужно выполнить в этом кадре
+        """
+        now = time.monotonic() if now is None else now
+        if self.last_time is None:
+            self.last_time = now
+            return 0
+        frame_time = now - self.last_time
+        self.last_time = now
+        if frame_time > self.max_frame_time:
+            self.dropped_time += frame_time - self.max_frame_time
+            frame_time = self.max_frame_time
+
+        self.accumulator += frame_time
+        steps = int(self.accumulator / self.dt)
+        self.accumulator -= steps * self.dt
+        self.sim_time += steps * self.dt
+        return steps
+
+    @property
+    def alpha(self) -> float:
+        """Доля шага, накопленная после последнего выполненного шага (0..1)."""
+        return min(1.0, self.accumulator / self.dt)
+
+    def reset(self) -> None:
+        self.accumulator = 0.0
+        self.last_time = None
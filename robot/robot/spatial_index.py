@@ -0,0 +1,185 @@
+"""
+Модуль с равномерной сеткой для быстрого поиска препятствий рядом с роботом (широкая фаза).
+
+Замер времени шага робота в зависимости от числа препятствий: python -m robot.spatial_index
+"""
+import math
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from interfaces.obstacle_interface import ObstacleInterface
+from robot.world import ObstacleStore, ObstacleView
+
+
+def _cell_key(ix, iy):
+    """Ключ ячейки одним целым числом (скаляры или массивы int64)."""
+    return ix * (1 << 32) + (iy + (1 << 31))
+
+
+class IndexedObstacle:
+    """Препятствие с заранее вычисленными углами и габаритным прямоугольником."""
+
+    __slots__ = ('obstacle', 'corners', 'min_x', 'min_y', 'max_x', 'max_y')
+
+    def __init__(self, obstacle: ObstacleInterface):
+        ox, oy = obstacle.get_position(); ow, oh = obstacle.get_dimensions()
+        self.obstacle = obstacle
+        self.min_x, self.max_x = ox - ow / 2, ox + ow / 2
+        self.min_y, self.max_y = oy - oh / 2, oy + oh / 2
+        self.corners = ((self.min_x, self.min_y), (self.max_x, self.min_y),
+                        (self.max_x, self.max_y), (self.min_x, self.max_y))
+
+
+class ObstacleGrid:
+    """
+    Равномерная сетка: ячейка -> препятствия, габариты которых ее задевают.
+
+    Запрос по прямоугольнику возвращает только препятствия из задетых им ячеек,
+    поэтому стоимость проверки столкновений зависит от плотности препятствий
+    рядом с роботом, а не от их общего числа.
+
+    Хранилище ObstacleStore раскладывается по ячейкам векторно: для каждой ячейки
+    запоминается лишь диапазон индексов, а записи IndexedObstacle создаются при
+    первом запросе ячейки. Так сетка для карты из 100 тыс. препятствий строится
+    за миллисекунды, а робот платит только за ячейки, по которым проехал.
+    """
+
+    def __init__(self, cell_size: float = 1.0):
+        """
+        Args:
+            cell_size: Размер ячейки сетки (м)
+        """
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], List[IndexedObstacle]] = {}
+        self.entries: Dict[ObstacleInterface, IndexedObstacle] = {}
+        # Хранилище, разложенное по ячейкам: отсортированные ключи ячеек, границы их
+        # диапазонов в cell_indices и множество уже развернутых ячеек
+        self.store: Optional[ObstacleStore] = None
+        self.cell_keys = np.zeros(0, dtype=np.int64)
+        self.cell_bounds = np.zeros(1, dtype=np.int64)
+        self.cell_indices = np.zeros(0, dtype=np.int64)
+        self.expanded: Set[Tuple[int, int]] = set()
+        self.count = 0
+
+    def _cell_range(self, min_x: float, min_y: float, max_x: float, max_y: float):
+        size = self.cell_size
+        for ix in range(math.floor(min_x / size), math.floor(max_x / size) + 1):
+            for iy in range(math.floor(min_y / size), math.floor(max_y / size) + 1):
+                yield ix, iy
+
+    def rebuild(self, obstacles: Iterable[ObstacleInterface]) -> None:
+        self.cells.clear()
+        self.entries.clear()
+        self.expanded.clear()
+        self.store, self.count = None, 0
+        if isinstance(obstacles, ObstacleStore):
+            self._rebuild_from_store(obstacles)
+            return
+        for obstacle in obstacles:
+            self.add(obstacle)
+
+    def _rebuild_from_store(self, store: ObstacleStore) -> None:
+        self.store, self.count = store, len(store)
+        size = self.cell_size
+        min_x, min_y, max_x, max_y = store.bounds()
+        first_x, first_y = np.floor(min_x / size).astype(np.int64), np.floor(min_y / size).astype(np.int64)
+        span_x = np.floor(max_x / size).astype(np.int64) - first_x + 1
+        span_y = np.floor(max_y / size).astype(np.int64) - first_y + 1
+
+        # Пары (препятствие, ячейка) для всех задетых ячеек, сгруппированные по ключу ячейки
+        counts = span_x * span_y
+        owner = np.repeat(np.arange(len(store)), counts)
+        offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        keys = _cell_key(first_x[owner] + offset // span_y[owner], first_y[owner] + offset % span_y[owner])
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        self.cell_keys = keys[starts]
+        self.cell_bounds = np.append(starts, len(keys))
+        self.cell_indices = owner[order]
+
+    def _expand(self, cell: Tuple[int, int]) -> None:
+        """Создает записи препятствий хранилища в ячейке при первом обращении к ней."""
+        self.expanded.add(cell)
+        position = int(np.searchsorted(self.cell_keys, _cell_key(*cell)))
+        if position == len(self.cell_keys) or self.cell_keys[position] != _cell_key(*cell):
+            return
+        bucket = self.cells.setdefault(cell, [])
+        start, end = self.cell_bounds[position], self.cell_bounds[position + 1]
+        for index in self.cell_indices[start:end].tolist():
+            obstacle = ObstacleView(self.store, index)
+            entry = self.entries.get(obstacle)
+            if entry is None:
+                entry = self.entries[obstacle] = IndexedObstacle(obstacle)
+            bucket.append(entry)
+
+    def add(self, obstacle: ObstacleInterface) -> None:
+        entry = IndexedObstacle(obstacle)
+        self.entries[obstacle] = entry
+        self.count += 1
+        for cell in self._cell_range(entry.min_x, entry.min_y, entry.max_x, entry.max_y):
+            if self.store is not None and cell not in self.expanded: self._expand(cell)
+            self.cells.setdefault(cell, []).append(entry)
+
+    def remove(self, obstacle: ObstacleInterface) -> None:
+        if self.store is not None:
+            # Все ячейки препятствия должны быть развернуты, чтобы убрать его из каждой
+            ox, oy = obstacle.get_position(); ow, oh = obstacle.get_dimensions()
+            for cell in self._cell_range(ox - ow / 2, oy - oh / 2, ox + ow / 2, oy + oh / 2):
+                if cell not in self.expanded: self._expand(cell)
+        entry = self.entries.pop(obstacle, None)
+        if entry is None:
+            return
+        self.count -= 1
+        for cell in self._cell_range(entry.min_x, entry.min_y, entry.max_x, entry.max_y):
+            bucket = self.cells[cell]
+            bucket.remove(entry)
+            if not bucket: del self.cells[cell]
+
+    def query(self, min_x: float, min_y: float, max_x: float, max_y: float) -> List[IndexedObstacle]:
+        """Препятствия, габариты которых пересекают заданный прямоугольник."""
+        found: Dict[int, IndexedObstacle] = {}
+        lazy = self.store is not None
+        for cell in self._cell_range(min_x, min_y, max_x, max_y):
+            if lazy and cell not in self.expanded: self._expand(cell)
+            for entry in self.cells.get(cell, ()):
+                if entry.max_x < min_x or max_x < entry.min_x or entry.max_y < min_y or max_y < entry.min_y:
+                    continue
+                found[id(entry)] = entry
+        return list(found.values())
+
+    def __len__(self) -> int:
+        return self.count
+
+
+def benchmark(updates: int = 5000) -> None:
+    """Время шага робота, движущегося сквозь пустой коридор, при разном числе препятствий."""
+    import random
+    import time
+    from robot.robot import Robot
+
+    class Box(ObstacleInterface):
+        def __init__(self, x, y, w, h): self.x, self.y, self.w, self.h = x, y, w, h
+        def get_position(self): return self.x, self.y
+        def get_dimensions(self): return self.w, self.h
+
+    random.seed(0)
+    for count in (4, 100, 1000, 5000):
+        # Препятствия по всему полю 200x200 м, кроме коридора вдоль оси X
+        obstacles = []
+        while len(obstacles) < count:
+            x, y = random.uniform(-100, 100), random.uniform(-100, 100)
+            if abs(y) > 2: obstacles.append(Box(x, y, random.uniform(0.2, 2), random.uniform(0.2, 2)))
+        robot = Robot(x=-50, y=0, theta=0)
+        robot.set_obstacles(obstacles)
+        robot.set_chassis_forces(Robot.MAX_DRIVE_FORCE, 0.0)
+        start = time.perf_counter()
+        for _ in range(updates):
+            robot.update(1.0 / 500.0)
+        elapsed = time.perf_counter() - start
+        print(f"{count:5d} препятствий: {elapsed / updates * 1e6:6.1f} мкс/шаг, столкновение: {robot.is_collided}")
+
+
+if __name__ == '__main__':
+    benchmark()
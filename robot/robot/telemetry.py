@@ -0,0 +1,66 @@
+"""
+Модуль с публикацией телеметрии робота через ZeroMQ.
+"""
+import json
+import time
+from typing import Optional
+
+import zmq
+
+from interfaces.robot_interface import RobotInterface
+from robot.command_queue import CommandQueue
+
+
+class TelemetryPublisher:
+    """
+    Публикует состояние робота с заданной частотой на отдельном сокете PUB.
+
+    Сокет работает с ZMQ_CONFLATE: в очереди хранится только последнее
+    сообщение, поэтому медленные подписчики всегда видят актуальное состояние,
+    а стоимость публикации не растет с числом наблюдателей.
+    """
+
+    TOPIC_PREFIX = "telemetry/"
+
+    def __init__(self, context: zmq.Context, endpoint: str, robot_id: str, rate_hz: float = 10.0):
+        """
+        Args:
+            context: Контекст ZeroMQ
+            endpoint: Адрес привязки сокета телеметрии
+            robot_id: Идентификатор робота
+            rate_hz: Частота публикации (Гц)
+        """
+        self.robot_id = robot_id
+        self.period = 1.0 / rate_hz if rate_hz > 0 else 0.0
+        self.topic = f"{self.TOPIC_PREFIX}{robot_id}/ "
+        self.socket = context.socket(zmq.PUB)
+        self.socket.setsockopt(zmq.CONFLATE, 1)
+        self.socket.setsockopt(zmq.LINGER, 0)
+        self.socket.bind(endpoint)
+        self.last_publish_time: Optional[float] = None
+        print(f"[Телеметрия] Публикация состояния на {endpoint} с частотой {rate_hz:.0f} Гц")
+
+    def publish_if_due(self, robot: RobotInterface, command_queue: CommandQueue) -> None:
+        now = time.monotonic()
+        if self.last_publish_time is not None and now - self.last_publish_time < self.period:
+            return
+        self.last_publish_time = now
+
+        x, y, theta = robot.get_position()
+        linear_v, angular_v = robot.get_chassis_velocities()
+        active_command = command_queue.get_active_command()
+        state = {
+            "robot_id": self.robot_id,
+            "timestamp": now,
+            "x": x, "y": y, "theta": theta,
+            "linear_velocity": linear_v, "angular_velocity": angular_v,
+            "is_collided": robot.is_collided,
+            "active_command": active_command.get_description() if active_command else None,
+            "queue_length": len(command_queue.commands),
+            "queue_compacted": command_queue.compacted,
+        }
+        # Одно составное сообщение: CONFLATE не поддерживает многочастные сообщения
+        self.socket.send_string(self.topic + json.dumps(state, ensure_ascii=False), zmq.NOBLOCK)
+
+    def close(self) -> None:
+        self.socket.close()
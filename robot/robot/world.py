@@ -0,0 +1,275 @@
+"""
+Модуль с файлами карт (мира) и хранилищем препятствий на массивах.
+
+Два формата карты:
+- JSON для ручного редактирования:
+  {"version": 1, "obstacles": [{"x": 2, "y": 2, "width": 1, "height": 1, "color": [120, 120, 120]}, ...]}
+- двоичный (.world) для больших карт: заголовок WORLD_HEADER (сигнатура, версия,
+  число препятствий), затем записи RECORD_DTYPE подряд. Файл отображается в память
+  через numpy.memmap: при загрузке записи не копируются, а только проверяются
+  одним векторным проходом (конечные координаты, положительные размеры).
+
+Любая ошибка содержимого карты - WorldFormatError.
+
+Преобразование JSON -> двоичный формат: python -m robot.world карта.json карта.world
+Замер загрузки большой карты: python -m robot.world
+"""
+import json
+import math
+import os
+import struct
+from typing import Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+from interfaces.obstacle_interface import ObstacleInterface
+
+WORLD_MAGIC = b'VCWORLD\x00'
+WORLD_VERSION = 1
+WORLD_HEADER = struct.Struct('<8sII')  # сигнатура, версия, число препятствий
+
+# Запись препятствия: центр, размеры (м) и цвет RGB; выравнивание до 40 байт
+RECORD_DTYPE = np.dtype([
+    ('x', '<f8'), ('y', '<f8'), ('width', '<f8'), ('height', '<f8'),
+    ('color', 'u1', (3,)), ('_pad', 'u1', (5,)),
+])
+
+DEFAULT_COLOR: Tuple[int, int, int] = (120, 120, 120)
+
+
+class WorldFormatError(ValueError):
+    """Файл карты поврежден или имеет неподдерживаемый формат."""
+
+
+class ObstacleStore:
+    """
+    Препятствия карты в одном структурированном массиве RECORD_DTYPE.
+
+    Отдельные препятствия доступны как легкие представления ObstacleView (индекс
+    в хранилище), которые создаются по запросу. Массив, отображенный из файла,
+    только читается; при первом добавлении он копируется в память.
+    """
+
+    def __init__(self, records: Optional[np.ndarray] = None):
+        """
+        Args:
+            records: Массив записей RECORD_DTYPE (в том числе numpy.memmap)
+        """
+        self.records = np.zeros(0, dtype=RECORD_DTYPE) if records is None else records
+        self.size = len(self.records)
+        self._bounds: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = None
+
+    @classmethod
+    def from_boxes(cls, boxes: Sequence[Tuple[float, float, float, float]],
+                   color: Tuple[int, int, int] = DEFAULT_COLOR) -> "ObstacleStore":
+        """Хранилище из списка (x, y, ширина, высота) с общим цветом."""
+        records = np.zeros(len(boxes), dtype=RECORD_DTYPE)
+        if len(boxes):
+            boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+            for column, field in enumerate(('x', 'y', 'width', 'height')):
+                records[field] = boxes[:, column]
+            records['color'] = color
+        return cls(records)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, index: int) -> "ObstacleView":
+        if index < 0: index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError(f"Нет препятствия с индексом {index}")
+        return ObstacleView(self, index)
+
+    def __iter__(self) -> Iterator["ObstacleView"]:
+        for index in range(self.size):
+            yield ObstacleView(self, index)
+
+    @property
+    def boxes(self) -> np.ndarray:
+        """Записи хранилища (без запаса под добавление)."""
+        return self.records[:self.size]
+
+    def bounds(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Габариты всех препятствий: массивы min_x, min_y, max_x, max_y."""
+        if self._bounds is None:
+            boxes = self.boxes
+            half_w, half_h = boxes['width'] / 2, boxes['height'] / 2
+            self._bounds = (boxes['x'] - half_w, boxes['y'] - half_h, boxes['x'] + half_w, boxes['y'] + half_h)
+        return self._bounds
+
+    def query(self, min_x: float, min_y: float, max_x: float, max_y: float) -> np.ndarray:
+        """Индексы препятствий, габариты которых пересекают прямоугольник (например, видимую область)."""
+        low_x, low_y, high_x, high_y = self.bounds()
+        return np.flatnonzero((high_x >= min_x) & (low_x <= max_x) & (high_y >= min_y) & (low_y <= max_y))
+
+    def append(self, x: float, y: float, width: float, height: float,
+               color: Tuple[int, int, int] = DEFAULT_COLOR) -> "ObstacleView":
+        if self.size == len(self.records) or not self.records.flags.writeable:
+            grown = np.zeros(max(16, self.size * 2), dtype=RECORD_DTYPE)
+            grown[:self.size] = self.boxes
+            self.records = grown
+        self.records[self.size] = (x, y, width, height, tuple(color), (0,) * 5)
+        self.size += 1
+        self._bounds = None
+        return ObstacleView(self, self.size - 1)
+
+    def remove_last(self) -> None:
+        """Удаляет последнее препятствие (представления на него становятся недействительными)."""
+        if not self.size:
+            raise IndexError("Хранилище препятствий пусто")
+        self.size -= 1
+        self._bounds = None
+
+
+class ObstacleView(ObstacleInterface):
+    """Препятствие хранилища ObstacleStore по индексу; равны представления одной записи."""
+
+    __slots__ = ('store', 'index')
+
+    def __init__(self, store: ObstacleStore, index: int):
+        self.store = store
+        self.index = index
+
+    def get_position(self) -> Tuple[float, float]:
+        record = self.store.records[self.index]
+        return float(record['x']), float(record['y'])
+
+    def get_dimensions(self) -> Tuple[float, float]:
+        record = self.store.records[self.index]
+        return float(record['width']), float(record['height'])
+
+    def get_color(self) -> Tuple[int, int, int]:
+        return tuple(int(c) for c in self.store.records[self.index]['color'])
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, ObstacleView) and other.store is self.store and other.index == self.index
+
+    def __hash__(self) -> int:
+        return hash((id(self.store), self.index))
+
+
+def load_world(path: str) -> ObstacleStore:
+    """Загружает карту: .json - текстовый формат, иначе - двоичный через numpy.memmap."""
+    if path.lower().endswith('.json'):
+        return _load_json(path)
+    with open(path, 'rb') as f:
+        header = f.read(WORLD_HEADER.size)
+    if len(header) < WORLD_HEADER.size:
+        raise WorldFormatError(f"{path}: файл короче заголовка")
+    magic, version, count = WORLD_HEADER.unpack(header)
+    if magic != WORLD_MAGIC:
+        raise WorldFormatError(f"{path}: не файл карты (сигнатура {magic!r})")
+    if version != WORLD_VERSION:
+        raise WorldFormatError(f"{path}: неподдерживаемая версия формата {version}")
+    expected = WORLD_HEADER.size + count * RECORD_DTYPE.itemsize
+    if os.path.getsize(path) != expected:
+        raise WorldFormatError(f"{path}: размер {os.path.getsize(path)} байт, ожидалось {expected}")
+    if not count:
+        return ObstacleStore()
+    store = ObstacleStore(np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=WORLD_HEADER.size, shape=(count,)))
+    _check_boxes(path, store)
+    return store
+
+
+def _check_boxes(path: str, store: ObstacleStore) -> None:
+    """Конечные габариты и положительные размеры всех препятствий (один проход по массивам)."""
+    boxes = store.boxes
+    valid = (boxes['width'] > 0) & (boxes['height'] > 0)
+    for bound in store.bounds():
+        valid &= np.isfinite(bound)
+    if not valid.all():
+        index = int(np.argmin(valid))
+        record = boxes[index]
+        raise WorldFormatError(f"{path}: препятствие #{index + 1}: недопустимые координаты или размеры "
+                               f"(x={record['x']}, y={record['y']}, ширина {record['width']}, высота {record['height']})")
+
+
+def _load_json(path: str) -> ObstacleStore:
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except ValueError as e:  # JSONDecodeError, UnicodeDecodeError
+        raise WorldFormatError(f"{path}: не JSON: {e}")
+    if (not isinstance(data, dict) or data.get('version', WORLD_VERSION) != WORLD_VERSION
+            or not isinstance(data.get('obstacles', []), list)):
+        raise WorldFormatError(f"{path}: ожидается объект с \"version\": {WORLD_VERSION} и списком \"obstacles\"")
+    rows = []
+    for index, entry in enumerate(data.get('obstacles', [])):
+        try:
+            x, y = float(entry['x']), float(entry['y'])
+            width, height = float(entry['width']), float(entry['height'])
+            if not all(map(math.isfinite, (x, y, width, height))):
+                raise ValueError("координаты и размеры должны быть конечными числами")
+            if width <= 0 or height <= 0:
+                raise ValueError("размеры должны быть положительными")
+            color = entry.get('color', DEFAULT_COLOR)
+            if (not isinstance(color, (list, tuple)) or len(color) != 3
+                    or not all(isinstance(c, int) and not isinstance(c, bool) and 0 <= c <= 255 for c in color)):
+                raise ValueError(f"цвет должен быть тремя целыми 0-255, получено {color!r}")
+            rows.append((x, y, width, height, tuple(color), (0,) * 5))
+        except (KeyError, TypeError, ValueError) as e:
+            raise WorldFormatError(f"{path}: препятствие #{index + 1}: {e}")
+    return ObstacleStore(np.array(rows, dtype=RECORD_DTYPE))
+
+
+def save_world(path: str, store: ObstacleStore) -> None:
+    """Сохраняет карту в формате, определяемом расширением (.json или двоичный)."""
+    boxes = store.boxes
+    if path.lower().endswith('.json'):
+        obstacles = [{'x': float(r['x']), 'y': float(r['y']), 'width': float(r['width']),
+                      'height': float(r['height']), 'color': [int(c) for c in r['color']]} for r in boxes]
+        with open(path, 'w', encoding='utf-8') as f:
+            # По препятствию на строку: файл удобно читать и сравнивать
+            lines = ',\n'.join('    ' + json.dumps(obstacle) for obstacle in obstacles)
+            f.write(f'{{\n  "version": {WORLD_VERSION},\n  "obstacles": [\n{lines}\n  ]\n}}\n')
+        return
+    with open(path, 'wb') as f:
+        f.write(WORLD_HEADER.pack(WORLD_MAGIC, WORLD_VERSION, len(boxes)))
+        f.write(np.ascontiguousarray(boxes, dtype=RECORD_DTYPE).tobytes())
+
+
+def benchmark(count: int = 100_000) -> None:
+    """Загрузка склада из count стеллажей: JSON и двоичный формат, затем построение сетки и шаги робота."""
+    import tempfile
+    import time
+    from robot.robot import Robot
+
+    # Ряды стеллажей 1x0.4 м с проходами 2 м
+    side = int(np.ceil(np.sqrt(count)))
+    index = np.arange(count)
+    boxes = np.column_stack([(index % side) * 1.2, (index // side) * 2.4 + 2.0,
+                             np.full(count, 1.0), np.full(count, 0.4)])
+    store = ObstacleStore.from_boxes(boxes)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ('warehouse.json', 'warehouse.world'):
+            path = os.path.join(directory, name)
+            save_world(path, store)
+            start = time.perf_counter()
+            loaded = load_world(path)
+            load_time = time.perf_counter() - start
+            print(f"{name:<16} {os.path.getsize(path) / 1e6:6.1f} МБ, загрузка {load_time * 1000:8.2f} мс")
+
+        robot = Robot(x=1.0, y=1.0, theta=0.0)
+        start = time.perf_counter()
+        robot.set_obstacles(loaded)
+        index_time = time.perf_counter() - start
+        robot.set_chassis_forces(Robot.MAX_DRIVE_FORCE, 0.0)
+        start = time.perf_counter()
+        for _ in range(5000):
+            robot.update(1.0 / 500.0)
+        step_time = (time.perf_counter() - start) / 5000
+        print(f"Сетка для {count} препятствий: {index_time * 1000:.2f} мс, "
+              f"шаг робота в проходе: {step_time * 1e6:.1f} мкс, столкновение: {robot.is_collided}")
+        del robot, loaded  # освобождаем отображение файла до удаления каталога
+
+
+if __name__ == '__main__':
+    import sys
+    # Классы берутся из robot.world, а не из __main__: иначе сетка не узнает ObstacleStore
+    from robot import world
+    if len(sys.argv) == 3:
+        world.save_world(sys.argv[2], world.load_world(sys.argv[1]))
+        print(f"Карта {sys.argv[1]} сохранена в {sys.argv[2]}")
+    else:
+        world.benchmark()
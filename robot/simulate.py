@@ -0,0 +1,106 @@
+"""
+Запуск сценария команд в симуляции без окна, быстрее реального времени.
+
+Сценарий - JSON-список команд в формате схемы command_codec с необязательным
+временем постановки в очередь "at" (секунды времени симуляции), например:
+[
+  {"command": "turn", "params": {"angular_speed": 1.8, "angle": 1.5708}},
+  {"command": "move", "params": {"linear_speed": 1.0, "distance": 2.0}},
+  {"at": 1.0, "command": "stop", "params": {}}
+]
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import sys
+import time
+
+from robot.command_codec import validate_command, CommandSchemaError
+from robot.commands.factory import command_factory
+from robot.headless import HeadlessSimulation, DEMO_OBSTACLES
+from robot.robot import Robot
+from robot.world import ObstacleStore, load_world, WorldFormatError
+
+
+def load_script(path: str, profiled: bool = False):
+    with open(path, encoding='utf-8') as f:
+        entries = json.load(f)
+    script = []
+    for index, entry in enumerate(entries):
+        try:
+            params = validate_command(entry.get('command'), entry.get('params') or {})
+            command = command_factory({'command': entry['command'], 'params': params}, profiled)
+        except ValueError as e:  # включая CommandSchemaError
+            raise SystemExit(f"Команда #{index + 1} в сценарии {path}: {e}")
+        script.append((float(entry.get('at', 0.0)), command))
+    return script
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Симуляция робота без окна по сценарию команд')
+    parser.add_argument('script', type=str, help='JSON-файл сценария команд')
+    parser.add_argument('--physics-rate', type=float, default=500.0, help='Частота шага физики, Гц')
+    parser.add_argument('--collision', choices=Robot.COLLISION_MODES, default='substep',
+                        help='Проверка столкновений: подшаги с SAT или непрерывная')
+    parser.add_argument('--integrator', choices=Robot.INTEGRATORS, default='euler',
+                        help='Интегрирование динамики (exact допускает более крупный шаг --physics-rate)')
+    parser.add_argument('--timeout', type=float, default=60.0, help='Предел времени симуляции, с')
+    parser.add_argument('--world', type=str, default=None,
+                        help='Файл карты препятствий (.json или двоичный .world) вместо демонстрационной сцены')
+    parser.add_argument('--grid-resolution', type=float, default=None,
+                        help='Построить карту занятости с полем расстояний (размер ячейки, м) для команд')
+    parser.add_argument('--motion-profile', action='store_true',
+                        help='Движение и поворот на заданную величину по профилю скорости вместо PID')
+    parser.add_argument('--no-obstacles', action='store_true', help='Пустая сцена без демонстрационных препятствий')
+    parser.add_argument('--start', type=float, nargs=3, default=None, metavar=('X', 'Y', 'THETA_DEG'),
+                        help='Начальная поза робота (по умолчанию 0 0 90)')
+    parser.add_argument('--verbose', action='store_true', help='Показывать журнал очереди команд и робота')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.no_obstacles:
+        obstacles = ObstacleStore()
+    elif args.world:
+        try:
+            obstacles = load_world(args.world)
+        except (OSError, WorldFormatError) as e:
+            raise SystemExit(f"Карта {args.world}: {e}")
+    else:
+        obstacles = ObstacleStore.from_boxes(DEMO_OBSTACLES)
+    start_pose = (args.start[0], args.start[1], math.radians(args.start[2])) if args.start else (0.0, 0.0, math.pi / 2)
+    log = sys.stdout if args.verbose else io.StringIO()
+    with contextlib.redirect_stdout(log):
+        simulation = HeadlessSimulation(obstacles, start_pose, args.physics_rate,
+                                        args.collision, args.integrator, args.grid_resolution)
+        script = load_script(args.script, args.motion_profile)
+        wall_start = time.perf_counter()
+        state = simulation.run_script(script, timeout=args.timeout)
+    wall_time = time.perf_counter() - wall_start
+
+    print(f"Итоговая поза: x={state['x']:.4f} м, y={state['y']:.4f} м, "
+          f"theta={math.degrees(state['theta']):.2f}°, скорость={state['linear_velocity']:.4f} м/с")
+    print(f"Время симуляции: {state['time']:.2f} с, реальное время: {wall_time:.3f} с "
+          f"(в {state['time'] / max(wall_time, 1e-9):.0f} раз быстрее реального)")
+    print("Выполненные команды:")
+    for entry in simulation.completed:
+        print(f"  {entry['start']:7.3f} -> {entry['end']:7.3f} с ({entry['duration']:.3f} с): {entry['command']}")
+    if state['queue_compacted']:
+        print(f"Убрано из очереди объединением и пустых команд: {state['queue_compacted']}")
+    if state['active_command'] or state['queue_length']:
+        print(f"Не завершено: активная команда '{state['active_command']}', в очереди {state['queue_length']}")
+    if simulation.collisions:
+        print("Столкновения:")
+        for collision in simulation.collisions:
+            print(f"  {collision['time']:7.3f} с в ({collision['x']:.3f}, {collision['y']:.3f}), "
+                  f"команда: {collision['command']}")
+    else:
+        print("Столкновений нет")
+    return 1 if simulation.collisions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
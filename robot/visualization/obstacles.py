@@ -4,7 +4,6 @@
 from typing import Tuple
 
 from interfaces.obstacle_interface import ObstacleInterface
-import pygame
 
 
 class Obstacle(ObstacleInterface):
@@ -35,22 +34,6 @@ class Obstacle(ObstacleInterface):
         self.height = height
         self.avoidance_margin = avoidance_margin
         self.color = color
-        
-        # Создаем Rect для препятствия с учетом отступа
-        self.rect = pygame.Rect(
-            x - (width / 2 + avoidance_margin),
-            y - (height / 2 + avoidance_margin),
-            width + 2 * avoidance_margin,
-            height + 2 * avoidance_margin
-        )
-        
-        # Создаем Rect для основного тела препятствия
-        self.body_rect = pygame.Rect(
-            x - width / 2,
-            y - height / 2,
-            width,
-            height
-        )
     
     def get_position(self) -> Tuple[float, float]:
         """
@@ -4,8 +4,9 @@
 import math
 import time
 import os
-from typing import Tuple, List
+from typing import Tuple, List, Callable, Optional
 
+import numpy as np
 import pygame
 
 from interfaces.visualizer_interface import VisualizerInterface
@@ -13,9 +14,12 @@ from interfaces.robot_interface import RobotInterface
 from robot.commands.move_command import MoveCommand
 from robot.commands.stop_command import StopCommand
 from robot.commands.turn_command import TurnCommand
-from visualization.obstacles import Obstacle
+from robot.commands.goto_command import GoToCommand
 from visualization.text_drawer import TextDrawer
 from robot.command_queue import CommandQueue
+from robot.sim_clock import FixedStepClock
+from robot.world import ObstacleStore
+from robot.occupancy import OccupancyGrid
 
 
 class RobotVisualizer(VisualizerInterface):
@@ -30,7 +34,8 @@ class RobotVisualizer(VisualizerInterface):
         text_color: Tuple[int, int, int] = (0, 0, 0),
         background_color: Tuple[int, int, int] = (255, 255, 255),
         grid_color: Tuple[int, int, int] = (200, 200, 200),
-        grid_size: int = 50
+        grid_size: int = 50,
+        physics_rate: float = 500.0
     ):
         self.robot = robot
         self.command_queue = command_queue
@@ -41,9 +46,13 @@ class RobotVisualizer(VisualizerInterface):
         self.grid_color = grid_color
         self.grid_size = grid_size
 
-        self.obstacles: List[Obstacle] = []
+        self.obstacles = ObstacleStore()
+        self.occupancy: Optional[OccupancyGrid] = None
+        self.show_distance_field = False
         self.running = False
-        self.last_update_time = 0
+        # Физика и регуляторы идут с фиксированным шагом, отрисовка - с частотой кадров
+        self.sim_clock = FixedStepClock(physics_rate)
+        self.previous_pose: Optional[Tuple[float, float, float]] = None
         self.camera_offset_x, self.camera_offset_y = 0, 0
         self.camera_boundary_percent = 0.2
 
@@ -56,7 +65,7 @@ class RobotVisualizer(VisualizerInterface):
         self.font_path = font_path if os.path.exists(font_path) else None
 
         if self.font_path:
-            self.info_drawers = [TextDrawer(self.font_path, 16, self.text_color, None, (10, 10 + i * 20)) for i in range(8)]
+            self.info_drawers = [TextDrawer(self.font_path, 16, self.text_color, None, (10, 10 + i * 20)) for i in range(9)]
         else:
             self.font = pygame.font.SysFont("Arial", 16)
 
@@ -85,10 +94,11 @@ class RobotVisualizer(VisualizerInterface):
     def render(self) -> None:
         self.screen.fill(self.background_color)
         self._draw_grid()
+        if self.show_distance_field and self.occupancy: self._draw_distance_field()
         self._draw_trail()
         self._draw_obstacles()
 
-        x, y, theta = self.robot.get_position()
+        x, y, theta = self._interpolated_pose()
         pixel_x, pixel_y = self._world_to_screen(x, y)
         self._update_camera_offset(pixel_x, pixel_y)
 
@@ -159,6 +169,8 @@ class RobotVisualizer(VisualizerInterface):
             f"Препятствий: {len(self.obstacles)}", f"Состояние: {state}", f"Команда: {cmd_text}",
             f"Очередь: {len(self.command_queue.commands)} команд"
         ]
+        if self.occupancy:
+            info.append(f"Зазор: {self.occupancy.clearance(x, y):.2f} м (G - поле расстояний)")
         if hasattr(self, 'info_drawers'):
             for i, text in enumerate(info):
                 if i < len(self.info_drawers): self.info_drawers[i].draw(self.screen, text)
@@ -183,12 +195,29 @@ class RobotVisualizer(VisualizerInterface):
                     end_y = pty - 20 * math.sin(t_theta)
                     pygame.draw.line(self.screen, self.target_color, (ptx, pty), (end_x, end_y), 2)
 
-                robot_pixel_pos = self._world_to_screen(self.robot.x, self.robot.y)
-                pygame.draw.aaline(self.screen, self.target_color, robot_pixel_pos, (ptx, pty))
+                path = getattr(ac, 'path', None)
+                if path and len(path) > 1:
+                    # Путь планировщика вместо прямой до цели
+                    screen_points = [self._world_to_screen(px, py) for px, py in path]
+                    pygame.draw.aalines(self.screen, self.target_color, False, screen_points)
+                else:
+                    robot_pixel_pos = self._world_to_screen(self.robot.x, self.robot.y)
+                    pygame.draw.aaline(self.screen, self.target_color, robot_pixel_pos, (ptx, pty))
 
     def add_obstacle(self, x, y, width, height, color=(120,120,120)):
-        obstacle = Obstacle(x, y, width, height, color=color)
-        self.obstacles.append(obstacle); self.robot.set_obstacles(self.obstacles)
+        obstacle = self.obstacles.append(x, y, width, height, color)
+        self.robot.add_obstacle(obstacle)
+        if self.occupancy: self.occupancy.add_obstacle(obstacle)
+
+    def set_obstacles(self, obstacles: ObstacleStore) -> None:
+        """Заменяет препятствия сцены, например картой из файла (robot.world.load_world)."""
+        self.obstacles = obstacles
+        self.robot.set_obstacles(obstacles)
+
+    def set_occupancy(self, occupancy: Optional[OccupancyGrid]) -> None:
+        """Карта занятости сцены: обновляется вместе с препятствиями и доступна командам через robot.occupancy."""
+        self.occupancy = occupancy
+        self.robot.occupancy = occupancy
 
     def _world_to_screen(self, x, y):
         cx, cy = self.window_size[0]//2, self.window_size[1]//2
@@ -199,7 +228,11 @@ class RobotVisualizer(VisualizerInterface):
         return (px-cx+self.camera_offset_x)/self.scale_factor, -(py-cy+self.camera_offset_y)/self.scale_factor
 
     def _draw_obstacles(self):
-        for o in self.obstacles:
+        # Рисуются только препятствия в видимой области: карта может содержать сотни тысяч
+        min_x, max_y = self._screen_to_world(0, 0)
+        max_x, min_y = self._screen_to_world(*self.window_size)
+        for index in self.obstacles.query(min_x, min_y, max_x, max_y).tolist():
+            o = self.obstacles[index]
             ox, oy = o.get_position(); w, h = o.get_dimensions()
             px, py = self._world_to_screen(ox, oy)
             pw, ph = int(w*self.scale_factor), int(h*self.scale_factor)
@@ -207,31 +240,79 @@ class RobotVisualizer(VisualizerInterface):
             pygame.draw.rect(self.screen, o.get_color(), rect)
             pygame.draw.rect(self.screen, (0,0,0), rect, 2)
 
-    def update(self):
-        ct = time.time()
-        if self.last_update_time == 0: self.last_update_time = ct; return
-        dt = min(ct - self.last_update_time, 0.1); self.last_update_time = ct
+    def _draw_distance_field(self):
+        """Поле расстояний в видимой области: красный у препятствий, к пределу max_distance - цвет фона."""
+        grid = self.occupancy
+        min_x, max_y = self._screen_to_world(0, 0)
+        max_x, min_y = self._screen_to_world(*self.window_size)
+        ix0, iy0 = grid.world_to_cell(min_x, min_y); ix1, iy1 = grid.world_to_cell(max_x, max_y)
+        ix0, iy0, ix1, iy1 = max(ix0, 0), max(iy0, 0), min(ix1, grid.width - 1), min(iy1, grid.height - 1)
+        if ix1 < ix0 or iy1 < iy0: return
+        shade = (255 * grid.distance[iy0:iy1 + 1, ix0:ix1 + 1] / grid.max_distance).astype(np.uint8)
+        rgb = np.stack([np.full_like(shade, 255), shade, shade], axis=-1)[::-1].transpose(1, 0, 2)
+        surface = pygame.surfarray.make_surface(rgb)
+        left, top = self._world_to_screen(grid.origin_x + ix0 * grid.resolution, grid.origin_y + (iy1 + 1) * grid.resolution)
+        size = (ix1 - ix0 + 1) * grid.resolution * self.scale_factor, (iy1 - iy0 + 1) * grid.resolution * self.scale_factor
+        surface = pygame.transform.scale(surface, (int(size[0]), int(size[1])))
+        surface.set_alpha(140)
+        self.screen.blit(surface, (left, top))
+
+    def _interpolated_pose(self) -> Tuple[float, float, float]:
+        """Поза между двумя последними шагами физики по остатку накопителя часов."""
+        x, y, theta = self.robot.get_position()
+        if self.previous_pose is None: return x, y, theta
+        px, py, ptheta = self.previous_pose
+        alpha = self.sim_clock.alpha
+        dtheta = (theta - ptheta + math.pi) % (2 * math.pi) - math.pi
+        return px + (x - px) * alpha, py + (y - py) * alpha, ptheta + dtheta * alpha
+
+    def step(self, dt: float) -> None:
+        """Один шаг симуляции: регулятор активной команды, затем физика."""
+        self.command_queue.update(self.robot, dt)
         self.robot.update(dt)
+
+    def update(self):
+        for _ in range(self.sim_clock.tick()):
+            self.previous_pose = self.robot.get_position()
+            self.step(self.sim_clock.dt)
         nx, ny, _ = self.robot.get_position()
         if not self.trail_points or (nx != self.trail_points[-1][0] or ny != self.trail_points[-1][1]):
             self.trail_points.append((nx, ny))
         if len(self.trail_points) > self.max_trail_length: self.trail_points.pop(0)
 
-    def start(self, cb):
-        self.running, self.last_update_time = True, time.time()
+    def start(self, cb, wait: Optional[Callable[[float], None]] = None, fps: int = 60):
+        """
+        Запускает главный цикл.
+
+        Args:
+            cb: Прием команд и публикация телеметрии в начале каждого кадра
+            wait: Ожидание до следующего кадра wait(timeout); может вернуться раньше,
+                  например при поступлении новой команды (по умолчанию - clock.tick)
+            fps: Частота кадров
+        """
+        self.running = True
+        self.sim_clock.reset()
+        frame_period = 1.0 / fps
         try:
             while self.running:
+                frame_start = time.monotonic()
                 for event in pygame.event.get():
                     if event.type == pygame.QUIT: self.running = False
                     elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1: self._handle_mouse_click(event.pos)
                     elif event.type == pygame.KEYDOWN: self._handle_key_event(event.key)
-                cb(); self.update(); self.render(); self.clock.tick(60)
+                cb(); self.update(); self.render()
+                if wait: wait(max(0.0, frame_start + frame_period - time.monotonic()))
+                else: self.clock.tick(fps)
         finally: self.stop()
 
     def _handle_mouse_click(self, pos):
         tx, ty = self._screen_to_world(pos[0], pos[1])
         rx, ry, rth = self.robot.get_position()
         self.command_queue.clear()
+        if self.occupancy:
+            # С картой занятости - в обход препятствий по пути планировщика
+            self.command_queue.add_command(GoToCommand(tx, ty))
+            return
         dx, dy = tx - rx, ty - ry
 
         # Угол до цели в мировой системе координат
@@ -260,11 +341,17 @@ class RobotVisualizer(VisualizerInterface):
             self.robot.set_chassis_forces(0.0, 0.0); print("Очередь очищена, состояние робота сброшено.")
             self.robot.__dict__["x"] = 0
             self.robot.__dict__["y"] = 0
+            self.previous_pose = None
         elif key == pygame.K_o:
             import random; x,y = random.uniform(-5,5),random.uniform(-5,5); w,h = random.uniform(0.5,1.5),random.uniform(0.5,1.5)
             self.add_obstacle(x,y,w,h)
         elif key == pygame.K_p:
-            if self.obstacles: self.obstacles.pop(); self.robot.set_obstacles(self.obstacles)
+            if self.obstacles:
+                self.robot.remove_obstacle(self.obstacles[-1])
+                if self.occupancy: self.occupancy.remove_obstacle(self.obstacles[-1])
+                self.obstacles.remove_last()
+        elif key == pygame.K_g:
+            self.show_distance_field = not self.show_distance_field
 
     def stop(self): self.running=False; pygame.quit(); print("Визуализатор остановлен.")
 
@@ -0,0 +1,50 @@
+"""
+Модуль с реализацией команды движения в точку.
+"""
+
+from voice_interfaces.command_interface import CommandInterface
+from voice_interfaces.robot_interface import RobotInterface
+
+
+class GoToCommand(CommandInterface):
+    """Команда для движения робота в точку карты; путь в обход препятствий строит робот."""
+
+    @property
+    def priority(self) -> int:
+        """Возвращает приоритет команды."""
+        return 1
+
+    def __init__(self, x: float, y: float):
+        """
+        Инициализирует команду движения в точку.
+
+        Args:
+            x: Координата x точки назначения в метрах
+            y: Координата y точки назначения в метрах
+        """
+        self.x = x
+        self.y = y
+        self.is_complete = False
+
+    def execute(self, robot: RobotInterface) -> bool:
+        """Команда выполняется на стороне робота (планировщик пути)."""
+        return False
+
+    def check_completion(self) -> bool:
+        """Проверяет, завершена ли команда."""
+        return self.is_complete
+
+    def get_description(self) -> str:
+        """
+        Возвращает описание команды.
+
+        Returns:
+            str: Текстовое описание команды
+        """
+        return f"Движение в точку ({self.x:g}, {self.y:g})"
+
+    def to_dict(self) -> dict:
+        return {
+            'type': 'goto',
+            'params': {'x': self.x, 'y': self.y}
+        }
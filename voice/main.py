@@ -9,6 +9,8 @@ from pyqtgraph.Qt import QtCore, QtGui, QtWidgets
 import zmq
 from queue import Queue, Empty
 from threading import Thread
+from concurrent.futures import ThreadPoolExecutor
+import multiprocessing as mp
 import time
 import logging
 import argparse
@@ -18,17 +20,83 @@ import uuid
 
 from nlp_processor import NLPProcessor
 from window_com import CommandsList
+from shared_audio_ring import SharedAudioRing
+from wake_word import WakeWordDetector
+from resampler import StreamingResampler, ChunkRebuffer
+from latency_trace import LatencyTracer, new_trace, mark
+from reliable_channel import ReliableCommandSender
+from telemetry_client import TelemetrySubscriber
+from command_codec import encode_command, decode_command, validate_command, CommandSchemaError
 
 # =============================================
 # 0. Настройка и парсинг аргументов
 # =============================================
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger('VoiceControlSystem')
+
+# Адреса ZeroMQ (tcp:// или ipc://); голосовая часть привязывает их, робот подключается.
+# inproc:// - только с роботом в этом же процессе (--with-robot): нужен общий контекст ZeroMQ
+COMMAND_ENDPOINT = os.environ.get('VOICE_CONTROL_COMMAND_ENDPOINT', 'tcp://*:5555')
+ACK_ENDPOINT = os.environ.get('VOICE_CONTROL_ACK_ENDPOINT', 'tcp://*:5556')
+TELEMETRY_ENDPOINT = os.environ.get('VOICE_CONTROL_TELEMETRY_ENDPOINT', 'tcp://*:5557')
+INPROC_ENDPOINTS = ('inproc://voice_control_commands', 'inproc://voice_control_acks', 'inproc://voice_control_telemetry')
+
+
+def connect_address(endpoint):
+    """Адрес для подключения к привязанному адресу: tcp://*:port -> tcp://localhost:port."""
+    return endpoint.replace('tcp://*:', 'tcp://localhost:')
+
+
 parser = argparse.ArgumentParser(description='Система голосового управления')
 parser.add_argument('--zmq-client', action='store_true', help='Запустить только клиент ZeroMQ для тестов')
 parser.add_argument('--model-path', type=str, default="models/vosk-model-small-ru", help='Путь к модели VOSK')
+parser.add_argument('--fallback-model-path', type=str, default=None,
+                    help='Путь к большой модели VOSK для каскада: сегмент повторно декодируется ею, '
+                         'только если по результату малой модели команда не распознана')
+parser.add_argument('--multiprocess', action='store_true',
+                    help='Запустить захват+VAD, распознавание и GUI в отдельных процессах '
+                         '(аудио передается через кольцевой буфер в разделяемой памяти)')
+parser.add_argument('--native-rate', action='store_true',
+                    help='Открывать микрофон на его родной частоте и числе каналов, '
+                         'приводя звук к 16 кГц потоковым полифазным ресемплером')
+parser.add_argument('--input-device', type=int, default=None, help='Индекс устройства ввода PyAudio')
+parser.add_argument('--trim-pad', type=float, default=0.1,
+                    help='Запас (с), оставляемый вокруг речи при обрезке сегмента по вероятностям VAD')
+parser.add_argument('--target', type=str, default='all',
+                    help='Адресат команд по умолчанию: all, robot/<id> или group/<id>. '
+                         'Меняется голосом: "робот два, вперёд", "группа один", "все роботы"')
+parser.add_argument('--command-endpoint', type=str, default=COMMAND_ENDPOINT,
+                    help='Адрес публикации команд (tcp://*:5555 или ipc:///tmp/voice_control_commands); '
+                         'по умолчанию из VOICE_CONTROL_COMMAND_ENDPOINT')
+parser.add_argument('--ack-endpoint', type=str, default=ACK_ENDPOINT,
+                    help='Адрес приема подтверждений (режим --reliable); по умолчанию из VOICE_CONTROL_ACK_ENDPOINT')
+parser.add_argument('--telemetry', type=str, nargs='*', default=[connect_address(TELEMETRY_ENDPOINT)],
+                    help='Адреса телеметрии роботов (последнее состояние показывается в GUI и сниффере)')
+parser.add_argument('--reliable', action='store_true',
+                    help='Надежная доставка команд: номера, подтверждения от робота, переотправка, окно кредитов')
+parser.add_argument('--trace-file', type=str, default=None,
+                    help='Записывать трассировку задержек этапов (формат Chrome Trace) в указанный файл')
+parser.add_argument('--wake-word', type=str, default=None,
+                    help='Ключевые слова через запятую (например, "робот"); без них сегменты не распознаются')
+parser.add_argument('--command-window', type=float, default=5.0,
+                    help='Длительность командного окна после ключевого слова, с')
+parser.add_argument('--with-robot', action='store_true',
+                    help='Запустить робота без окна (robot/robot/embedded.py) в потоке этого процесса; '
+                         'команды, подтверждения и телеметрия идут через inproc://')
+parser.add_argument('--robot-path', type=str,
+                    default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'robot'),
+                    help='Каталог проекта робота для --with-robot')
 
 args = parser.parse_args()
+if args.with_robot:
+    if args.multiprocess or args.zmq_client:
+        parser.error("--with-robot: робот работает в процессе отправителя команд, "
+                     "несовместимо с --multiprocess и --zmq-client")
+    args.command_endpoint, args.ack_endpoint, telemetry_endpoint = INPROC_ENDPOINTS
+    args.telemetry = [telemetry_endpoint]
+for endpoint in [args.command_endpoint, args.ack_endpoint] + args.telemetry:
+    if endpoint.startswith('inproc://') and not args.with_robot:
+        parser.error(f"{endpoint}: inproc:// работает только внутри одного процесса; робот в этом процессе - --with-robot")
 
 # =============================================
 # 1. Конфигурация и инициализация
@@ -40,7 +108,8 @@ CHANNELS = 1
 VAD_THRESHOLD = 0.5
 MIN_SPEECH_DURATION = 0.3
 POST_SPEECH_SILENCE = 0.5
-ZMQ_PORT = 5555
+RING_BUFFER_SECONDS = 60
+RECOGNITION_STOP_TIMEOUT = 10.0  # с, на распознавание сегмента, начатого до выхода
 
 raw_audio_queue = Queue(maxsize=50)
 speech_chunks_queue = Queue(maxsize=50)
@@ -49,47 +118,284 @@ result_queue = Queue(maxsize=10)
 # =============================================
 # 2. Загрузка моделей
 # =============================================
-logger.info("Загрузка моделей...")
-vad_model, _ = torch.hub.load(repo_or_dir='snakers4/silero-vad', model='silero_vad', force_reload=False, onnx=False)
-try:
-    logger.info(f"Загрузка модели VOSK из {args.model_path}...")
-    if not os.path.exists(args.model_path):
-        logger.error(f"Путь к модели VOSK не найден: {args.model_path}")
+# Модели загружаются только в тех процессах, где они нужны
+vad_model = None
+vosk_model = None
+fallback_vosk_model = None
+
+
+def load_vad_model():
+    logger.info("Загрузка модели VAD...")
+    model, _ = torch.hub.load(repo_or_dir='snakers4/silero-vad', model='silero_vad', force_reload=False, onnx=False)
+    return model
+
+
+def load_vosk_model(model_path):
+    try:
+        logger.info(f"Загрузка модели VOSK из {model_path}...")
+        if not os.path.exists(model_path):
+            logger.error(f"Путь к модели VOSK не найден: {model_path}")
+            sys.exit(1)
+        model = vosk.Model(model_path)
+        logger.info("Модель VOSK успешно загружена.")
+        return model
+    except Exception as e:
+        logger.error(f"Не удалось загрузить модель VOSK: {e}")
         sys.exit(1)
-    vosk_model = vosk.Model(args.model_path)
-    logger.info("Модель VOSK успешно загружена.")
-except Exception as e:
-    logger.error(f"Не удалось загрузить модель VOSK: {e}")
-    sys.exit(1)
+
+
+def load_vosk_models(model_path, fallback_model_path=None):
+    """Загружает основную и (опционально) резервную модели VOSK параллельно."""
+    if not fallback_model_path:
+        return load_vosk_model(model_path), None
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        main_future = executor.submit(load_vosk_model, model_path)
+        fallback_future = executor.submit(load_vosk_model, fallback_model_path)
+        return main_future.result(), fallback_future.result()
+
+
+def make_topic(kind, ident=None):
+    """Префикс темы ZMQ: 'all/', 'robot/<id>/' или 'group/<id>/' (завершающий '/' исключает 'robot/1' ~ 'robot/10')."""
+    return "all/" if kind == 'all' else f"{kind}/{ident}/"
+
+
+class CommandPublisher:
+    """Отправка команд через PUB с префиксом темы (фильтрация выполняется сокетами SUB роботов)."""
+
+    def __init__(self, socket):
+        self.socket = socket
+
+    def send_command(self, payload, topic):
+        self.socket.send_multipart([topic.encode('utf-8'), encode_command(payload)])
+
+
+def create_publisher():
+    # Один контекст на процесс, общий с приемом подтверждений
+    context = zmq.Context.instance()
+    socket = context.socket(zmq.PUB)
+    socket.bind(args.command_endpoint)
+    logger.info(f"Сервер ZeroMQ запущен на {args.command_endpoint}")
+    if args.reliable:
+        sender = ReliableCommandSender(context, socket, args.ack_endpoint)
+        sender.start()
+        return sender
+    return CommandPublisher(socket)
+
+
+def start_embedded_robot():
+    """Робот в потоке этого процесса (--with-robot) на общем контексте ZeroMQ."""
+    # Проект робота подключается в конец пути: имена модулей голосовой части не перекрываются
+    sys.path.append(os.path.abspath(args.robot_path))
+    from robot.embedded import EmbeddedRobot
+    robot = EmbeddedRobot(zmq.Context.instance(), args.command_endpoint,
+                          ack_endpoint=args.ack_endpoint if args.reliable else None,
+                          telemetry_endpoint=args.telemetry[0])
+    robot.start()
+    robot.ready.wait()  # подписчик телеметрии GUI подключается после привязки публикатора
+    return robot
 
 
 # =============================================
 # 3. Потоки обработки
 # =============================================
+class CommandRecognizer:
+    """Распознает сегмент речи, извлекает команду и отправляет ее по ZMQ."""
+
+    def __init__(self, publisher, results=None):
+        self.publisher = publisher
+        self.topic = args.target.strip('/') + '/'
+        self.results = results if results is not None else result_queue
+        self.wake_word_detector = None
+        if args.wake_word:
+            self.wake_word_detector = WakeWordDetector(
+                vosk_model, args.wake_word.split(','), SAMPLE_RATE, args.command_window)
+            logger.info(f"Включен режим ключевого слова: {sorted(self.wake_word_detector.wake_words)}")
+        self.nlp = NLPProcessor()
+        logger.info("NLP процессор готов.")
+        self.tracer = LatencyTracer(args.trace_file, "voice")
+        # Статистика каскада моделей
+        self.segments_decoded = 0
+        self.escalations = 0
+        self.escalations_succeeded = 0
+        self.escalation_time_total = 0.0
+
+    def recognize_speech(self, audio_data, model=None):
+        try:
+            audio_data_int16 = (audio_data * 32767).astype(np.int16)
+            recognizer = vosk.KaldiRecognizer(model or vosk_model, SAMPLE_RATE)
+            recognizer.AcceptWaveform(audio_data_int16.tobytes())
+            result = json.loads(recognizer.FinalResult())
+            return result.get("text", "")
+        except Exception as e:
+            logger.error(f"Ошибка распознавания VOSK: {e}")
+            return ""
+
+    def handle_segment(self, speech_id, speech_buffer, trace=None):
+        if self.wake_word_detector and not self.wake_word_detector.should_process(speech_buffer):
+            detector = self.wake_word_detector
+            logger.info(f"Ключевое слово не обнаружено, сегмент пропущен "
+                        f"({detector.segments_skipped}/{detector.segments_total} пропущено).")
+            return
+
+        if not self.tracer.enabled: trace = None
+        recognized_text = self.recognize_speech(speech_buffer)
+        mark(trace, 'decode_done')
+        logger.info(f"Распознанный текст: '{recognized_text}'")
+        self.segments_decoded += 1
+
+        command_obj = self.process_text(recognized_text)
+        if command_obj is None and fallback_vosk_model is not None:
+            command_obj, recognized_text = self.escalate(speech_buffer)
+            mark(trace, 'escalation_done')
+        mark(trace, 'nlp_done')
+        if command_obj is None:
+            logger.info("Команда не распознана, действие не требуется.")
+            self.tracer.record(trace)
+            return
+
+        logger.info(f"Сгенерирована команда: {command_obj.get_description()}")
+        if self.wake_word_detector: self.wake_word_detector.open_window()
+        command_dict = command_obj.to_dict()
+        try:
+            # Проверка по схеме до отправки: несовпадения с роботом видны здесь, а не теряются молча
+            zmq_payload = {
+                "command": command_dict['type'],
+                "params": validate_command(command_dict['type'], command_dict['params'])
+            }
+        except CommandSchemaError as e:
+            logger.warning(f"Команда не соответствует схеме и не будет отправлена: {e}")
+            zmq_payload = None
+
+        if zmq_payload is not None:
+            if trace is not None:
+                zmq_payload["trace"] = trace
+
+            logger.info(f"Отправка ZMQ команды ({self.topic}): {zmq_payload}")
+            mark(trace, 'publish')
+            self.publisher.send_command(zmq_payload, self.topic)
+            self.tracer.record(trace)
+
+        result_data = {
+            'id': speech_id,
+            'text': recognized_text,
+            'command_obj': command_obj
+        }
+
+        if not self.results.full(): self.results.put(result_data)
+
+    def process_text(self, text):
+        """Выделяет из фразы адресата ("робот два, ...") и разбирает команду из оставшегося текста."""
+        target, text = self.nlp.split_target(text)
+        if target is not None:
+            self.topic = make_topic(*target)
+            logger.info(f"Адресат команд: {self.topic}")
+        return self.nlp.process_text(text)
+
+    def escalate(self, speech_buffer):
+        """Повторно декодирует сегмент большой моделью, если малая не дала команды."""
+        start_time = time.perf_counter()
+        recognized_text = self.recognize_speech(speech_buffer, fallback_vosk_model)
+        command_obj = self.process_text(recognized_text)
+        added_latency = time.perf_counter() - start_time
+
+        self.escalations += 1
+        self.escalation_time_total += added_latency
+        if command_obj is not None: self.escalations_succeeded += 1
+        logger.info(f"Каскад: большая модель распознала '{recognized_text}' за {added_latency * 1000:.0f} мс. "
+                    f"Эскалаций: {self.escalations}/{self.segments_decoded} "
+                    f"({100.0 * self.escalations / self.segments_decoded:.0f}%), "
+                    f"успешных: {self.escalations_succeeded}, "
+                    f"средняя добавленная задержка: {1000 * self.escalation_time_total / self.escalations:.0f} мс")
+        return command_obj, recognized_text
+
+
+def trim_segment_bounds(chunk_probs, chunk_lengths, threshold, pad_samples):
+    """
+    Определяет границы сегмента без ведущих и хвостовых неречевых чанков.
+
+    Returns:
+        Tuple[int, int]: Границы [start, end) в отсчетах относительно начала сегмента
+    """
+    offsets = np.concatenate([[0], np.cumsum(chunk_lengths, dtype=np.int64)])
+    voiced = np.flatnonzero(np.asarray(chunk_probs) > threshold)
+    if len(voiced) == 0:
+        return 0, int(offsets[-1])
+    start = max(0, offsets[voiced[0]] - pad_samples)
+    end = min(offsets[-1], offsets[voiced[-1] + 1] + pad_samples)
+    return int(start), int(end)
+
+
 class AudioProcessor(Thread):
-    def __init__(self):
+    """
+    Поток VAD: выделяет сегменты речи из потока чанков.
+
+    Пока сегмент активен, сохраняются все чанки вместе с вероятностями VAD;
+    перед распознаванием ведущие и хвостовые неречевые чанки обрезаются.
+
+    В обычном режиме готовый сегмент сразу передается в CommandRecognizer.
+    В многопроцессном режиме чанки пишутся в SharedAudioRing, а в очереди
+    уходят только дескрипторы (ID сегмента и номера отсчетов).
+    """
+
+    def __init__(self, recognizer=None, ring=None, segment_queue=None, chunks_queue=None, vad_prob=None):
         super().__init__()
         self.daemon = True
         self.running = True
+        self.recognizer = recognizer
+        self.ring = ring
+        self.segment_queue = segment_queue
+        self.chunks_queue = chunks_queue if chunks_queue is not None else speech_chunks_queue
+        self.vad_prob = vad_prob
         self.speech_buffer = np.array([], dtype=np.float32)
+        self.segment_start, self.segment_end = None, None
+        self.segment_probs, self.segment_chunk_lengths = [], []
+        self.trim_pad_samples = int(args.trim_pad * SAMPLE_RATE)
+        self.segment_onset = None
         self.last_speech_time = 0
         self.speech_active = False
         self.last_vad_prob = 0.0
         self.current_speech_id = None
 
-        self.nlp = NLPProcessor()
-        logger.info("NLP процессор готов.")
+    def voiced_duration(self):
+        return sum(n for p, n in zip(self.segment_probs, self.segment_chunk_lengths) if p > VAD_THRESHOLD) / SAMPLE_RATE
+
+    def store_chunk(self, audio_chunk, speech_prob):
+        self.segment_probs.append(speech_prob)
+        self.segment_chunk_lengths.append(len(audio_chunk))
+        if self.ring is not None:
+            start, end = self.ring.write(audio_chunk)
+            if self.segment_start is None: self.segment_start = start
+            self.segment_end = end
+            chunk_item = {'id': self.current_speech_id, 'start': start, 'end': end}
+        else:
+            self.speech_buffer = np.concatenate([self.speech_buffer, audio_chunk])
+            chunk_item = {'id': self.current_speech_id, 'chunk': audio_chunk}
+
+        if not self.chunks_queue.full():
+            self.chunks_queue.put(chunk_item)
+
+    def finish_segment(self):
+        trim_start, trim_end = trim_segment_bounds(
+            self.segment_probs, self.segment_chunk_lengths, VAD_THRESHOLD, self.trim_pad_samples)
+        total = sum(self.segment_chunk_lengths)
+        logger.info(f"Сегмент обрезан по VAD: {total / SAMPLE_RATE:.2f} с -> {(trim_end - trim_start) / SAMPLE_RATE:.2f} с")
+
+        trace = new_trace(self.current_speech_id)
+        mark(trace, 'vad_onset', self.segment_onset)
+        mark(trace, 'vad_end')
+
+        if self.ring is not None:
+            self.segment_queue.put({'id': self.current_speech_id,
+                                    'start': self.segment_start + trim_start,
+                                    'end': self.segment_start + trim_end,
+                                    'trace': trace})
+        else:
+            self.recognizer.handle_segment(self.current_speech_id, self.speech_buffer[trim_start:trim_end], trace)
 
-    def recognize_speech(self, audio_data):
-        try:
-            audio_data_int16 = (audio_data * 32767).astype(np.int16)
-            recognizer = vosk.KaldiRecognizer(vosk_model, SAMPLE_RATE)
-            recognizer.AcceptWaveform(audio_data_int16.tobytes())
-            result = json.loads(recognizer.FinalResult())
-            return result.get("text", "")
-        except Exception as e:
-            logger.error(f"Ошибка распознавания VOSK: {e}")
-            return ""
+    def reset_segment(self):
+        self.speech_active = False
+        self.current_speech_id = None
+        self.segment_probs, self.segment_chunk_lengths = [], []
 
     def run(self):
         logger.info("Поток обработки аудио запущен.")
@@ -99,6 +405,7 @@ class AudioProcessor(Thread):
                 audio_tensor = torch.from_numpy(audio_chunk).float()
                 speech_prob = vad_model(audio_tensor, SAMPLE_RATE).item()
                 self.last_vad_prob = speech_prob
+                if self.vad_prob is not None: self.vad_prob.value = speech_prob
                 is_speech = speech_prob > VAD_THRESHOLD
 
                 if is_speech:
@@ -106,63 +413,22 @@ class AudioProcessor(Thread):
                     if not self.speech_active:
                         self.speech_active = True
                         self.current_speech_id = str(uuid.uuid4())
+                        self.segment_onset = time.monotonic()
                         self.speech_buffer = np.array([], dtype=np.float32)
+                        self.segment_start, self.segment_end = None, None
 
-                    if not speech_chunks_queue.full():
-                        speech_chunks_queue.put({'id': self.current_speech_id, 'chunk': audio_chunk})
-
-                    self.speech_buffer = np.concatenate([self.speech_buffer, audio_chunk])
+                    self.store_chunk(audio_chunk, speech_prob)
 
                 elif self.speech_active:
+                    self.store_chunk(audio_chunk, speech_prob)
                     silence_duration = time.time() - self.last_speech_time
-                    if (silence_duration > POST_SPEECH_SILENCE and
-                            len(self.speech_buffer) / SAMPLE_RATE > MIN_SPEECH_DURATION):
-
-                        logger.info(f"Конец сегмента ID: {self.current_speech_id[:8]}. Обработка...")
-
-                        recognized_text = self.recognize_speech(self.speech_buffer)
-                        logger.info(f"Распознанный текст: '{recognized_text}'")
-
-                        command_obj = self.nlp.process_text(recognized_text)
-                        if command_obj is None:
-                            logger.info("Команда не распознана, действие не требуется.")
-                            self.speech_active = False
-                            self.current_speech_id = None
-                            continue
-
-                        logger.info(f"Сгенерирована команда: {command_obj.get_description()}")
-                        original_command_dict = command_obj.to_dict()
-
-                        payload_dict = original_command_dict.copy()
-                        command_type_for_zmq = payload_dict.pop('type', None)
-
-                        if command_type_for_zmq:
-                            params_dict = {}
-                            if 'params' in payload_dict and len(payload_dict) == 1:
-                                params_dict = payload_dict['params']
-                            else:
-                                params_dict = payload_dict
-
-                            zmq_payload = {
-                                "command": command_type_for_zmq,
-                                "params": params_dict
-                            }
-
-                            logger.info(f"Отправка ZMQ команды: {zmq_payload}")
-                            zmq_socket.send_json(zmq_payload)
+                    if silence_duration > POST_SPEECH_SILENCE:
+                        if self.voiced_duration() > MIN_SPEECH_DURATION:
+                            logger.info(f"Конец сегмента ID: {self.current_speech_id[:8]}. Обработка...")
+                            self.finish_segment()
                         else:
-                            logger.warning("Не удалось определить тип команды для отправки по ZMQ.")
-
-                        result_data = {
-                            'id': self.current_speech_id,
-                            'text': recognized_text,
-                            'command_obj': command_obj
-                        }
-
-                        if not result_queue.full(): result_queue.put(result_data)
-
-                        self.speech_active = False
-                        self.current_speech_id = None
+                            logger.info(f"Сегмент ID: {self.current_speech_id[:8]} слишком короткий, пропуск.")
+                        self.reset_segment()
 
             except Empty:
                 continue
@@ -170,15 +436,44 @@ class AudioProcessor(Thread):
                 logger.error(f"Ошибка в потоке обработки: {e}", exc_info=True)
 
 
+class SharedVadStatus:
+    """Последняя вероятность VAD из процесса захвата (для GUI)."""
+
+    def __init__(self, value):
+        self.value = value
+
+    @property
+    def last_vad_prob(self):
+        return self.value.value
+
+
+
 def audio_capture_thread():
     logger.info("Поток захвата аудио запущен.")
     audio = pyaudio.PyAudio()
-    stream = audio.open(format=FORMAT, channels=CHANNELS, rate=SAMPLE_RATE, input=True, frames_per_buffer=CHUNK_SIZE)
+    if args.native_rate:
+        device_info = (audio.get_device_info_by_index(args.input_device) if args.input_device is not None
+                       else audio.get_default_input_device_info())
+        device_rate = int(device_info['defaultSampleRate'])
+        device_channels = max(1, int(device_info['maxInputChannels']))
+        frames_per_buffer = int(round(CHUNK_SIZE * device_rate / SAMPLE_RATE))
+        resampler = StreamingResampler(device_rate, SAMPLE_RATE, device_channels)
+        rebuffer = ChunkRebuffer(CHUNK_SIZE)
+        logger.info(f"Захват на родной частоте устройства: {device_rate} Гц, каналов: {device_channels}")
+    else:
+        device_rate, device_channels, frames_per_buffer = SAMPLE_RATE, CHANNELS, CHUNK_SIZE
+        resampler = rebuffer = None
+    stream = audio.open(format=FORMAT, channels=device_channels, rate=device_rate, input=True,
+                        frames_per_buffer=frames_per_buffer, input_device_index=args.input_device)
     while True:
         try:
-            raw_data = stream.read(CHUNK_SIZE, exception_on_overflow=False)
+            raw_data = stream.read(frames_per_buffer, exception_on_overflow=False)
             audio_chunk = np.frombuffer(raw_data, dtype=np.int16).astype(np.float32) / 32768.0
-            if not raw_audio_queue.full(): raw_audio_queue.put(audio_chunk)
+            if resampler is None:
+                if not raw_audio_queue.full(): raw_audio_queue.put(audio_chunk)
+                continue
+            for chunk in rebuffer.push(resampler.process(audio_chunk)):
+                if not raw_audio_queue.full(): raw_audio_queue.put(chunk)
         except Exception as e:
             logger.error(f"Ошибка в потоке захвата аудио: {e}")
             break
@@ -187,13 +482,52 @@ def audio_capture_thread():
     audio.terminate()
 
 
+def capture_vad_worker(ring_name, ring_capacity, chunks_q, segment_q, vad_prob):
+    """Процесс захвата аудио и VAD. Не зависит от отрисовки GUI."""
+    global vad_model
+    vad_model = load_vad_model()
+    ring = SharedAudioRing(ring_capacity, name=ring_name)
+    processor = AudioProcessor(ring=ring, segment_queue=segment_q, chunks_queue=chunks_q, vad_prob=vad_prob)
+    processor.start()
+    audio_capture_thread()
+
+
+def recognition_worker(ring_name, ring_capacity, segment_q, results_q, stop_event):
+    """
+    Процесс распознавания: читает сегменты из кольцевого буфера по дескрипторам.
+
+    Останавливается по stop_event, а не terminate(): atexit в дочернем процессе не вызывается,
+    поэтому трассировка закрывается здесь явно и записи не теряются.
+    """
+    global vosk_model, fallback_vosk_model
+    vosk_model, fallback_vosk_model = load_vosk_models(args.model_path, args.fallback_model_path)
+    ring = SharedAudioRing(ring_capacity, name=ring_name)
+    recognizer = CommandRecognizer(create_publisher(), results_q)
+    while not stop_event.is_set():
+        try:
+            segment = segment_q.get(timeout=0.2)
+        except Empty:
+            continue
+        speech_buffer = ring.read(segment['start'], segment['end'])
+        if speech_buffer is None:
+            logger.warning(f"Сегмент ID: {segment['id'][:8]} уже перезаписан в кольцевом буфере, пропуск.")
+            continue
+        try:
+            recognizer.handle_segment(segment['id'], speech_buffer, segment.get('trace'))
+        except Exception as e:
+            logger.error(f"Ошибка в процессе распознавания: {e}", exc_info=True)
+    recognizer.tracer.close()
+
+
 # =============================================
 # 4. Визуализация
 # =============================================
 class VoiceControlVisualizer(QtWidgets.QMainWindow):
-    def  __init__(self, processor):
+    def  __init__(self, processor, ring=None, telemetry=None):
         super().__init__()
         self.processor = processor
+        self.ring = ring
+        self.telemetry = telemetry
         pg.setConfigOption('background', 'w')
         pg.setConfigOption('foreground', 'k')
         self.setWindowTitle("Система голосового управления")
@@ -228,6 +562,9 @@ class VoiceControlVisualizer(QtWidgets.QMainWindow):
         self.text_output = QtWidgets.QTextEdit()
         self.text_output.setReadOnly(True)
         right_column.addWidget(self.text_output)
+        self.telemetry_label = QtWidgets.QLabel("Телеметрия: нет данных")
+        self.telemetry_label.setStyleSheet("font-size: 10pt; color: #333;")
+        right_column.addWidget(self.telemetry_label)
         self.status_bar = self.statusBar()
         self.vad_status_label = QtWidgets.QLabel("Речь: НЕТ")
         self.vad_status_label.setStyleSheet(
@@ -235,7 +572,7 @@ class VoiceControlVisualizer(QtWidgets.QMainWindow):
         self.status_bar.addPermanentWidget(self.vad_status_label)
         self.status_label = QtWidgets.QLabel("Статус: Ожидание...");
         self.status_bar.addWidget(self.status_label)
-        self.command_colors = {"move": "#27ae60", "turn": "#3498db", "stop": "#e74c3c"}
+        self.command_colors = {"move": "#27ae60", "turn": "#3498db", "stop": "#e74c3c", "goto": "#8e44ad"}
 
         self.speech_chunks_log = []
         self.total_samples = 0
@@ -259,7 +596,8 @@ class VoiceControlVisualizer(QtWidgets.QMainWindow):
         has_new_chunks = False
         while not speech_chunks_queue.empty():
             data = speech_chunks_queue.get_nowait()
-            chunk = data['chunk']
+            chunk = data['chunk'] if 'chunk' in data else self.ring.read(data['start'], data['end'])
+            if chunk is None: continue
             start_sample = self.total_samples
             end_sample = start_sample + len(chunk)
             self.speech_chunks_log.append(
@@ -287,6 +625,14 @@ class VoiceControlVisualizer(QtWidgets.QMainWindow):
             pass
 
         self.update_vad_status(self.processor.last_vad_prob)
+        self.update_telemetry()
+
+    def update_telemetry(self):
+        if not self.telemetry: return
+        states = self.telemetry.poll_latest()
+        if states:
+            self.telemetry_label.setText("\n".join(
+                TelemetrySubscriber.format_state(state) for _, state in sorted(states.items())))
 
     def get_concatenated_buffer(self):
         if not self.speech_chunks_log: return np.array([])
@@ -386,17 +732,33 @@ class VoiceControlVisualizer(QtWidgets.QMainWindow):
 def zmq_client():
     context = zmq.Context()
     socket = context.socket(zmq.SUB)
-    socket.connect(f"tcp://localhost:{ZMQ_PORT}")
+    socket.connect(connect_address(args.command_endpoint))
     socket.setsockopt_string(zmq.SUBSCRIBE, "")
-    logger.info(f"Клиент ZeroMQ запущен на порту {ZMQ_PORT}...")
+    telemetry = TelemetrySubscriber(context, args.telemetry)
+    poller = zmq.Poller()
+    poller.register(socket, zmq.POLLIN)
+    for telemetry_socket in telemetry.sockets:
+        poller.register(telemetry_socket, zmq.POLLIN)
+    logger.info(f"Клиент ZeroMQ подключен к {connect_address(args.command_endpoint)}...")
     try:
         while True:
-            data = socket.recv_json()
-            logger.info(f"ZMQ_CLIENT | Получена команда: {data}")
+            events = dict(poller.poll())
+            if socket in events:
+                topic, body = socket.recv_multipart()
+                try:
+                    data = decode_command(body)
+                    logger.info(f"ZMQ_CLIENT | Получена команда ({topic.decode('utf-8')}, {len(body)} байт): {data}")
+                except CommandSchemaError as e:
+                    logger.warning(f"ZMQ_CLIENT | Некорректное сообщение ({topic.decode('utf-8')}): {e}")
+            for telemetry_socket in telemetry.sockets:
+                if telemetry_socket in events:
+                    state = TelemetrySubscriber.decode(telemetry_socket.recv_string())
+                    logger.info(f"ZMQ_CLIENT | Телеметрия: {TelemetrySubscriber.format_state(state)}")
     except KeyboardInterrupt:
         logger.info("Клиент ZeroMQ остановлен.")
     finally:
         socket.close()
+        telemetry.close()
         context.term()
 
 
@@ -405,15 +767,44 @@ if __name__ == "__main__":
         zmq_client();
         sys.exit(0)
 
-    context = zmq.Context()
-    zmq_socket = context.socket(zmq.PUB)
-    zmq_socket.bind(f"tcp://*:{ZMQ_PORT}")
-    logger.info(f"Сервер ZeroMQ запущен на порту {ZMQ_PORT}")
-    processor = AudioProcessor()
-    processor.start()
-    capture_thread = Thread(target=audio_capture_thread, daemon=True)
-    capture_thread.start()
+    ring = None
+    if args.multiprocess:
+        ring = SharedAudioRing(RING_BUFFER_SECONDS * SAMPLE_RATE)
+        speech_chunks_queue = mp.Queue(maxsize=500)
+        result_queue = mp.Queue(maxsize=10)
+        segment_queue = mp.Queue()
+        vad_prob = mp.Value('d', 0.0, lock=False)
+        recognition_stop = mp.Event()
+        workers = [
+            mp.Process(target=capture_vad_worker, daemon=True,
+                       args=(ring.name, ring.capacity, speech_chunks_queue, segment_queue, vad_prob)),
+            mp.Process(target=recognition_worker, daemon=True,
+                       args=(ring.name, ring.capacity, segment_queue, result_queue, recognition_stop)),
+        ]
+        for worker in workers: worker.start()
+        processor = SharedVadStatus(vad_prob)
+    else:
+        vad_model = load_vad_model()
+        vosk_model, fallback_vosk_model = load_vosk_models(args.model_path, args.fallback_model_path)
+        zmq_socket = create_publisher()
+        embedded_robot = start_embedded_robot() if args.with_robot else None
+        processor = AudioProcessor(recognizer=CommandRecognizer(zmq_socket))
+        processor.start()
+        capture_thread = Thread(target=audio_capture_thread, daemon=True)
+        capture_thread.start()
     app = QtWidgets.QApplication(sys.argv)
-    visualizer = VoiceControlVisualizer(processor)
+    telemetry = TelemetrySubscriber(zmq.Context.instance(), args.telemetry)
+    visualizer = VoiceControlVisualizer(processor, ring, telemetry)
     visualizer.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    exit_code = app.exec()
+    if ring is not None:
+        # Распознавание дописывает трассировку и завершается само; захват аудио ждет в чтении потока
+        recognition_stop.set()
+        workers[1].join(timeout=RECOGNITION_STOP_TIMEOUT)
+        for worker in workers:
+            if worker.is_alive(): worker.terminate()
+        ring.close()
+    elif embedded_robot is not None:
+        embedded_robot.stop()
+        embedded_robot.join()
+    sys.exit(exit_code)
\ No newline at end of file
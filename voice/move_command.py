@@ -1,8 +1,8 @@
 from typing import Optional
 import math
 
-from interfaces.command_interface import CommandInterface
-from interfaces.robot_interface import RobotInterface
+from voice_interfaces.command_interface import CommandInterface
+from voice_interfaces.robot_interface import RobotInterface
 
 
 class MoveCommand(CommandInterface):
@@ -93,11 +93,13 @@ class MoveCommand(CommandInterface):
             return f"Движение: линейная скорость={self.linear_speed} м/с, угловая скорость={self.angular_speed} рад/с"
 
     def to_dict(self) -> dict:
-        return {
-            'type': 'move',
-            'params': {
-                'linear_speed': self.linear_speed,
-                'angular_speed': self.angular_speed,
-                'distance': self.distance
-            }
-        }
\ No newline at end of file
+        # Параметры по схеме command_codec: направление задается знаком скорости, расстояние - модулем
+        params = {
+            'linear_speed': -abs(self.linear_speed) if self.distance is not None and self.distance < 0
+            else self.linear_speed,
+            'distance': abs(self.distance) if self.distance is not None else None
+        }
+        if self.angular_speed:
+            # Робот не поддерживает движение по дуге: схема отклонит поле вместо молчаливого отбрасывания
+            params['angular_speed'] = self.angular_speed
+        return {'type': 'move', 'params': params}
\ No newline at end of file
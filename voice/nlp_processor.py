@@ -1,13 +1,14 @@
 
 import spacy
 import math
-from typing import Optional, List
+from typing import Optional, List, Tuple
 
 
-from interfaces.command_interface import CommandInterface
+from voice_interfaces.command_interface import CommandInterface
 from move_command import MoveCommand
 from turn_command import TurnCommand
 from stop_command import StopCommand
+from goto_command import GoToCommand
 
 
 class NLPProcessor:
@@ -115,6 +116,15 @@ class NLPProcessor:
             'замедление', 'медленный', 'плавный', 'тихий ход', 'минимальная', 'спокойнее', 'аккуратнее', 'осторожнее'
         }
 
+        # --- Движение В ТОЧКУ (две координаты) ---
+        self.GOTO_KEYWORDS = {
+            'точка', 'координата', 'координаты', 'позиция', 'точку'
+        }
+
+        self.NEGATIVE_KEYWORDS = {
+            'минус'
+        }
+
         # --- Единицы измерения: МЕТРЫ ---
         self.DISTANCE_UNITS_M = {
             'метр', 'м', 'метра', 'метров', 'метро', 'метов'
@@ -129,6 +139,19 @@ class NLPProcessor:
         self.ANGLE_UNITS = {
             'градус', 'град', 'градуса', 'градусов', 'радус'
         }
+
+        # --- Выбор адресата команды ---
+        self.TARGET_ROBOT_KEYWORDS = {
+            'робот', 'робота', 'роботу', 'роботом'
+        }
+
+        self.TARGET_GROUP_KEYWORDS = {
+            'группа', 'группы', 'группе', 'группу', 'группой'
+        }
+
+        self.TARGET_ALL_KEYWORDS = {
+            'все', 'всем', 'всех', 'всё'
+        }
     def _parse_number_from_lemmas(self, lemmas: List[str]) -> Optional[float]:
         if len(lemmas) == 1 and lemmas[0] in ('полтора', 'полторы'): return 1.5
         total, current_chunk_val = 0.0, 0.0
@@ -142,23 +165,90 @@ class NLPProcessor:
         total += current_chunk_val
         return total if total > 0 or any(l in ('ноль', 'нуль') for l in lemmas) else None
 
+    def _parse_number_sequence(self, lemmas: List[str]) -> List[float]:
+        """
+        Разбивает подряд идущие числительные на отдельные числа: "три четыре" -> [3, 4],
+        "четыре три" -> [4, 3], "один ноль" -> [1, 0], "двадцать три пять" -> [23, 5],
+        "сто двадцать три" -> [123]. Слово продолжает составное число, только если занимает
+        свободный разряд ниже уже названных: единицы - после десятков или сотен, десятки и
+        "-надцать" - после сотен; "ноль" и "полтора" - всегда отдельные числа.
+        """
+        groups: List[List[str]] = []
+        rank = None  # младший названный разряд текущего числа (0 - число закончено)
+        scale = None
+        for lemma in lemmas:
+            if lemma in self._SCALE_WORDS:
+                value = self._SCALE_WORDS[lemma]
+                fits = bool(groups) and (scale is None or value < scale)
+                rank, scale = 4, value
+            else:
+                value = self._NUMBER_WORDS[lemma]
+                if value in (0, 1.5):
+                    above, next_rank = math.inf, 0
+                elif value < 10:
+                    above, next_rank = 1, 1
+                elif value < 100:
+                    above, next_rank = 2, (1 if value < 20 else 2)
+                else:
+                    above, next_rank = 3, 3
+                fits = rank is not None and rank > above
+                if not fits: scale = None
+                rank = next_rank
+            if not fits: groups.append([])
+            groups[-1].append(lemma)
+        numbers = [self._parse_number_from_lemmas(group) for group in groups]
+        return [number for number in numbers if number is not None]
+
+    def split_target(self, text: str) -> Tuple[Optional[Tuple[str, Optional[int]]], str]:
+        """
+        Выделяет из фразы адресата команды: "робот два", "группа один", "все роботы".
+
+        Returns:
+            Tuple: (('robot' | 'group', номер) или ('all', None) либо None, текст без слов адресата)
+        """
+        words = text.lower().replace(',', ' ').split()
+        target, i = None, 0
+        while i < len(words):
+            word = words[i]
+            if word in self.TARGET_ROBOT_KEYWORDS or word in self.TARGET_GROUP_KEYWORDS:
+                j = i + 1
+                while j < len(words) and (words[j] in self.ALL_NUM_WORDS or words[j].isdigit()):
+                    j += 1
+                if j > i + 1:
+                    number_words = words[i + 1:j]
+                    number = (int(number_words[0]) if number_words[0].isdigit()
+                              else self._parse_number_from_lemmas(number_words))
+                    if number is not None:
+                        kind = 'robot' if word in self.TARGET_ROBOT_KEYWORDS else 'group'
+                        target = (kind, int(number))
+                        del words[i:j]
+                        continue
+            elif word in self.TARGET_ALL_KEYWORDS and i + 1 < len(words) and words[i + 1] in ('роботы', 'роботам'):
+                target = ('all', None)
+                del words[i:i + 2]
+                continue
+            i += 1
+        return target, ' '.join(words)
+
     def process_text(self, text: str) -> Optional[CommandInterface]:
         if not self.nlp: return None
         doc = self.nlp(text.lower())
         print(text)
         value, unit = None, None
+        coordinates: List[float] = []
         move_direction, turn_direction = 0, 0
         speed_modifier = 1.0
 
         i = 0
         while i < len(doc):
             token = doc[i]
-            num_val, num_tokens_len = None, 0
+            num_val, num_tokens_len, numbers = None, 0, []
 
             # Попытка 1: Распознать цифру
             if token.pos_ == "NUM" and token.text.replace('.', '', 1).replace(',', '', 1).isdigit():
                 try:
                     num_val, num_tokens_len = float(token.text.replace(',', '.')), 1
+                    numbers = [num_val]
                 except ValueError:
                     pass
             # Попытка 2: Распознать число из слов
@@ -170,9 +260,14 @@ class NLPProcessor:
                 if num_phrase_lemmas:
                     num_val = self._parse_number_from_lemmas(num_phrase_lemmas)
                     num_tokens_len = len(num_phrase_lemmas)
+                    numbers = self._parse_number_sequence(num_phrase_lemmas)
 
             # Если число найдено, ищем единицу измерения и сохраняем
             if num_val is not None:
+                # Координаты для движения в точку: знак задается словом "минус" перед числом
+                if i > 0 and doc[i - 1].lemma_ in self.NEGATIVE_KEYWORDS and numbers:
+                    numbers[0] = -numbers[0]
+                coordinates.extend(numbers)
                 value = num_val  # Сохраняем значение по умолчанию
                 unit_token_index = i + num_tokens_len
                 if unit_token_index < len(doc):
@@ -205,6 +300,10 @@ class NLPProcessor:
         # --- ЭТАП 2: ПРИНЯТИЕ РЕШЕНИЯ НА ОСНОВЕ СОБРАННЫХ ДАННЫХ ---
         if is_stop: return StopCommand()
 
+        # Движение в точку: "поезжай в точку три минус два"
+        if lemmas.intersection(self.GOTO_KEYWORDS) and len(coordinates) >= 2:
+            return GoToCommand(x=coordinates[0], y=coordinates[1])
+
         # Определяем направления
         if is_move_forward: move_direction = 1
         if is_move_backward: move_direction = -1
@@ -0,0 +1,199 @@
+"""
+Модуль надежной доставки команд поверх ZeroMQ (PUB + обратный канал подтверждений).
+
+Каждая команда получает порядковый номер и идентификатор сессии отправителя.
+Робот отвечает подтверждением (ack) с временем постановки команды в очередь,
+по которому измеряется время кругового обхода (send -> ack). Неподтвержденные
+команды переотправляются ограниченное число раз, а число команд «в полете»
+ограничено окном кредитов. Переотправка также решает проблему «медленного
+подписчика» PUB/SUB: команда, отправленная до подключения робота, дойдет повторно.
+
+Порядок: команда не отправляется, пока в полете более ранняя команда, которая может
+прийти тому же роботу, поэтому переотправка не переставляет команды у робота.
+"""
+import logging
+import time
+import uuid
+from collections import OrderedDict, deque
+from queue import Queue, Empty
+from threading import Thread
+from typing import Dict, Set
+
+import zmq
+
+from command_codec import encode_command
+
+logger = logging.getLogger('VoiceControlSystem')
+
+
+class PendingCommand:
+    """Команда, ожидающая подтверждения."""
+
+    __slots__ = ('seq', 'topic', 'payload', 'first_sent', 'last_sent', 'attempts', 'acked_by')
+
+    def __init__(self, seq: int, topic: str, payload: dict):
+        self.seq = seq
+        self.topic = topic
+        self.payload = payload
+        self.first_sent = 0.0
+        self.last_sent = 0.0
+        self.attempts = 0
+        self.acked_by: Set[str] = set()
+
+
+class ReliableCommandSender(Thread):
+    """
+    Отправитель команд с подтверждениями, переотправкой и окном кредитов.
+
+    Все сокеты принадлежат собственному потоку отправителя; метод send_command
+    лишь кладет команду в очередь, поэтому его можно вызывать из любого потока.
+
+    Команды одному роботу доходят в порядке отправки: следующая команда с темой,
+    которая может совпасть по получателю с темой команды в полете, ждет ее
+    подтверждения или отказа. Независимы только команды разным robot/<id>/;
+    состав групп отправителю неизвестен, поэтому all/ и group/<id>/ упорядочены
+    со всеми.
+
+    Для команд группе или всем роботам доставка «хотя бы одному»: команда
+    завершается первым подтверждением, а подтверждения остальных роботов
+    учитываются по их идентификаторам (acked_by) и пишутся в журнал.
+    """
+
+    ACK_TIMEOUT = 0.25     # с, ожидание подтверждения до переотправки
+    MAX_ATTEMPTS = 8       # максимум отправок одной команды
+    CREDIT_WINDOW = 4      # максимум неподтвержденных команд «в полете»
+    POLL_INTERVAL_MS = 10
+    ACKED_HISTORY = 256    # подтвержденные команды, для которых учитываются поздние подтверждения
+
+    def __init__(self, context: zmq.Context, publisher: zmq.Socket, ack_endpoint: str):
+        """
+        Args:
+            context: Контекст ZeroMQ
+            publisher: Сокет PUB для отправки команд
+            ack_endpoint: Адрес для привязки сокета PULL подтверждений
+        """
+        super().__init__()
+        self.daemon = True
+        self.running = True
+        self.publisher = publisher
+        self.ack_socket = context.socket(zmq.PULL)
+        self.ack_socket.bind(ack_endpoint)
+        self.session = uuid.uuid4().hex[:8]
+        self.outbox: Queue = Queue()
+        self.waiting: deque = deque()
+        self.in_flight: Dict[int, PendingCommand] = {}
+        self.completed: "OrderedDict[int, PendingCommand]" = OrderedDict()
+        self.next_seq = 1
+
+        # Статистика доставки
+        self.acked = 0
+        self.failed = 0
+        self.retransmissions = 0
+        self.rtt_total = 0.0
+        self.rtt_max = 0.0
+
+    def send_command(self, payload: dict, topic: str) -> None:
+        """Ставит команду в очередь на надежную отправку."""
+        self.outbox.put((topic, payload))
+
+    def run(self) -> None:
+        logger.info(f"Надежный канал команд запущен (сессия {self.session}, окно {self.CREDIT_WINDOW}).")
+        poller = zmq.Poller()
+        poller.register(self.ack_socket, zmq.POLLIN)
+        while self.running:
+            self._accept_new_commands()
+            self._fill_window()
+            events = dict(poller.poll(self.POLL_INTERVAL_MS))
+            if self.ack_socket in events:
+                self._drain_acks()
+            self._retransmit_expired()
+
+    def _accept_new_commands(self) -> None:
+        while True:
+            try:
+                topic, payload = self.outbox.get_nowait()
+            except Empty:
+                return
+            self.waiting.append(PendingCommand(self.next_seq, topic, payload))
+            self.next_seq += 1
+
+    @staticmethod
+    def _may_overlap(topic_a: str, topic_b: str) -> bool:
+        """Может ли один робот получить команды обеих тем."""
+        return topic_a == topic_b or not (topic_a.startswith('robot/') and topic_b.startswith('robot/'))
+
+    def _fill_window(self) -> None:
+        # Команда, перед которой стоит пересекающаяся по получателям, ждет - даже если окно свободно
+        blocking = [pending.topic for pending in self.in_flight.values()]
+        waiting = deque()
+        for pending in self.waiting:
+            if len(self.in_flight) < self.CREDIT_WINDOW and not any(
+                    self._may_overlap(pending.topic, topic) for topic in blocking):
+                self.in_flight[pending.seq] = pending
+                self._transmit(pending)
+            else:
+                waiting.append(pending)
+            blocking.append(pending.topic)
+        self.waiting = waiting
+        if self.waiting:
+            logger.debug(f"Окно кредитов заполнено, в ожидании: {len(self.waiting)}")
+
+    def _transmit(self, pending: PendingCommand) -> None:
+        now = time.monotonic()
+        if pending.attempts == 0:
+            pending.first_sent = now
+        pending.last_sent = now
+        pending.attempts += 1
+        message = dict(pending.payload, seq=pending.seq, session=self.session)
+        self.publisher.send_multipart([pending.topic.encode('utf-8'), encode_command(message)])
+
+    def _drain_acks(self) -> None:
+        while True:
+            try:
+                ack = self.ack_socket.recv_json(zmq.NOBLOCK)
+            except zmq.Again:
+                return
+            if ack.get('session') != self.session:
+                continue
+            robot_id = ack.get('robot_id')
+            pending = self.in_flight.pop(ack.get('seq'), None)
+            if pending is None:
+                # Повторное подтверждение или подтверждение другого робота группы
+                completed = self.completed.get(ack.get('seq'))
+                if completed is not None and robot_id is not None and robot_id not in completed.acked_by:
+                    completed.acked_by.add(robot_id)
+                    logger.info(f"Команда #{completed.seq} ({completed.topic}) подтверждена также роботом {robot_id}, "
+                                f"всего роботов: {len(completed.acked_by)}")
+                continue
+            if robot_id is not None:
+                pending.acked_by.add(robot_id)
+            self.completed[pending.seq] = pending
+            if len(self.completed) > self.ACKED_HISTORY:
+                self.completed.popitem(last=False)
+            rtt = time.monotonic() - pending.last_sent
+            self.acked += 1
+            self.rtt_total += rtt
+            self.rtt_max = max(self.rtt_max, rtt)
+            robot_delay = ack.get('enqueued_at', 0.0) - ack.get('received_at', 0.0)
+            logger.info(f"Команда #{pending.seq} подтверждена роботом {robot_id}: RTT={rtt * 1000:.1f} мс, "
+                        f"с первой отправки {1000 * (time.monotonic() - pending.first_sent):.1f} мс, "
+                        f"прием->очередь у робота {robot_delay * 1000:.1f} мс, "
+                        f"попыток: {pending.attempts}, дубликат: {ack.get('duplicate', False)}. "
+                        f"Средний RTT: {1000 * self.rtt_total / self.acked:.1f} мс, макс: {1000 * self.rtt_max:.1f} мс")
+
+    def _retransmit_expired(self) -> None:
+        now = time.monotonic()
+        for seq, pending in list(self.in_flight.items()):
+            if now - pending.last_sent < self.ACK_TIMEOUT:
+                continue
+            if pending.attempts >= self.MAX_ATTEMPTS:
+                del self.in_flight[seq]
+                self.failed += 1
+                logger.error(f"Команда #{seq} не подтверждена после {pending.attempts} попыток, доставка прекращена.")
+                continue
+            self.retransmissions += 1
+            self._transmit(pending)
+
+    def stop(self) -> None:
+        self.running = False
+
@@ -0,0 +1,141 @@
+"""
+Модуль с потоковым полифазным ресемплером для захвата аудио.
+
+Позволяет открыть микрофон на его родной частоте (44.1/48 кГц, несколько
+каналов) и приводить звук к 16 кГц по чанкам, не теряя состояния фильтра
+на границах чанков (что важно для VAD, работающего по чанкам).
+"""
+import math
+from typing import Optional
+
+import numpy as np
+
+
+class StreamingResampler:
+    """Полифазный ресемплер с оконным sinc-фильтром и сохранением состояния между чанками."""
+
+    def __init__(
+        self,
+        in_rate: int,
+        out_rate: int,
+        channels: int = 1,
+        zero_crossings: int = 16,
+        rolloff: float = 0.92,
+        kaiser_beta: float = 8.6
+    ):
+        """
+        Args:
+            in_rate: Частота дискретизации входного сигнала
+            out_rate: Требуемая частота дискретизации
+            channels: Число каналов входного сигнала (сводятся в моно)
+            zero_crossings: Число пересечений нуля sinc по каждую сторону (длина фильтра)
+            rolloff: Частота среза относительно Найквиста меньшей из частот
+            kaiser_beta: Параметр окна Кайзера
+        """
+        g = math.gcd(in_rate, out_rate)
+        self.in_rate, self.out_rate = in_rate, out_rate
+        self.up, self.down = out_rate // g, in_rate // g
+        self.channels = channels
+
+        # Число отводов на одну фазу (в отсчетах входного сигнала)
+        self.taps = int(math.ceil(2 * zero_crossings * max(1.0, self.down / self.up)))
+        length = self.taps * self.up
+        cutoff = rolloff / (2.0 * max(self.up, self.down))
+        n = np.arange(length) - (length - 1) / 2.0
+        h = 2.0 * cutoff * np.sinc(2.0 * cutoff * n) * np.kaiser(length, kaiser_beta) * self.up
+        # phases[p, k] = h[p + k * up]
+        self.phases = h.reshape(self.taps, self.up).T.astype(np.float32)
+        self.tap_offsets = np.arange(self.taps)
+
+        self.history = np.zeros(self.taps - 1, dtype=np.float32)
+        self.next_in = 0
+        self.next_out = 0
+
+    def downmix(self, frames: np.ndarray) -> np.ndarray:
+        """Сводит многоканальный сигнал (interleaved или [кадры, каналы]) в моно."""
+        if self.channels == 1:
+            return frames.reshape(-1)
+        return frames.reshape(-1, self.channels).mean(axis=1)
+
+    def process(self, frames: np.ndarray) -> np.ndarray:
+        """
+        Ресемплирует очередной чанк.
+
+        Args:
+            frames: Отсчеты float32 (interleaved или [кадры, каналы])
+
+        Returns:
+            np.ndarray: Выходные отсчеты float32 (их число может меняться от чанка к чанку)
+        """
+        mono = self.downmix(np.asarray(frames, dtype=np.float32))
+        if self.up == self.down:
+            return mono.astype(np.float32, copy=False)
+
+        x = np.concatenate([self.history, mono])
+        buffer_start = self.next_in - (self.taps - 1)
+        self.next_in += len(mono)
+
+        last_in = self.next_in - 1
+        last_out = (last_in * self.up + self.up - 1) // self.down
+        out_idx = np.arange(self.next_out, last_out + 1, dtype=np.int64)
+        self.next_out = last_out + 1
+        self.history = x[len(x) - (self.taps - 1):]
+
+        if len(out_idx) == 0:
+            return np.array([], dtype=np.float32)
+
+        t = out_idx * self.down
+        base = t // self.up - buffer_start
+        phase = t % self.up
+        samples = x[base[:, None] - self.tap_offsets[None, :]]
+        return np.einsum('ij,ij->i', samples, self.phases[phase]).astype(np.float32, copy=False)
+
+    def reset(self) -> None:
+        self.history[:] = 0.0
+        self.next_in = 0
+        self.next_out = 0
+
+
+class ChunkRebuffer:
+    """Собирает выход ресемплера в чанки фиксированного размера (для VAD)."""
+
+    def __init__(self, chunk_size: int):
+        self.chunk_size = chunk_size
+        self.pending = np.array([], dtype=np.float32)
+
+    def push(self, samples: np.ndarray) -> list:
+        self.pending = np.concatenate([self.pending, samples])
+        count = len(self.pending) // self.chunk_size
+        chunks = [self.pending[i * self.chunk_size:(i + 1) * self.chunk_size] for i in range(count)]
+        self.pending = self.pending[count * self.chunk_size:]
+        return chunks
+
+
+def benchmark(out_rate: int = 16000, out_chunk: int = 512, iterations: int = 2000,
+              configs: Optional[list] = None) -> None:
+    """Замеряет стоимость обработки одного чанка для типичных конфигураций микрофонов."""
+    import time
+
+    configs = configs or [(44100, 1), (44100, 2), (48000, 1), (48000, 2), (48000, 4)]
+    for in_rate, channels in configs:
+        resampler = StreamingResampler(in_rate, out_rate, channels)
+        frames_per_chunk = int(round(out_chunk * in_rate / out_rate))
+        t = np.arange(frames_per_chunk * iterations) / in_rate
+        signal = np.repeat(np.sin(2 * np.pi * 440.0 * t)[:, None], channels, axis=1).astype(np.float32)
+        chunks = signal.reshape(iterations, frames_per_chunk, channels)
+
+        start = time.perf_counter()
+        produced = 0
+        for chunk in chunks:
+            produced += len(resampler.process(chunk))
+        elapsed = time.perf_counter() - start
+
+        per_chunk_us = elapsed / iterations * 1e6
+        realtime_us = out_chunk / out_rate * 1e6
+        print(f"{in_rate} Гц x {channels} кан. -> {out_rate} Гц: {per_chunk_us:.1f} мкс/чанк "
+              f"({100.0 * per_chunk_us / realtime_us:.2f}% реального времени, отводов на фазу: {resampler.taps}, "
+              f"выход: {produced} отсч.)")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,111 @@
+"""
+Кольцевой буфер аудио в разделяемой памяти для обмена между процессами.
+
+Аудио пишется одним процессом-писателем (захват + VAD), а читается процессами
+распознавания и GUI. Между процессами передаются только небольшие дескрипторы
+(ID сегмента и абсолютные номера отсчетов), сами отсчеты остаются в общей памяти.
+"""
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class SharedAudioRing:
+    """Кольцевой буфер float32-отсчетов с монотонным счетчиком записи."""
+
+    # Заголовок: [счетчик записанных отсчетов, счетчик начатых записей]
+    HEADER_ITEMS = 2
+    HEADER_BYTES = HEADER_ITEMS * np.dtype(np.int64).itemsize
+
+    def __init__(self, capacity: int, name: Optional[str] = None):
+        """
+        Создает новый буфер или подключается к существующему.
+
+        Args:
+            capacity: Емкость буфера в отсчетах (должна совпадать у всех процессов)
+            name: Имя существующего блока разделяемой памяти для подключения
+        """
+        if capacity <= 0:
+            raise ValueError("Емкость буфера должна быть положительной.")
+        self.capacity = capacity
+        self.is_owner = name is None
+        if self.is_owner:
+            size = self.HEADER_BYTES + capacity * np.dtype(np.float32).itemsize
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+        self.header = np.ndarray((self.HEADER_ITEMS,), dtype=np.int64, buffer=self.shm.buf)
+        self.data = np.ndarray((capacity,), dtype=np.float32, buffer=self.shm.buf, offset=self.HEADER_BYTES)
+        if self.is_owner:
+            self.header[:] = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def write_position(self) -> int:
+        """Абсолютный номер следующего записываемого отсчета."""
+        return int(self.header[0])
+
+    def write(self, chunk: np.ndarray) -> Tuple[int, int]:
+        """
+        Записывает чанк в буфер (вызывается только единственным писателем).
+
+        Returns:
+            Tuple[int, int]: Абсолютные номера отсчетов [start, end) записанного чанка
+        """
+        chunk = np.asarray(chunk, dtype=np.float32)
+        n = len(chunk)
+        if n > self.capacity:
+            raise ValueError("Чанк больше емкости кольцевого буфера.")
+
+        start = int(self.header[0])
+        end = start + n
+        # Сначала объявляем зону записи, чтобы читатели могли обнаружить перезапись
+        self.header[1] = end
+
+        offset = start % self.capacity
+        first = min(n, self.capacity - offset)
+        self.data[offset:offset + first] = chunk[:first]
+        if first < n:
+            self.data[:n - first] = chunk[first:]
+
+        self.header[0] = end
+        return start, end
+
+    def read(self, start: int, end: int) -> Optional[np.ndarray]:
+        """
+        Копирует отсчеты [start, end) из буфера.
+
+        Returns:
+            Optional[np.ndarray]: Копия отсчетов или None, если данные уже перезаписаны
+        """
+        if end <= start:
+            return np.array([], dtype=np.float32)
+        if end > int(self.header[0]) or end - start > self.capacity:
+            return None
+        if int(self.header[1]) - start > self.capacity:
+            return None
+
+        n = end - start
+        offset = start % self.capacity
+        first = min(n, self.capacity - offset)
+        result = np.empty(n, dtype=np.float32)
+        result[:first] = self.data[offset:offset + first]
+        if first < n:
+            result[first:] = self.data[:n - first]
+
+        # Повторная проверка: писатель мог обогнать нас во время копирования
+        if int(self.header[1]) - start > self.capacity:
+            return None
+        return result
+
+    def close(self) -> None:
+        del self.header
+        del self.data
+        self.shm.close()
+        if self.is_owner:
+            self.shm.unlink()
@@ -2,8 +2,8 @@
 Модуль с реализацией команды остановки.
 """
 
-from interfaces.command_interface import CommandInterface
-from interfaces.robot_interface import RobotInterface
+from voice_interfaces.command_interface import CommandInterface
+from voice_interfaces.robot_interface import RobotInterface
 import time
 
 
@@ -0,0 +1,53 @@
+"""
+Модуль с подпиской на телеметрию роботов.
+"""
+import json
+from typing import Dict, List
+
+import zmq
+
+
+class TelemetrySubscriber:
+    """
+    Подписчик на телеметрию одного или нескольких роботов.
+
+    Для каждого адреса создается свой сокет SUB с ZMQ_CONFLATE, поэтому
+    в очереди всегда лежит только последнее состояние каждого робота.
+    """
+
+    TOPIC_PREFIX = "telemetry/"
+
+    def __init__(self, context: zmq.Context, endpoints: List[str]):
+        self.sockets = []
+        for endpoint in endpoints:
+            socket = context.socket(zmq.SUB)
+            socket.setsockopt(zmq.CONFLATE, 1)
+            socket.setsockopt_string(zmq.SUBSCRIBE, self.TOPIC_PREFIX)
+            socket.connect(endpoint)
+            self.sockets.append(socket)
+        self.states: Dict[str, dict] = {}
+
+    @staticmethod
+    def decode(message: str) -> dict:
+        _, body = message.split(' ', 1)
+        return json.loads(body)
+
+    def poll_latest(self) -> Dict[str, dict]:
+        """Неблокирующе забирает последние состояния; возвращает все известные состояния роботов."""
+        for socket in self.sockets:
+            try:
+                state = self.decode(socket.recv_string(zmq.NOBLOCK))
+            except zmq.Again:
+                continue
+            self.states[state['robot_id']] = state
+        return self.states
+
+    @staticmethod
+    def format_state(state: dict) -> str:
+        status = "АВАРИЯ" if state['is_collided'] else (state['active_command'] or "Ожидание")
+        return (f"Робот {state['robot_id']}: ({state['x']:.2f}, {state['y']:.2f}) м, "
+                f"v={state['linear_velocity']:.2f} м/с, {status}, очередь: {state['queue_length']}")
+
+    def close(self) -> None:
+        for socket in self.sockets:
+            socket.close()
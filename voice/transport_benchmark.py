@@ -0,0 +1,151 @@
+"""
+Сравнение транспортов ZeroMQ (tcp, ipc, inproc) и кодировок команд (JSON и компактная).
+
+Для каждой пары «транспорт x кодировка» измеряются:
+  * пропускная способность PUB -> SUB (сообщений в секунду, без ограничения HWM);
+  * задержка кругового обхода PAIR <-> PAIR (p50/p99, мкс).
+
+Компактная кодировка - двоичный формат команд из command_codec.
+
+Запуск: python transport_benchmark.py [--messages N] [--roundtrips N]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import zmq
+
+from command_codec import encode_command, decode_command
+from latency_trace import percentile
+
+SAMPLE_COMMAND = {'command': 'move', 'params': {'linear_speed': 0.5, 'distance': 1.5}, 'seq': 42, 'session': 'a1b2c3d4'}
+
+
+def encode_json(command):
+    return json.dumps(command).encode('utf-8')
+
+
+def decode_json(data):
+    return json.loads(data)
+
+
+ENCODINGS = {
+    'json': (encode_json, decode_json),
+    'compact': (encode_command, decode_command),
+}
+
+
+def endpoints(transport, tmpdir):
+    """Пара адресов (для привязки, для подключения) под выбранный транспорт."""
+    if transport == 'tcp':
+        return 'tcp://127.0.0.1:*', None
+    if transport == 'ipc':
+        path = os.path.join(tmpdir, f"bench-{time.monotonic_ns()}")
+        return f"ipc://{path}", f"ipc://{path}"
+    name = f"inproc://bench-{time.monotonic_ns()}"
+    return name, name
+
+
+def bind_pair(context, sender_type, receiver_type, transport, tmpdir):
+    """Создает и соединяет пару сокетов; для tcp берется свободный порт."""
+    bind_address, connect_address = endpoints(transport, tmpdir)
+    sender = context.socket(sender_type)
+    receiver = context.socket(receiver_type)
+    for socket in (sender, receiver):
+        socket.setsockopt(zmq.LINGER, 0)
+        socket.setsockopt(zmq.SNDHWM, 0)
+        socket.setsockopt(zmq.RCVHWM, 0)
+    sender.bind(bind_address)
+    if connect_address is None:
+        connect_address = sender.getsockopt_string(zmq.LAST_ENDPOINT)
+    receiver.connect(connect_address)
+    return sender, receiver
+
+
+def measure_throughput(context, transport, encoding, messages, tmpdir):
+    """Сообщений в секунду PUB -> SUB с кодированием и декодированием на каждом сообщении."""
+    encode, decode = ENCODINGS[encoding]
+    publisher, subscriber = bind_pair(context, zmq.PUB, zmq.SUB, transport, tmpdir)
+    subscriber.setsockopt(zmq.SUBSCRIBE, b'')
+    # Ожидание установления подписки: PUB отбрасывает сообщения до подключения SUB
+    while True:
+        publisher.send_multipart([b'all/', b'sync'])
+        if subscriber.poll(10):
+            while subscriber.poll(0):
+                subscriber.recv_multipart()
+            break
+
+    topic = b'all/'
+    command = dict(SAMPLE_COMMAND)
+
+    def produce():
+        for seq in range(messages):
+            command['seq'] = seq
+            publisher.send_multipart([topic, encode(command)])
+
+    producer = threading.Thread(target=produce)
+    start = time.perf_counter()
+    producer.start()
+    for _ in range(messages):
+        _, body = subscriber.recv_multipart()
+        decode(body)
+    elapsed = time.perf_counter() - start
+    producer.join()
+    publisher.close()
+    subscriber.close()
+    return messages / elapsed
+
+
+def measure_latency(context, transport, encoding, roundtrips, tmpdir):
+    """Задержки кругового обхода (мкс): запрос и ответ одной и той же командой."""
+    encode, decode = ENCODINGS[encoding]
+    client, server = bind_pair(context, zmq.PAIR, zmq.PAIR, transport, tmpdir)
+
+    def echo():
+        for _ in range(roundtrips):
+            server.send(encode(decode(server.recv())))
+
+    echoer = threading.Thread(target=echo)
+    echoer.start()
+    samples = []
+    for seq in range(roundtrips):
+        command = dict(SAMPLE_COMMAND, seq=seq)
+        start = time.perf_counter()
+        client.send(encode(command))
+        decode(client.recv())
+        samples.append((time.perf_counter() - start) * 1e6)
+    echoer.join()
+    client.close()
+    server.close()
+    # Первые обмены включают установление соединения
+    samples = samples[min(len(samples) // 10, 100):]
+    return percentile(samples, 50), percentile(samples, 99)
+
+
+def benchmark(messages=50000, roundtrips=5000):
+    transports = ['tcp', 'inproc']
+    if sys.platform != 'win32':
+        transports.insert(1, 'ipc')  # ipc:// недоступен в Windows
+
+    print(f"Размер сообщения: json={len(encode_json(SAMPLE_COMMAND))} Б, "
+          f"compact={len(encode_command(SAMPLE_COMMAND))} Б")
+    print(f"{'транспорт':<10}{'кодировка':<10}{'сообщ/с':>12}{'p50, мкс':>12}{'p99, мкс':>12}")
+    context = zmq.Context.instance()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for transport in transports:
+            for encoding in ENCODINGS:
+                rate = measure_throughput(context, transport, encoding, messages, tmpdir)
+                p50, p99 = measure_latency(context, transport, encoding, roundtrips, tmpdir)
+                print(f"{transport:<10}{encoding:<10}{rate:>12.0f}{p50:>12.1f}{p99:>12.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Сравнение транспортов ZeroMQ и кодировок команд')
+    parser.add_argument('--messages', type=int, default=50000, help='Число сообщений для замера пропускной способности')
+    parser.add_argument('--roundtrips', type=int, default=5000, help='Число обменов для замера задержки')
+    cli_args = parser.parse_args()
+    benchmark(cli_args.messages, cli_args.roundtrips)
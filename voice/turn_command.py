@@ -5,8 +5,8 @@
 from typing import Optional
 import math
 
-from interfaces.command_interface import CommandInterface
-from interfaces.robot_interface import RobotInterface
+from voice_interfaces.command_interface import CommandInterface
+from voice_interfaces.robot_interface import RobotInterface
 
 
 class TurnCommand(CommandInterface):
@@ -63,6 +63,6 @@ class TurnCommand(CommandInterface):
             'type': 'turn',
             'params': {
                 'angular_speed': self.angular_speed,
-                'angle': self.angle
+                'angle': abs(self.angle) if self.angle is not None else None
             }
         }
@@ -0,0 +1,68 @@
+"""
+Модуль с детектором ключевого слова (wake word) для голосового управления.
+"""
+import json
+import time
+from typing import Iterable
+
+import numpy as np
+import vosk
+
+
+class WakeWordDetector:
+    """
+    Легковесный детектор ключевого слова поверх VOSK с ограниченной грамматикой.
+
+    Сегмент декодируется только по словарю из ключевых слов и [unk], что намного
+    дешевле полного распознавания. После срабатывания открывается командное окно,
+    в течение которого сегменты передаются на полное распознавание без проверки.
+    Каждая распознанная команда продлевает окно.
+    """
+
+    def __init__(self, model, wake_words: Iterable[str], sample_rate: int, command_window: float = 5.0):
+        """
+        Args:
+            model: Загруженная модель VOSK (должна поддерживать грамматику)
+            wake_words: Ключевые слова, открывающие командное окно
+            sample_rate: Частота дискретизации аудио
+            command_window: Длительность командного окна в секундах
+        """
+        self.model = model
+        self.wake_words = {w.strip().lower() for w in wake_words if w.strip()}
+        self.grammar = json.dumps(sorted(self.wake_words) + ["[unk]"], ensure_ascii=False)
+        self.sample_rate = sample_rate
+        self.command_window = command_window
+        self.window_open_until = 0.0
+        self.segments_total = 0
+        self.segments_skipped = 0
+
+    def detect(self, audio_data: np.ndarray) -> bool:
+        """Проверяет, содержит ли сегмент ключевое слово."""
+        audio_data_int16 = (audio_data * 32767).astype(np.int16)
+        recognizer = vosk.KaldiRecognizer(self.model, self.sample_rate, self.grammar)
+        recognizer.AcceptWaveform(audio_data_int16.tobytes())
+        words = json.loads(recognizer.FinalResult()).get("text", "").split()
+        return any(word in self.wake_words for word in words)
+
+    def is_window_open(self) -> bool:
+        return time.monotonic() < self.window_open_until
+
+    def should_process(self, audio_data: np.ndarray) -> bool:
+        """
+        Решает, нужно ли полное распознавание сегмента.
+
+        Returns:
+            bool: True, если командное окно открыто или в сегменте есть ключевое слово
+        """
+        self.segments_total += 1
+        if self.is_window_open():
+            return True
+        if self.detect(audio_data):
+            self.open_window()
+            return True
+        self.segments_skipped += 1
+        return False
+
+    def open_window(self) -> None:
+        """Открывает (или продлевает) командное окно."""
+        self.window_open_until = time.monotonic() + self.command_window